@@ -1,5 +1,8 @@
+import sys
 import timeit
-from os import remove, path
+import tracemalloc
+from datetime import timedelta
+from os import listdir, remove, path
 from dataclasses import dataclass
 from typing import Optional
 
@@ -7,11 +10,55 @@ from matplotlib import pyplot as plt
 import numpy as np
 
 import oopnet as on
+from oopnet.simulator.reportfile_reader import ReportFileReader
 
 poulakis_filename = path.join('testing', 'networks', 'Poulakis_enhanced_PDA.inp')
 ctown_filename = path.join('examples', 'data', 'C-town.inp')
 
 
+def create_synthetic_network(filename: str, n_nodes: int = 100_000, units: str = 'LPS') -> str:
+    """Writes a square grid network with roughly n_nodes Junctions, a Reservoir and Pipes between all neighbours."""
+    side = int(n_nodes ** 0.5)
+    ids = [f'J-{i}' for i in range(side * side)]
+    lines = ['[TITLE]', 'Synthetic grid network', '', '[JUNCTIONS]']
+    lines += [f' {id}\t{100 + i % 50}\t{0.1 * (i % 7):.1f}\t;' for i, id in enumerate(ids)]
+    lines += ['', '[RESERVOIRS]', ' R-1\t200\t;', '', '[PIPES]', f' P-0\tR-1\t{ids[0]}\t10\t500\t130\t0\tOpen\t;']
+    for i, id in enumerate(ids):
+        if (i + 1) % side:
+            lines.append(f' P-{len(lines)}\t{id}\t{ids[i + 1]}\t100\t200\t130\t0\tOpen\t;')
+        if i + side < len(ids):
+            lines.append(f' P-{len(lines)}\t{id}\t{ids[i + side]}\t100\t200\t130\t0\tOpen\t;')
+    lines += ['', '[OPTIONS]', f' Units\t{units}', ' Headloss\tH-W', '', '[COORDINATES]']
+    lines += [f' {id}\t{i % side}\t{i // side}' for i, id in enumerate(ids)]
+    lines += [' R-1\t-1\t-1', '', '[END]']
+    with open(filename, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+    return filename
+
+
+def component_memory(filename: str) -> tuple[int, float, float]:
+    """Reads a network and returns its number of components, the size of a Pipe object (including its attribute
+    dictionary, if there is one) and the memory retained by the network per component in bytes."""
+    tracemalloc.start()
+    network = on.Network.read(filename)
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    components = on.get_nodes(network) + on.get_links(network)
+    pipe = on.get_pipes(network)[0]
+    size = sys.getsizeof(pipe) + (sys.getsizeof(vars(pipe)) if hasattr(pipe, '__dict__') else 0)
+    return len(components), size, retained / len(components)
+
+
+def get_lengths(pipes: list):
+    for p in pipes:
+        length = p.length
+
+
+def set_lengths(pipes: list):
+    for p in pipes:
+        p.length = 100.0
+
+
 @dataclass
 class OOPNETBenchmark:
     filename: str
@@ -69,6 +116,23 @@ class OOPNETBenchmark:
         self.network.write('test.inp')
         remove('test.inp')
 
+    def change_demand_and_write(self):
+        junction = on.get_junctions(self.network)[0]
+        junction.demand += 0.0001
+        self.network.to_string()
+
+    def create_eps_report(self, duration: timedelta = timedelta(days=7)) -> str:
+        network = on.Network.read(self.filename)
+        network.times.duration = duration
+        network.report.nodes = 'ALL'
+        network.report.links = 'ALL'
+        rpt_path = path.join('tmp', 'benchmark')
+        network.run(delete=False, path=rpt_path)
+        return max((path.join(rpt_path, f) for f in listdir(rpt_path) if f.endswith('.rpt')), key=path.getmtime)
+
+    def parse_report(self, filename: str):
+        nodes, links = ReportFileReader(filename)
+
     def plot(self):
         self.network.plot()
         plt.close()
@@ -91,6 +155,41 @@ class OOPNETBenchmark:
         print(np.mean(timeit.Timer(stmt=self.read).repeat(number=n)))
         self.reset()
 
+        print('\nReading synthetic network with 100,000 nodes')
+        synthetic = create_synthetic_network('synthetic.inp')
+        print(np.mean(timeit.Timer(stmt=lambda: on.Network.read(synthetic)).repeat(number=1)))
+
+        print('\nStreaming synthetic network with 100,000 nodes')
+        print(np.mean(timeit.Timer(stmt=lambda: on.Network.read(synthetic, stream=True)).repeat(number=1)))
+
+        print('\nReading synthetic network with 100,000 nodes in US units (GPM)')
+        synthetic_gpm = create_synthetic_network('synthetic_gpm.inp', units='GPM')
+        print(np.mean(timeit.Timer(stmt=lambda: on.Network.read(synthetic_gpm)).repeat(number=1)))
+        remove(synthetic_gpm)
+
+        print('\nLoading snapshot of synthetic network with 100,000 nodes')
+        snapshot = synthetic + '.snapshot'
+        synthetic_network = on.Network.read(synthetic)
+        synthetic_network.save_snapshot(snapshot)
+        print(np.mean(timeit.Timer(stmt=lambda: on.Network.load_snapshot(snapshot)).repeat(number=1)))
+        remove(snapshot)
+        remove(synthetic)
+
+        print('\nWriting synthetic network with 100,000 nodes')
+        print(np.mean(timeit.Timer(stmt=lambda: synthetic_network.write(synthetic)).repeat(number=1)))
+        remove(synthetic)
+
+        print('\nMemory of synthetic network with 500,000 pipes')
+        large = create_synthetic_network('large.inp', n_nodes=250_000)
+        n_components, pipe_size, per_component = component_memory(large)
+        print(f'{n_components} components, Pipe object: {pipe_size} bytes, retained: {per_component:.0f} bytes per component')
+
+        print('\nGetting and setting the lengths of 500,000 pipes')
+        pipes = on.get_pipes(on.Network.read(large))
+        print(np.mean(timeit.Timer(stmt=lambda: get_lengths(pipes)).repeat(number=1)))
+        print(np.mean(timeit.Timer(stmt=lambda: set_lengths(pipes)).repeat(number=1)))
+        remove(large)
+
         print('\nChanging demands')
         print(np.mean(timeit.Timer(stmt=self.increase_demand).repeat(number=n)))
         self.reset()
@@ -123,6 +222,26 @@ class OOPNETBenchmark:
         print(np.mean(timeit.Timer(stmt=self.write).repeat(number=n)))
         self.reset()
 
+        print('\nRendering input file template with all junction demands')
+        template = self.network.compile_template([(j, 'demand') for j in on.get_junctions(self.network)])
+        demands = np.ones(len(template))
+        print(np.mean(timeit.Timer(stmt=lambda: template(demands)).repeat(number=n)))
+
+        print('\nChanging a demand and writing')
+        print(np.mean(timeit.Timer(stmt=self.change_demand_and_write).repeat(number=n)))
+
+        # the section cache slows down creating components as long as it is enabled
+        print('\nChanging a demand and writing with section cache')
+        self.network.cache_sections()
+        print(np.mean(timeit.Timer(stmt=self.change_demand_and_write).repeat(number=n)))
+        self.network.cache_sections(False)
+        self.reset()
+
+        print('\nParsing 7 day EPS report file')
+        report = self.create_eps_report()
+        print(np.mean(timeit.Timer(stmt=lambda: self.parse_report(report)).repeat(number=max(n // 100, 1))))
+        self.reset()
+
         print('\nPlotting network')
         print(np.mean(timeit.Timer(stmt=self.plot).repeat(number=n)))
         self.reset()
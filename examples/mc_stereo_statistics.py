@@ -0,0 +1,43 @@
+import os
+from multiprocessing import Pool
+
+import numpy as np
+import oopnet as on
+from matplotlib import pyplot as plt
+
+filename = os.path.join('data', 'Poulakis.inp')
+
+
+def roll_the_dice(mcruns: int) -> on.ReportStatistics:
+    net = on.Network.read(filename)
+    stats = on.ReportStatistics(quantiles=(0.05, 0.95))
+    for _ in range(mcruns):
+        cnet = on.Copy(net)
+        for j in on.get_junctions(cnet):
+            j.demand += np.random.normal(0.0, 1.0)
+        stats.add(cnet.run())
+    return stats
+
+
+if __name__ == '__main__':
+    mcruns = 1_000
+    workers = os.cpu_count()
+
+    with Pool(workers) as pool:
+        results = pool.map(roll_the_dice, [mcruns // workers] * workers)
+
+    stats = results[0]
+    for other in results[1:]:
+        stats.merge(other)
+    print(stats)
+
+    p_mean = stats.mean().pressure
+    print(p_mean)
+    print(stats.std().pressure)
+
+    p_lower = stats.quantile(0.05).pressure - p_mean
+    p_upper = stats.quantile(0.95).pressure - p_mean
+    plt.fill_between(range(len(p_mean)), p_lower, p_upper, alpha=0.5)
+    plt.xticks(range(len(p_mean)), p_mean.index, rotation=90)
+    plt.ylabel('Pressure deviation from mean (m)')
+    plt.show()
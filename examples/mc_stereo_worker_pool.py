@@ -0,0 +1,31 @@
+import os
+
+import numpy as np
+import pandas as pd
+import oopnet as on
+from matplotlib import pyplot as plt
+
+
+if __name__ == '__main__':
+    filename = os.path.join('data', 'Poulakis.inp')
+
+    net = on.Network.read(filename)
+    mcruns = 1_000
+
+    demands = np.array([j.demand for j in on.get_junctions(net)])
+    samples = demands + np.random.normal(0.0, 1.0, (mcruns, len(demands)))
+
+    with on.SimulationWorkerPool(filename) as pool:
+        p = [rpt.pressure for rpt in pool.map([{'junctions.demand': s} for s in samples], chunksize=10)]
+
+    p = pd.DataFrame(p, index=list(range(len(p))))
+    print(p)
+
+    p_mean = p.mean()
+    print(p_mean)
+
+    p_sub = p.sub(p_mean, axis=1)
+
+    x = np.linspace(-1.5, 1.5, 40)
+    p_sub[['J-03', 'J-31']].hist(bins=x, layout=(2, 1))
+    plt.show()
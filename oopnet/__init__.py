@@ -5,6 +5,9 @@ from .graph import *
 from .plotter import *
 from .report import *
 from .simulator import *
+from .simulator.batch import run_many
+from .simulator.cache import SimulationCache
+from .simulator.worker_pool import SimulationWorkerPool
 from .utils.adders import *
 from .utils.getters import *
 from .utils.removers import *
@@ -1,15 +1,52 @@
 """
 This module contains all the base classes of OOPNET
 """
+
 from __future__ import annotations
-from dataclasses import dataclass, field
-from typing import Optional, TYPE_CHECKING
+from dataclasses import dataclass, field, fields
+from typing import Optional, TypeVar, TYPE_CHECKING
 from abc import ABC, abstractmethod
 
 if TYPE_CHECKING:
     from oopnet.elements.network import Network
 
+T = TypeVar("T", bound=type)
+
+
+def slotted(cls: T) -> T:
+    """Class decorator recreating a dataclass with __slots__ for its fields.
+
+    Instances don't get a __dict__, which saves memory and speeds up attribute access. Fields shadowed by properties
+    (e.g., NetworkComponent.id) stay properties. dataclass(slots=True) would replace them and isn't available in
+    Python 3.9.
+
+    Args:
+      cls: dataclass, all its bases have to be slotted as well
+
+    Returns:
+      slotted class
+
+    """
+    inherited = {
+        name for base in cls.__mro__[1:] for name in base.__dict__.get("__slots__", ())
+    }
+    names = tuple(
+        f.name
+        for f in fields(cls)
+        if f.name not in inherited
+        and not isinstance(getattr(cls, f.name, None), property)
+    )
+    cls_dict = dict(cls.__dict__)
+    cls_dict["__slots__"] = names
+    for name in names + ("__dict__", "__weakref__"):
+        # field defaults are stored in the dataclass' __init__, the class attributes would shadow the slots
+        cls_dict.pop(name, None)
+    new_cls = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+    new_cls.__qualname__ = cls.__qualname__
+    return new_cls
 
+
+@slotted
 @dataclass
 class NetworkComponent(ABC):
     """This is OOPNET's base class for all objects having a name (id) in EPANET Input files
@@ -21,13 +58,18 @@ class NetworkComponent(ABC):
 
     """
 
+    # set first by __init__ (slots have no class defaults), the id setters of the subclasses look up the Network
+    _network_: Optional[Network] = field(
+        default_factory=lambda: None,
+        init=False,
+        compare=False,
+        hash=False,
+        repr=False,
+    )
     id: str
     _id: str = field(init=False, compare=False, hash=False, repr=False)
     comment: Optional[str] = None
     tag: Optional[str] = None
-    _network_: Optional[Network] = field(
-        default=None, init=False, compare=False, hash=False, repr=False
-    )
 
     @property
     def id(self) -> str:
@@ -1,9 +1,13 @@
 from __future__ import annotations
+from itertools import count
 from typing import Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from oopnet.elements.base import NetworkComponent
 
+# revisions are unique across all registries, so a replaced registry never matches the revision of its predecessor
+_revisions = count()
+
 
 class ComponentRegistry(dict):
     """Class for storing NetworkComponents in a Network object or a SuperComponentRegistry.
@@ -11,11 +15,16 @@ class ComponentRegistry(dict):
     Based on built-in dict but prevents overwriting an existing key and raises a ComponentNotExistingError error,
     when trying to look up a not exiting Component (instead of default KeyErrors).
 
+    Attributes:
+      super_registry: SuperComponentRegistry the registry belongs to
+      revision: changes whenever components are added or removed (used by the write cache, see SectionCache)
+
     """
 
     def __init__(self, super_registry: Optional[SuperComponentRegistry] = None):
         super().__init__()
         self.super_registry = super_registry
+        self.revision = next(_revisions)
 
     def __setitem__(self, key: str, value: NetworkComponent):
         if (
@@ -27,6 +36,47 @@ class ComponentRegistry(dict):
             raise IdenticalIDError(key)
         else:
             super().__setitem__(key, value)
+            self.revision = next(_revisions)
+
+    def update(self, components: dict[str, NetworkComponent]):
+        """Adds many NetworkComponents at once.
+
+        Checks all IDs in one go instead of component by component. Like __setitem__, existing keys are never
+        overwritten.
+
+        Args:
+            components: dictionary with IDs as keys and NetworkComponents as values
+
+        """
+        components = dict(components)
+        registries = (
+            self.super_registry.values()
+            if getattr(self, "super_registry", None) is not None
+            else [self]
+        )
+        for registry in registries:
+            if not components.keys().isdisjoint(registry):
+                raise IdenticalIDError(next(iter(components.keys() & registry.keys())))
+        super().update(components)
+        self.revision = next(_revisions)
+
+    def __delitem__(self, key: str):
+        super().__delitem__(key)
+        self.revision = next(_revisions)
+
+    def pop(self, *args) -> NetworkComponent:
+        value = super().pop(*args)
+        self.revision = next(_revisions)
+        return value
+
+    def popitem(self) -> tuple[str, NetworkComponent]:
+        item = super().popitem()
+        self.revision = next(_revisions)
+        return item
+
+    def clear(self):
+        super().clear()
+        self.revision = next(_revisions)
 
     def __getitem__(self, item) -> NetworkComponent:
         if item not in self:
@@ -78,7 +128,6 @@ class SuperComponentRegistry(dict):
             Requested NetworkComponent
 
         """
-        self.check_id_exists(id=id)
         for registry in self.values():
             if id in registry:
                 return registry[id]
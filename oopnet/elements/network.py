@@ -1,5 +1,15 @@
 from __future__ import annotations
-from typing import Optional, TYPE_CHECKING, Union
+from typing import (
+    Any,
+    Optional,
+    TYPE_CHECKING,
+    Union,
+    Type,
+    Callable,
+    Iterable,
+    Iterator,
+    TextIO,
+)
 from dataclasses import dataclass, field
 from datetime import datetime
 
@@ -9,12 +19,21 @@ if TYPE_CHECKING:
     from matplotlib.pyplot import Axes
     from matplotlib.animation import FuncAnimation
     import pandas as pd
-
-from oopnet.writer.write import write
-from oopnet.reader.read import read
+    from concurrent.futures import Executor
+    import asyncio
+    from oopnet.simulator.cache import SimulationCache
+
+from oopnet.writer.write import write, to_string
+from oopnet.writer.section_cache import SectionCache
+from oopnet.writer.template import compile_template, InputTemplate
+from oopnet.reader.read import read, read_stream
+from oopnet.reader.snapshot import save_snapshot, load_snapshot, read_cached
 from oopnet.plotter.pyplot import NetworkPlotter
 from oopnet.plotter.bokehplot import Plotsimulation as BokehPlot
 from oopnet.simulator.epanet2 import ModelSimulator
+from oopnet.simulator.batch import run_many
+from oopnet.simulator.reportfile_reader import ReportFileReader
+from oopnet.simulator.binaryfile_reader import BinaryFileReader
 from oopnet.elements.water_quality import Reaction
 from oopnet.elements.options_and_reporting import (
     Options,
@@ -50,6 +69,7 @@ class Network:
       backdrop: Contains the Backdrop object of the network
       energies: List of all Energy curves in the network
       controls: List of all Control objects in the network
+      raw_sections: Verbatim text of the input file sections that weren't read (see Network.read)
       _rules: List of all Rule objects in the network
       reactions: List of all Reaction objects in the network
       options: Option object representing model options
@@ -61,6 +81,7 @@ class Network:
       _links: SuperComponentRegistry for all Link objects in the network
       _curves: ComponentRegistry of for Curve objects belonging to the network
       _patterns: ComponentRegistry of for Pattern objects belonging to the network
+      _section_cache: SectionCache holding the rendered input file sections (see Network.cache_sections)
 
     """
 
@@ -76,35 +97,153 @@ class Network:
 
     energies: list[Energy] = field(default_factory=list)
     controls: list[Control] = field(default_factory=list)
+    raw_sections: dict[str, str] = field(default_factory=dict)
 
     _nodes: SuperComponentRegistry = field(default_factory=NodeRegistry)
     _links: SuperComponentRegistry = field(default_factory=LinkRegistry)
     _curves: ComponentRegistry = field(default_factory=ComponentRegistry)
     _patterns: ComponentRegistry = field(default_factory=ComponentRegistry)
     _rules: ComponentRegistry = field(default_factory=ComponentRegistry)
+    _section_cache: Optional[SectionCache] = field(
+        default=None, init=False, compare=False, repr=False
+    )
 
     @classmethod
-    def read(cls, filename=Optional[str], content=Optional[str]):
+    def read(
+        cls,
+        filename: Optional[str] = None,
+        content: Optional[str] = None,
+        cache: bool = False,
+        stream: bool = False,
+        sections: Optional[Iterable[str]] = None,
+    ):
         """Reads an EPANET input file.
 
         Args:
           filename: filename of the EPANET input file
           content: EPANET input file content as string
+          cache: If True, the network is loaded from a snapshot next to the input file (filename + ".snapshot"), if
+            the input file's modification time and hash didn't change since the snapshot was saved. Otherwise, the
+            input file is read and the snapshot is (re)created.
+          stream: If True, the input file is read section by section instead of keeping it in memory as a whole. This
+            considerably reduces the peak memory usage for very large models.
+          sections: Names of the sections to be read, e.g. ["PIPES", "COORDINATES"]. The settings sections, the sections
+            defining components referenced in them and the sections needed for the unit conversion are read as well. All other sections
+            are stored verbatim in raw_sections and written back unchanged by write. Snapshots aren't used as cache
+            when reading only some sections.
 
         """
-        return read(network=cls(), filename=filename, content=content)
+        if cache and filename is not None and sections is None:
+            return read_cached(network=cls(), filename=filename, stream=stream)
+        reader = read_stream if stream else read
+        return reader(
+            network=cls(), filename=filename, content=content, sections=sections
+        )
+
+    @classmethod
+    def load_snapshot(cls, filename: str):
+        """Loads a Network from a binary snapshot created with save_snapshot.
+
+        Args:
+          filename: snapshot filename
+
+        """
+        return load_snapshot(network=cls(), filename=filename)
+
+    def save_snapshot(self, filename: str):
+        """Saves the Network as a binary snapshot.
 
-    def write(self, filename):
+        Snapshots store the components' attributes column-wise in a compact binary file and can be loaded much faster
+        than EPANET input files. They are meant as a cache and aren't compatible between OOPNET versions.
+
+        Args:
+          filename: snapshot filename
+
+        """
+        save_snapshot(self, filename)
+
+    def write(self, filename: Union[str, TextIO], units: Optional[str] = None):
         """Converts the Network to an EPANET input file and saves it with the desired filename.
 
         Args:
-          filename: desired filename/path were the user wants to store the file
+          filename: desired filename/path were the user wants to store the file, or an open text stream
+          units: EPANET flow unit used in the file (e.g., 'GPM' for writing US customary units), OOPNET's SI units
+            are used by default
 
         Returns:
           0 if successful
 
         """
-        return write(self, filename)
+        return write(self, filename, units)
+
+    def cache_sections(self, enabled: bool = True):
+        """Enables caching the rendered sections of the Network's input file.
+
+        Once enabled, writing the Network only renders the sections again, whose components changed since the last
+        write. This speeds up repeated simulations of scenarios, that only change a few attributes (e.g., junction
+        demands or pipe roughnesses), considerably.
+
+        Changes are tracked by hooking into the attribute assignments of NetworkComponents and Vertices. The hook slows
+        down creating and modifying components (e.g., reading large models takes about twice as long), which is why
+        caching isn't enabled by default. It is only installed as long as a Network caches its sections and removed
+        again, when the last cache is disabled. Lists stored in the Network's components (e.g., vertices or pattern
+        multipliers) are replaced by copies tracking changes made in place, so change them through the components
+        instead of keeping references to lists assigned to them.
+
+        Args:
+          enabled: if False, the cache is dropped and all sections are rendered on every write
+
+        """
+        if self._section_cache is not None:
+            self._section_cache.close()
+        self._section_cache = SectionCache(self) if enabled else None
+
+    def to_string(self, units: Optional[str] = None) -> str:
+        """Converts the Network to the content of an EPANET input file without touching the file system.
+
+        The result can be read again with Network.read(content=...).
+
+        Args:
+          units: EPANET flow unit used in the input file, see write
+
+        Returns:
+          EPANET input file content
+
+        """
+        return to_string(self, units)
+
+    def to_bytes(self, units: Optional[str] = None, encoding: str = "utf-8") -> bytes:
+        """Converts the Network to the encoded content of an EPANET input file, e.g. for hashing or sending it to
+        other processes.
+
+        Args:
+          units: EPANET flow unit used in the input file, see write
+          encoding: text encoding
+
+        Returns:
+          EPANET input file content
+
+        """
+        return to_string(self, units).encode(encoding)
+
+    def compile_template(self, parameters: Iterable[tuple[Any, str]]) -> InputTemplate:
+        """Renders the Network's input file once with placeholders for numeric parameters.
+
+        The returned template renders the input file for a vector of parameter values with plain string formatting,
+        without touching any component objects. This is much faster than setting the attributes and writing the
+        Network for every run of a parameter sweep (e.g., Monte Carlo simulations or calibrations).
+
+        The structure of the input file is determined by the parameters' current values (e.g., emitters with a
+        coefficient of zero aren't written at all, so they can't be used as parameters then).
+
+        Args:
+          parameters: objects and names of their numeric attributes, e.g. [(junction, "demand"), (pipe, "roughness")]
+
+        Returns:
+          template, call it with a vector of parameter values to get the input file content
+
+        """
+        return compile_template(self, parameters)
 
     def run(
         self,
@@ -113,14 +252,26 @@ class Network:
         path: Optional[str] = None,
         startdatetime: Optional[datetime] = None,
         output: bool = False,
+        engine: str = "cli",
+        reader: Union[
+            Type[ReportFileReader], Type[BinaryFileReader]
+        ] = ReportFileReader,
+        cache: Optional[SimulationCache] = None,
+        fifo: bool = False,
+        lazy: bool = False,
     ) -> SimulationReport:
-        """Runs an EPANET simulation by calling command line EPANET
+        """Runs an EPANET simulation by calling command line EPANET or the EPANET toolkit
 
         Attributes:
           filename: if thing is an OOPNET network, filename is an option to perform command line EPANET simulations with a specific filename. If filename is a Python None object then a file with a random UUID (universally unique identifier) is generated
           delete: if delete is True the EPANET Input and SimulationReport file is deleted, if False then the simulation results won't be deleted and are stored in a folder named path
-          path: Path were to perform the simulations. If path is a Python None object then a tmp-folder is generated
+          path: Path were to perform the simulations. If path is a Python None object and delete is True, a directory on a tmpfs (e.g., /dev/shm) is used if available, otherwise a tmp-folder is generated
           output: If True, stdout and strerr will be printed to console and logged.
+          engine: "cli" runs command line EPANET in a separate process, "toolkit" runs the simulation in-process with the EPANET toolkit shared library
+          reader: ReportFileReader parses the text report file created by command line EPANET, BinaryFileReader reads the binary output file instead, which holds the results in full precision
+          cache: optional SimulationCache. If an identical Network was already simulated, the cached report is returned instead of running EPANET again
+          fifo: If True, command line EPANET writes its report to a named pipe instead of a file (POSIX only)
+          lazy: If True, a LazySimulationReport is returned, that only parses the results that are accessed
 
         Returns:
           OOPNET report object
@@ -133,9 +284,94 @@ class Network:
             path=path,
             startdatetime=startdatetime,
             output=output,
+            engine=engine,
+            reader=reader,
+            cache=cache,
+            fifo=fifo,
+            lazy=lazy,
         )
         return sim.run()
 
+    async def arun(
+        self,
+        filename: Optional[str] = None,
+        delete: bool = True,
+        path: Optional[str] = None,
+        startdatetime: Optional[datetime] = None,
+        output: bool = False,
+        engine: str = "cli",
+        reader: Union[
+            Type[ReportFileReader], Type[BinaryFileReader]
+        ] = ReportFileReader,
+        cache: Optional[SimulationCache] = None,
+        fifo: bool = False,
+        lazy: bool = False,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ) -> SimulationReport:
+        """Runs an EPANET simulation without blocking the event loop.
+
+        Takes the same arguments as :meth:`~oopnet.elements.network.Network.run`. Pass an :class:`asyncio.Semaphore` to
+        limit the number of simulations running at the same time. The report's timings only contain wall-clock times,
+        since the CPU time of concurrent simulations can't be told apart.
+
+        Attributes:
+          semaphore: semaphore limiting the number of concurrent simulations
+
+        Returns:
+          OOPNET report object
+
+        """
+        sim = ModelSimulator(
+            thing=self,
+            filename=filename,
+            delete=delete,
+            path=path,
+            startdatetime=startdatetime,
+            output=output,
+            engine=engine,
+            reader=reader,
+            cache=cache,
+            fifo=fifo,
+            lazy=lazy,
+        )
+        return await sim.arun(semaphore=semaphore)
+
+    def run_many(
+        self,
+        modifiers: Iterable[Callable[[Network], Optional[Network]]],
+        executor: Union[str, Executor] = "process",
+        max_workers: Optional[int] = None,
+        path: Optional[str] = None,
+        stack: bool = False,
+        **run_kwargs,
+    ) -> Union[Iterator[SimulationReport], SimulationReport]:
+        """Simulates many variations of the Network in parallel.
+
+        Every modifier is called with a copy of the Network and is expected to modify it (e.g., by changing junction
+        demands). See :func:`~oopnet.simulator.batch.run_many` for details.
+
+        Args:
+          modifiers: callables modifying a copy of the Network
+          executor: "process" for a ProcessPoolExecutor, "thread" for a ThreadPoolExecutor or an existing concurrent.futures.Executor object
+          max_workers: maximum number of workers used by the executor
+          path: parent directory for the scratch directories of the individual simulations
+          stack: if True, all reports are stacked into a single report with an additional "scenario" dimension
+          **run_kwargs: further keyword arguments passed to Network.run
+
+        Returns:
+          iterator over the OOPNET report objects or a single stacked report if stack is True
+
+        """
+        return run_many(
+            modifiers,
+            network=self,
+            executor=executor,
+            max_workers=max_workers,
+            path=path,
+            stack=stack,
+            **run_kwargs,
+        )
+
     def plot(
         self,
         fignum: Optional[int] = None,
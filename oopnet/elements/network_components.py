@@ -7,7 +7,7 @@ import math
 
 import numpy as np
 
-from oopnet.elements.base import NetworkComponent
+from oopnet.elements.base import NetworkComponent, slotted
 from oopnet.utils.oopnet_logging import logging_decorator
 
 if TYPE_CHECKING:
@@ -17,6 +17,7 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
+@slotted
 @dataclass
 class Node(NetworkComponent):
     """Base class for all Node like objects in OOPNET (Junction, Reservoir, Tank).
@@ -53,6 +54,7 @@ class Node(NetworkComponent):
         return np.asarray([self.xcoordinate, self.ycoordinate, self.elevation])
 
 
+@slotted
 @dataclass
 class Link(NetworkComponent):
     """Base class for all Link like objects in OOPNET (Pipe, Pump, Valve).
@@ -111,6 +113,7 @@ class Link(NetworkComponent):
         self.vertices = self.vertices[::-1]
 
 
+@slotted
 @dataclass
 class Junction(Node):
     """Junction node.
@@ -134,6 +137,7 @@ class Junction(Node):
         self._id = id
 
 
+@slotted
 @dataclass
 class Reservoir(Node):
     """Reservoir nodes.
@@ -158,6 +162,7 @@ class Reservoir(Node):
         self._id = id
 
 
+@slotted
 @dataclass
 class Tank(Node):
     """Tank node.
@@ -193,6 +198,7 @@ class Tank(Node):
         self._id = id
 
 
+@slotted
 @dataclass
 class Pipe(Link):
     """Pipe link.
@@ -280,6 +286,7 @@ class Pipe(Link):
 
 
 # todo: rethink keyword, value structure (what happens for multiple properties?)
+@slotted
 @dataclass
 class Pump(Link):
     """Pump link.
@@ -306,6 +313,7 @@ class Pump(Link):
         self._id = id
 
 
+@slotted
 @dataclass
 class Valve(Link):
     """Valve link.
@@ -327,6 +335,7 @@ class Valve(Link):
         self._id = id
 
 
+@slotted
 @dataclass
 class PRV(Valve):
     """Pressure Reducing Valve.
@@ -347,6 +356,7 @@ class PRV(Valve):
         self.maximum_pressure = value
 
 
+@slotted
 @dataclass
 class TCV(Valve):
     """Throttle Control Valve.
@@ -367,6 +377,7 @@ class TCV(Valve):
         self.headloss_coefficient = value
 
 
+@slotted
 @dataclass
 class PSV(Valve):
     """Pressure Sustaining Valve.
@@ -387,6 +398,7 @@ class PSV(Valve):
         self.pressure_limit = value
 
 
+@slotted
 @dataclass
 class GPV(Valve):
     """General Purpose Valve.
@@ -407,6 +419,7 @@ class GPV(Valve):
         self.headloss_curve = value
 
 
+@slotted
 @dataclass
 class PBV(Valve):
     """Pressure Breaker Valve.
@@ -427,6 +440,7 @@ class PBV(Valve):
         self.pressure_drop = value
 
 
+@slotted
 @dataclass
 class FCV(Valve):
     """Flow Control Valve.
@@ -3,7 +3,7 @@ import datetime
 from dataclasses import dataclass, field
 from typing import Union, Optional, TYPE_CHECKING
 
-from oopnet.elements.base import NetworkComponent
+from oopnet.elements.base import NetworkComponent, slotted
 
 
 if TYPE_CHECKING:
@@ -12,6 +12,7 @@ if TYPE_CHECKING:
 
 # todo: refactor reader to allow for mandatory attributes
 # todo: add attribute documentation
+@slotted
 @dataclass
 class Curve(NetworkComponent):
     """Defines data curves and their X,Y points."""
@@ -27,6 +28,7 @@ class Curve(NetworkComponent):
         self._id = id
 
 
+@slotted
 @dataclass
 class Pattern(NetworkComponent):
     """Defines time patterns."""
@@ -1,6 +1,10 @@
-from typing import Callable, Optional
+from typing import Callable, Optional, Sequence
 from dataclasses import dataclass
 
+# sections defining the nodes and links referenced by other sections
+NODE_SECTIONS = ("JUNCTIONS", "RESERVOIRS", "TANKS")
+LINK_SECTIONS = ("PIPES", "PUMPS", "VALVES")
+
 
 @dataclass
 class ReaderDecorator:
@@ -10,6 +14,7 @@ class ReaderDecorator:
     functionname: Optional[str] = None
     priority: Optional[int] = None
     readerfunction: Optional[Callable] = None
+    requires: tuple[str, ...] = ()
 
 
 def make_registering_decorator_factory(foreign_decorator_factory):
@@ -39,7 +44,7 @@ def make_registering_decorator_factory(foreign_decorator_factory):
     return new_decorator_factory
 
 
-def section_reader(title: str, priority: int) -> Callable:
+def section_reader(title: str, priority: int, requires: Sequence[str] = ()) -> Callable:
     """Synchronization decorator.
 
     Used to decorate factory functions and classes for the EPANET input file reader.The title marks the section in the
@@ -48,6 +53,7 @@ def section_reader(title: str, priority: int) -> Callable:
     Args:
       title: section title
       priority: reading priority
+      requires: titles of the sections defining components referenced in this section
 
     Returns:
         section reader
@@ -1,13 +1,14 @@
 from __future__ import annotations
 
 from abc import abstractmethod
-from typing import TYPE_CHECKING
+from typing import Callable, Iterator, TYPE_CHECKING
 
 from oopnet.elements.base import NetworkComponent
+from oopnet.elements.component_registry import ComponentNotExistingError
 from oopnet.elements.network_components import Node
 from oopnet.elements.system_operation import Pattern, Curve
 from oopnet.utils.getters.get_by_id import get_pattern, get_curve, get_node
-from oopnet.reader.factories.base import ReadFactory
+from oopnet.reader.factories.base import ReadFactory, LengthExceededError
 
 if TYPE_CHECKING:
     from oopnet.elements.network import Network
@@ -67,3 +68,75 @@ class ComponentFactory(ReadFactory):
             else:
                 attr_dict[attr] = attr_cls(value)
         return attr_dict
+
+    @staticmethod
+    def _create_lookup(*registries: dict) -> Callable[[str], NetworkComponent]:
+        """Creates a function for looking up NetworkComponents by their IDs.
+
+        The registries are merged into a single dictionary once, so looking up a component takes a single hash table
+        access.
+
+        Args:
+            registries: registries to be searched
+
+        Returns:
+            function returning the NetworkComponent with the passed ID
+        """
+        components = {}
+        for registry in registries:
+            components.update(registry)
+
+        def lookup(id: str) -> NetworkComponent:
+            try:
+                return components[id]
+            except KeyError:
+                raise ComponentNotExistingError(id) from None
+
+        return lookup
+
+    @classmethod
+    def _parse_block(
+        cls, block: list[dict], attrs: list[str], cls_list: list, network: Network
+    ) -> Iterator[tuple[dict, str]]:
+        """Parses all rows of a block with the same attributes.
+
+        Works like _create_attr_dict but selects the conversion of every column only once per block instead of once
+        per value.
+
+        Args:
+            block: EPANET input file block
+            attrs: list of attribute names of a NetworkComponent object
+            cls_list: list of attribute types
+
+        Returns:
+            dictionary with attribute names as keys and attribute values as values and the comment for every row
+        """
+        registries = {
+            Pattern: [network._patterns],
+            Curve: [network._curves],
+            Node: network._nodes.values(),
+        }
+        lookups = {}
+        converters = []
+        for attr, attr_cls in zip(attrs, cls_list):
+            if attr_cls in registries:
+                if attr_cls not in lookups:
+                    lookups[attr_cls] = cls._create_lookup(*registries[attr_cls])
+                converters.append(lookups[attr_cls])
+            elif attr_cls == str and attr != "id":
+                converters.append(str.upper)
+            else:
+                converters.append(attr_cls)
+
+        length = len(attrs)
+        for values in block:
+            attr_values = values["values"]
+            if len(attr_values) > length:
+                raise LengthExceededError(
+                    actual_length=len(attr_values), target_length=length
+                )
+            attr_dict = {
+                attr: converter(value)
+                for attr, converter, value in zip(attrs, converters, attr_values)
+            }
+            yield attr_dict, values["comments"] or None
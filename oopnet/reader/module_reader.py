@@ -36,6 +36,7 @@ def list_section_reader_callables(modules) -> list[Type[Callable]]:
                 functionname=f[0],
                 priority=f[1].decorator_args[1],
                 readerfunction=f[1],
+                requires=tuple(f[1].decorator_kwargs.get("requires", ())),
             )
             all_functions.append(r)
     return all_functions
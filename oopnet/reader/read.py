@@ -1,7 +1,19 @@
 from __future__ import annotations
-import re
+import collections
+import gc
+import io
 import logging
-from typing import Optional, TYPE_CHECKING
+from contextlib import contextmanager, nullcontext
+from typing import (
+    Callable,
+    Container,
+    ContextManager,
+    Iterable,
+    Iterator,
+    Optional,
+    Union,
+    TYPE_CHECKING,
+)
 
 from oopnet.reader.unit_converter.convert import convert
 from oopnet.reader.module_reader import list_section_reader_callables
@@ -20,6 +32,63 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
+def iter_sections(
+    lines: Iterable[str],
+    names: Optional[Container[str]] = None,
+    raw: Container[str] = (),
+) -> Iterator[tuple[str, Union[list[dict], str, None]]]:
+    """Splits EPANET input file lines into sections and yields them one after another.
+
+    Lines before the first section header belong to the TITLE section. Only one section is kept in memory at a time.
+
+    Args:
+      lines: EPANET input file lines, e.g. an open file
+      names: names of the sections to be split, all other sections are skipped (default is all sections)
+      raw: names of skipped sections to be kept as verbatim text
+
+    Yields:
+      section names and blocks in the order of the file, blocks of raw sections are strings and blocks of all other
+      skipped sections are None
+
+    """
+
+    def start(blockname: str) -> tuple[bool, Optional[list]]:
+        if names is None or blockname in names:
+            return True, []
+        return False, [] if blockname in raw else None
+
+    def finish(split: bool, block: Optional[list]) -> Union[list[dict], str, None]:
+        if split or block is None:
+            return block
+        return "".join(line if line.endswith("\n") else line + "\n" for line in block)
+
+    blockname = "TITLE"
+    split, block = start(blockname)
+    for line in lines:
+        # lines of skipped sections are only checked for section headers
+        if not split and "[" not in line:
+            if block is not None:
+                block.append(line)
+            continue
+        values, separator, comment = line.partition(";")
+        values = values.split()
+        if values and values[0].startswith("["):
+            yield blockname, finish(split, block)
+            blockname = " ".join(values)[1:-1]
+            split, block = start(blockname)
+        elif not split:
+            if block is not None:
+                block.append(line)
+        elif values:
+            block.append(
+                {
+                    "values": values,
+                    "comments": " ".join(comment.split()) if separator else None,
+                }
+            )
+    yield blockname, finish(split, block)
+
+
 def filesplitter(content: list[str]) -> dict[str, list]:
     """Reads an EPANET input file and splits the content into blocks.
 
@@ -30,50 +99,151 @@ def filesplitter(content: list[str]) -> dict[str, list]:
         blocks
 
     """
+    return dict(iter_sections(content))
 
-    blocks = {}
-    blockname = "TITLE"
-    blocks[blockname] = []
-    for line in content:
-        line = re.sub(r"\s+", " ", line.replace("\n", "").strip())
-        if line and not line.startswith(";"):
-            if line.startswith("["):
-                blockname = line[1:-1]
-                blocks[blockname] = []
-            else:
-                vals = {"values": line.split(";")[0].strip().split(" ")}
-                if len(line.split(";")) == 2:
-                    vals["comments"] = line.split(";")[1].strip()
-                else:
-                    vals["comments"] = None
-                blocks[blockname].append(vals)
-    return blocks
+
+@contextmanager
+def paused_gc():
+    """Pauses the garbage collection.
+
+    Reading a model creates many long-lived objects. Garbage collection runs in between would only slow it down.
+
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+# section readers sorted by their priority
+SECTION_READERS = sorted(
+    list_section_reader_callables(
+        [
+            read_network_components,
+            read_network_map_tags,
+            read_options_and_reporting,
+            read_system_operation,
+            read_water_quality,
+        ]
+    ),
+    key=lambda x: x.priority,
+)
+
+# sections always read: [OPTIONS] defines the units of the input file, the settings have to be written from their
+# objects, since they are changed by users and when simulating (e.g., the [REPORT] settings)
+REQUIRED_SECTIONS = ("OPTIONS", "TIMES", "REPORT", "ENERGY", "REACTIONS", "QUALITY")
+
+# sections containing values with units, always read if the input file doesn't use OOPNET's SI units (LPS)
+UNIT_SECTIONS = (
+    "JUNCTIONS",
+    "RESERVOIRS",
+    "TANKS",
+    "PIPES",
+    "PUMPS",
+    "VALVES",
+    "CURVES",
+    "DEMANDS",
+    "EMITTERS",
+    "STATUS",
+    "ENERGY",
+    "CONTROLS",
+    "RULES",
+    "REACTIONS",
+)
+
+
+def file_units(lines: Iterable[str]) -> str:
+    """Returns the flow unit defined in an EPANET input file's [OPTIONS] section.
+
+    Args:
+      lines: EPANET input file lines, e.g. an open file
+
+    Returns:
+      flow unit, LPS if the input file doesn't define one
+
+    """
+    units = "LPS"
+    for blockname, block in iter_sections(lines, {"OPTIONS"}):
+        if blockname != "OPTIONS":
+            continue
+        # like in read, only the last occurrence of a section is used
+        units = "LPS"
+        for row in block:
+            values = row["values"]
+            if values[0].upper() == "UNITS" and len(values) > 1:
+                units = values[1].upper()
+    return units
+
+
+def select_sections(sections: Iterable[str], units: str = "LPS") -> set[str]:
+    """Selects the sections to be read when only some of an input file's sections are needed.
+
+    Besides the desired sections, the settings sections (REQUIRED_SECTIONS), the sections defining components
+    referenced in them (e.g., the node sections for [PIPES]) and the sections needed for the unit conversion are read
+    as well. Input files using other units than LPS
+    are converted to SI units while reading, so all sections containing values with units (UNIT_SECTIONS) have to be
+    read for them. Otherwise, the sections kept as verbatim text would be written back in the wrong units.
+
+    Args:
+      sections: names of the desired sections, e.g. ["PIPES", "COORDINATES"]
+      units: flow unit of the input file (see file_units)
+
+    Returns:
+      names of all sections to be read
+
+    """
+    if isinstance(sections, str):
+        sections = [sections]
+    readers = {f.sectionname: f for f in SECTION_READERS}
+    selected = set()
+    pending = [*REQUIRED_SECTIONS, *(name.strip("[]").upper() for name in sections)]
+    if units.upper() != "LPS":
+        pending.extend(UNIT_SECTIONS)
+    while pending:
+        name = pending.pop()
+        if name not in readers:
+            raise ValueError(f"Unknown input file section {name!r}.")
+        if name not in selected:
+            selected.add(name)
+            pending.extend(readers[name].requires)
+    return selected
+
+
+def _split_selection(
+    sections: Optional[Iterable[str]],
+    lines: Callable[[], ContextManager[Iterable[str]]],
+) -> tuple[Optional[set[str]], set[str]]:
+    """Returns the names of the sections to be read and to be kept as raw text."""
+    if sections is None:
+        return None, set()
+    with lines() as fid:
+        units = file_units(fid)
+    selected = select_sections(sections, units)
+    return selected, {f.sectionname for f in SECTION_READERS} - selected
 
 
 @logging_decorator(logger)
 def read(
-    network: Network, filename: Optional[str] = None, content: Optional[str] = None
+    network: Network,
+    filename: Optional[str] = None,
+    content: Optional[str] = None,
+    sections: Optional[Iterable[str]] = None,
 ) -> Network:
     """Function reads an EPANET input file and returns a network object.
 
     Args:
       filename: filename of the EPANET input file
       content: EPANET input file content as string
+      sections: names of the sections to be read (see select_sections), all other sections are stored verbatim in
+        the network's raw_sections and written back unchanged (default is all sections)
 
     Returns:
       network object
 
     """
-    modules = [
-        read_network_components,
-        read_network_map_tags,
-        read_options_and_reporting,
-        read_system_operation,
-        read_water_quality,
-    ]
-
-    all_functions = list_section_reader_callables(modules)
-
     if filename is not None:
         logger.info(f"Reading model from {filename!r}")
         with open(filename, "r") as fid:
@@ -86,13 +256,117 @@ def read(
             'Either one of the arguments "filename" or "content" have to be provided.'
         )
 
-    blocks = filesplitter(content)
-    newlist = sorted(all_functions, key=lambda x: x.priority)
-    for f in newlist:
-        if f.sectionname in list(blocks.keys()):
-            f.readerfunction(network, blocks[f.sectionname])
+    selected, raw = _split_selection(sections, lambda: nullcontext(content))
+    with paused_gc():
+        blocks = {}
+        for blockname, block in iter_sections(content, selected, raw):
+            if blockname in raw:
+                network.raw_sections[blockname] = block
+            else:
+                blocks[blockname] = block
+        for f in SECTION_READERS:
+            if f.sectionname in blocks:
+                f.readerfunction(network, blocks[f.sectionname])
+
+        # Convert network to SI units
+        convert(network)
+
+    return network
+
+
+@logging_decorator(logger)
+def read_stream(
+    network: Network,
+    filename: Optional[str] = None,
+    content: Optional[str] = None,
+    sections: Optional[Iterable[str]] = None,
+) -> Network:
+    """Reads an EPANET input file section by section with bounded memory.
+
+    In contrast to read, the input file is never kept in memory as a whole. Instead, it is read twice: The first pass
+    collects the order of the sections and reads the sections referenced by most other sections (patterns and curves).
+    The second pass splits the file section by section and builds the components as soon as all sections they depend
+    on (i.e., sections read with a lower priority) have been read. The section's text is released afterwards. Sections
+    preceding their dependencies in the file (e.g., [COORDINATES] before [JUNCTIONS]) are kept and read later.
+
+    The resulting network is identical to the one created by read.
+
+    Args:
+      filename: filename of the EPANET input file
+      content: EPANET input file content as string
+      sections: names of the sections to be read, see read
+
+    Returns:
+      network object
+
+    """
+    if filename is not None:
+        logger.info(f"Streaming model from {filename!r}")
+
+        def lines():
+            return open(filename, "r")
+
+    elif content is not None:
+        logger.info("Streaming model from passed string")
+
+        def lines():
+            return io.StringIO(content)
+
+    else:
+        raise ValueError(
+            'Either one of the arguments "filename" or "content" have to be provided.'
+        )
+
+    selected, raw = _split_selection(sections, lines)
+    readers = {
+        f.sectionname: f
+        for f in SECTION_READERS
+        if selected is None or f.sectionname in selected
+    }
+    first_priority = SECTION_READERS[0].priority
+    definitions = {name for name, f in readers.items() if f.priority == first_priority}
+
+    with paused_gc():
+        # first pass: section order and definitions
+        order = []
+        blocks = {}
+        with lines() as fid:
+            for blockname, block in iter_sections(fid, definitions):
+                order.append(blockname)
+                if block is not None:
+                    blocks[blockname] = block
+        for f in SECTION_READERS:
+            if f.sectionname in blocks:
+                f.readerfunction(network, blocks.pop(f.sectionname))
+
+        # like in read, only the last occurrence of a section is used
+        last = {blockname: position for position, blockname in enumerate(order)}
+        remaining = collections.Counter(
+            readers[blockname].priority
+            for blockname in last
+            if blockname in readers and blockname not in definitions
+        )
+
+        # second pass: all other sections
+        pending = {}
+        with lines() as fid:
+            blocks = iter_sections(fid, readers.keys() - definitions, raw)
+            for position, (blockname, block) in enumerate(blocks):
+                if block is None or last[blockname] != position:
+                    continue
+                if blockname in raw:
+                    network.raw_sections[blockname] = block
+                    continue
+                pending[blockname] = block
+                for f in SECTION_READERS:
+                    if f.sectionname not in pending:
+                        continue
+                    if any(remaining[p] for p in remaining if p < f.priority):
+                        continue
+                    f.readerfunction(network, pending.pop(f.sectionname))
+                    remaining[f.priority] -= 1
 
-    # Convert network to SI units
-    convert(network)
+        # Convert network to SI units
+        convert(network)
 
     return network
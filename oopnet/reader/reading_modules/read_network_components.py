@@ -4,7 +4,7 @@ import logging
 
 from typing import TYPE_CHECKING
 
-from oopnet.reader.decorators import section_reader
+from oopnet.reader.decorators import section_reader, NODE_SECTIONS
 from oopnet.reader.factories.component_factory import ComponentFactory
 from oopnet.reader.factories.base import InvalidValveTypeError
 from oopnet.elements.system_operation import Pattern, Curve
@@ -32,10 +32,7 @@ from oopnet.utils.getters.element_lists import (
     get_pumps,
 )
 from oopnet.utils.adders.add_element import (
-    add_junction,
-    add_tank,
-    add_reservoir,
-    add_pipe,
+    _add_components,
     add_pump,
     add_valve,
 )
@@ -62,82 +59,60 @@ def read_title(network: Network, block: list):
         network.title = " ".join(vals)
 
 
-@section_reader("EMITTERS", 4)
+@section_reader("EMITTERS", 4, requires=NODE_SECTIONS)
 class EmitterFactory(ComponentFactory):
     """Factory for parsing and setting the emitter coefficients of Junctions."""
 
     def __new__(cls, network: Network, block: dict):
         logger.debug("Reading Emitters section")
-        for values in block:
-            junction, emittercoefficient = cls._parse_single(values, network)
-            junction.emittercoefficient = emittercoefficient
-
-    @classmethod
-    def _parse_single(cls, values, network) -> tuple:
-        attr_values = cls._pad_list(values["values"], 2)
         attr_names = ["junction", "emittercoefficient"]
         attr_cls = [Node, float]
-        attr_dict = cls._create_attr_dict(attr_names, attr_values, attr_cls, network)
-        return tuple(attr_dict[attr_name] for attr_name in attr_names)
+        for attr_dict, _ in cls._parse_block(block, attr_names, attr_cls, network):
+            attr_dict["junction"].emittercoefficient = attr_dict["emittercoefficient"]
 
 
-@section_reader("JUNCTIONS", 1)
+@section_reader("JUNCTIONS", 1, requires=("PATTERNS",))
 class JunctionFactory(ComponentFactory):
     """Factory for parsing and creating Junctions and adding them to a Network."""
 
     def __new__(cls, network: Network, block: dict):
         logger.debug("Reading Junctions section")
-        for values in block:
-            j = cls._parse_single(values, network)
-            add_junction(network, j)
-        logger.debug(f"Added {len(get_junctions(network))} Junctions")
-
-    @classmethod
-    def _parse_single(cls, values, network) -> Junction:
-        comment = cls._read_comment(values)
-        attr_values = cls._pad_list(values["values"], 4)
         attr_names = ["id", "elevation", "demand", "demandpattern"]
         attr_cls = [str, float, float, Pattern]
-        attr_dict = cls._create_attr_dict(attr_names, attr_values, attr_cls, network)
-        return Junction(**attr_dict, comment=comment)
+        junctions = [
+            Junction(**attr_dict, comment=comment)
+            for attr_dict, comment in cls._parse_block(
+                block, attr_names, attr_cls, network
+            )
+        ]
+        _add_components(junctions, network, network._nodes["junctions"])
+        logger.debug(f"Added {len(get_junctions(network))} Junctions")
 
 
-@section_reader("RESERVOIRS", 1)
+@section_reader("RESERVOIRS", 1, requires=("PATTERNS",))
 class ReservoirFactory(ComponentFactory):
     """Factory for parsing and creating Reservoirs and adding them to a Network."""
 
     def __new__(cls, network: Network, block: dict):
         logger.debug("Reading Reservoirs section")
-        for values in block:
-            r = cls._parse_single(values, network)
-            add_reservoir(network, r)
-        logger.debug(f"Added {len(get_reservoirs(network))} Reservoirs")
-
-    @classmethod
-    def _parse_single(cls, values, network) -> Reservoir:
-        comment = cls._read_comment(values)
-        attr_values = cls._pad_list(values["values"], 3)
         attr_names = ["id", "head", "headpattern"]
         attr_cls = [str, float, Pattern]
-        attr_dict = cls._create_attr_dict(attr_names, attr_values, attr_cls, network)
-        return Reservoir(**attr_dict, comment=comment)
+        reservoirs = [
+            Reservoir(**attr_dict, comment=comment)
+            for attr_dict, comment in cls._parse_block(
+                block, attr_names, attr_cls, network
+            )
+        ]
+        _add_components(reservoirs, network, network._nodes["reservoirs"])
+        logger.debug(f"Added {len(get_reservoirs(network))} Reservoirs")
 
 
-@section_reader("TANKS", 1)
+@section_reader("TANKS", 1, requires=("CURVES",))
 class TankFactory(ComponentFactory):
     """Factory for parsing and creating Tanks and adding them to a Network."""
 
     def __new__(cls, network: Network, block: dict):
         logger.debug("Reading Tanks section")
-        for values in block:
-            t = cls._parse_single(values, network)
-            add_tank(network, t)
-        logger.debug(f"Added {len(get_tanks(network))} Tanks")
-
-    @classmethod
-    def _parse_single(cls, values: dict, network: Network) -> Tank:
-        comment = cls._read_comment(values)
-        attr_values = cls._pad_list(values["values"], 8)
         attr_names = [
             "id",
             "elevation",
@@ -149,25 +124,22 @@ class TankFactory(ComponentFactory):
             "volumecurve",
         ]
         attr_cls = [str, float, float, float, float, float, float, Curve]
-        attr_dict = cls._create_attr_dict(attr_names, attr_values, attr_cls, network)
-        return Tank(**attr_dict, comment=comment)
+        tanks = [
+            Tank(**attr_dict, comment=comment)
+            for attr_dict, comment in cls._parse_block(
+                block, attr_names, attr_cls, network
+            )
+        ]
+        _add_components(tanks, network, network._nodes["tanks"])
+        logger.debug(f"Added {len(get_tanks(network))} Tanks")
 
 
-@section_reader("PIPES", 2)
+@section_reader("PIPES", 2, requires=NODE_SECTIONS)
 class PipeFactory(ComponentFactory):
     """Factory for parsing and creating Pipes and adding them to a Network."""
 
     def __new__(cls, network: Network, block: dict):
         logger.debug("Reading Pipes section")
-        for values in block:
-            p = cls._parse_single(values, network)
-            add_pipe(network, p)
-        logger.debug(f"Added {len(get_pipes(network))} Pipes")
-
-    @classmethod
-    def _parse_single(cls, values: dict, network: Network) -> Pipe:
-        comment = cls._read_comment(values)
-        attr_values = cls._pad_list(values["values"], 8)
         attr_names = [
             "id",
             "startnode",
@@ -179,11 +151,17 @@ class PipeFactory(ComponentFactory):
             "status",
         ]
         attr_cls = [str, Node, Node, float, float, float, float, str]
-        attr_dict = cls._create_attr_dict(attr_names, attr_values, attr_cls, network)
-        return Pipe(**attr_dict, comment=comment)
+        pipes = [
+            Pipe(**attr_dict, comment=comment)
+            for attr_dict, comment in cls._parse_block(
+                block, attr_names, attr_cls, network
+            )
+        ]
+        _add_components(pipes, network, network._links["pipes"])
+        logger.debug(f"Added {len(get_pipes(network))} Pipes")
 
 
-@section_reader("PUMPS", 2)
+@section_reader("PUMPS", 2, requires=(*NODE_SECTIONS, "CURVES", "PATTERNS"))
 class PumpFactory(ComponentFactory):
     """Factory for parsing and creating Pumps and adding them to a Network."""
 
@@ -244,7 +222,7 @@ class PumpFactory(ComponentFactory):
         return ComponentFactory._pad_list(alist, target_length)
 
 
-@section_reader("VALVES", 2)
+@section_reader("VALVES", 2, requires=(*NODE_SECTIONS, "CURVES"))
 class ValveFactory(ComponentFactory):
     """Factory for parsing and creating Valves and adding them to a Network."""
 
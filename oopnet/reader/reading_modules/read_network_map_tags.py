@@ -2,10 +2,8 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 import logging
 
-from oopnet.utils.getters import get_link
-
-from oopnet.utils.getters.get_by_id import get_node
-from oopnet.reader.decorators import section_reader
+from oopnet.reader.decorators import section_reader, LINK_SECTIONS, NODE_SECTIONS
+from oopnet.reader.factories.component_factory import ComponentFactory
 from oopnet.elements.network_map_tags import Vertex
 
 if TYPE_CHECKING:
@@ -15,7 +13,7 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
-@section_reader("COORDINATES", 4)
+@section_reader("COORDINATES", 4, requires=NODE_SECTIONS)
 def read_coordinates(network: Network, block: list):
     """Reads coordinates from block.
 
@@ -25,16 +23,17 @@ def read_coordinates(network: Network, block: list):
 
     """
     logger.debug("Reading Coordinates section")
+    get_node = ComponentFactory._create_lookup(*network._nodes.values())
     for vals in block:
         vals = vals["values"]
-        j = get_node(network, vals[0])
+        j = get_node(vals[0])
         if len(vals) > 1:
             j.xcoordinate = float(vals[1])
         if len(vals) > 2:
             j.ycoordinate = float(vals[2])
 
 
-@section_reader("VERTICES", 4)
+@section_reader("VERTICES", 4, requires=LINK_SECTIONS)
 # ToDo: Implement Vertices Reader
 def read_vertices(network: Network, block: list):
     """Reads Link vertices from block.
@@ -45,9 +44,10 @@ def read_vertices(network: Network, block: list):
 
     """
     logger.debug("Reading Vertices section")
+    get_link = ComponentFactory._create_lookup(*network._links.values())
     for vals in block:
         vals = vals["values"]
-        j = get_link(network, vals[0])
+        j = get_link(vals[0])
         v = Vertex(float(vals[1]), float(vals[2]))
         j.vertices.append(v)
 
@@ -8,7 +8,7 @@ import logging
 
 from oopnet.utils.getters.element_lists import get_pattern_ids
 from oopnet.utils.getters.get_by_id import get_node, get_link, get_pattern
-from oopnet.reader.decorators import section_reader
+from oopnet.reader.decorators import section_reader, LINK_SECTIONS, NODE_SECTIONS
 from oopnet.elements.network_components import Node
 from oopnet.elements.system_operation import Pattern
 
@@ -96,7 +96,7 @@ class OptionReportReader:
         pass
 
 
-@section_reader("OPTIONS", 3)
+@section_reader("OPTIONS", 3, requires=(*NODE_SECTIONS, "PATTERNS"))
 class OptionReader(OptionReportReader):
     _mapping = {
         "UNITS": ("units", str),
@@ -243,7 +243,7 @@ def read_times(network: Network, block: list):
             t.statistic = vals[1].upper()
 
 
-@section_reader("REPORT", 3)
+@section_reader("REPORT", 3, requires=NODE_SECTIONS + LINK_SECTIONS)
 def read_report(network: Network, block: list):
     """Reads report settings from block.
 
@@ -21,10 +21,8 @@ from oopnet.utils.getters import (
     get_junction,
     get_link_ids,
     get_node_ids,
-    get_curve_ids,
-    get_pattern_ids,
 )
-from oopnet.reader.decorators import section_reader
+from oopnet.reader.decorators import section_reader, LINK_SECTIONS, NODE_SECTIONS
 from oopnet.utils.adders import add_curve, add_pattern, add_rule
 
 if TYPE_CHECKING:
@@ -48,7 +46,7 @@ def read_curves(network: Network, block: list):
         vals = vals["values"]
         exists = False
 
-        if vals[0] in get_curve_ids(network):
+        if vals[0] in network._curves:
             c = get_curve(network, vals[0])
             exists = True
         else:
@@ -91,7 +89,7 @@ def read_patterns(network: Network, block: list):
 
         exists = False
 
-        if vals[0] in get_pattern_ids(network):
+        if vals[0] in network._patterns:
             p = get_pattern(network, vals[0])
             exists = True
         else:
@@ -123,7 +121,7 @@ def read_patterns(network: Network, block: list):
             add_pattern(network, p)
 
 
-@section_reader("ENERGY", 3)
+@section_reader("ENERGY", 3, requires=("PUMPS", "CURVES", "PATTERNS"))
 def read_energy(network: Network, block: list):
     """Reads energy from block.
 
@@ -166,7 +164,7 @@ def read_energy(network: Network, block: list):
             network.energies.append(e)
 
 
-@section_reader("STATUS", 3)
+@section_reader("STATUS", 3, requires=LINK_SECTIONS)
 def read_status(network: Network, block: list):
     """Reads status information from block.
 
@@ -186,7 +184,7 @@ def read_status(network: Network, block: list):
             l.status = vals[1].upper()
 
 
-@section_reader("CONTROLS", 3)
+@section_reader("CONTROLS", 3, requires=NODE_SECTIONS + LINK_SECTIONS)
 def read_controls(network: Network, block: list):
     """Reads controls from block.
 
@@ -244,7 +242,7 @@ def read_controls(network: Network, block: list):
             network.controls.append(c)
 
 
-@section_reader("RULES", 3)
+@section_reader("RULES", 3, requires=NODE_SECTIONS + LINK_SECTIONS)
 def read_rules(network: Network, block: list):
     """Reads rules from block.
 
@@ -314,7 +312,7 @@ def read_rules(network: Network, block: list):
                 r.condition.append(ac)
 
 
-@section_reader("DEMANDS", 2)
+@section_reader("DEMANDS", 2, requires=("JUNCTIONS", "PATTERNS"))
 def read_demands(network: Network, block: list):
     """Reads demands from block.
 
@@ -3,7 +3,7 @@ from typing import TYPE_CHECKING
 import logging
 
 from oopnet.utils.getters.get_by_id import get_node, get_link, get_pattern
-from oopnet.reader.decorators import section_reader
+from oopnet.reader.decorators import section_reader, LINK_SECTIONS, NODE_SECTIONS
 
 if TYPE_CHECKING:
     from oopnet.elements.network import Network
@@ -12,7 +12,7 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
-@section_reader("QUALITY", 3)
+@section_reader("QUALITY", 3, requires=NODE_SECTIONS)
 def read_quality(network: Network, block: list):
     """Reads quality settings from block.
 
@@ -29,7 +29,7 @@ def read_quality(network: Network, block: list):
             j.initialquality = float(vals[1])
 
 
-@section_reader("REACTIONS", 3)
+@section_reader("REACTIONS", 3, requires=LINK_SECTIONS)
 def read_reaction(network: Network, block: list):
     """Reads reaction settings from block.
 
@@ -84,7 +84,7 @@ def read_reaction(network: Network, block: list):
                 r.tank.append(p)
 
 
-@section_reader("SOURCES", 3)
+@section_reader("SOURCES", 3, requires=(*NODE_SECTIONS, "PATTERNS"))
 def read_sources(network: Network, block: list):
     """Reads sources from block.
 
@@ -105,7 +105,7 @@ def read_sources(network: Network, block: list):
             n.sourcepattern = get_pattern(network, vals[3])
 
 
-@section_reader("MIXING", 3)
+@section_reader("MIXING", 3, requires=NODE_SECTIONS)
 def read_mixing(network: Network, block: list):
     """Reads mixing settings from block.
 
@@ -0,0 +1,688 @@
+"""Binary snapshots of OOPNET networks.
+
+A snapshot stores a complete Network in a single binary file: a magic number, the length of a JSON header, the JSON
+header and a data section with all arrays. The components of every registry (Patterns, Curves, Junctions, ..., Rules)
+are stored column-wise: one array per attribute and component class, or just a value in the header if all components
+share it. Strings are stored once in a shared string table and referenced by their position, references to other
+components by the position of the referenced component. Attributes that don't fit into an array (e.g., Link vertices,
+Controls, Rule conditions or the network's options) are serialised to JSON.
+
+Loading a snapshot doesn't parse any text. The arrays are read directly from the file's buffer and the components are
+created without calling their __init__ methods.
+"""
+
+from __future__ import annotations
+import dataclasses
+import datetime
+import hashlib
+import importlib
+import json
+import logging
+import os
+import struct
+import tempfile
+from operator import attrgetter
+from typing import Any, Optional, TYPE_CHECKING
+
+import numpy as np
+
+from oopnet import __version__
+from oopnet.elements.base import NetworkComponent
+from oopnet.elements.component_registry import ComponentNotExistingError
+from oopnet.elements.network_components import Node, Link
+from oopnet.elements.system_operation import Pattern, Curve
+from oopnet.reader.read import read, read_stream, paused_gc
+
+if TYPE_CHECKING:
+    from oopnet.elements.network import Network
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 2
+_MAGIC = b"OOPNETSN"
+# data section alignment in bytes
+_ALIGNMENT = 8
+# suffix of the sidecar snapshots used by Network.read(filename, cache=True)
+SNAPSHOT_SUFFIX = ".snapshot"
+
+# registries in the order they are stored and restored (referenced components come first)
+_REGISTRIES = [
+    ("_patterns", None),
+    ("_curves", None),
+    ("_nodes", "junctions"),
+    ("_nodes", "reservoirs"),
+    ("_nodes", "tanks"),
+    ("_links", "pipes"),
+    ("_links", "pumps"),
+    ("_links", "valves"),
+    ("_rules", None),
+]
+_KINDS = {
+    "_patterns": "pattern",
+    "_curves": "curve",
+    "_nodes": "node",
+    "_links": "link",
+}
+_REGISTRY_FIELDS = {"_nodes", "_links", "_curves", "_patterns", "_rules"}
+# Network fields that aren't stored in snapshots
+_SKIPPED_FIELDS = _REGISTRY_FIELDS | {"_section_cache"}
+_KIND_BASES = [(Node, "node"), (Link, "link"), (Pattern, "pattern"), (Curve, "curve")]
+_TYPE_KINDS: dict[type, Optional[str]] = {}
+
+
+class _Absent:
+    """Marker for attributes that are missing on a component."""
+
+
+_ABSENT = _Absent()
+
+
+def _type_kind(cls: type) -> Optional[str]:
+    """Returns the kind of components of a class that can be referenced or a Python None object."""
+    if cls not in _TYPE_KINDS:
+        _TYPE_KINDS[cls] = next(
+            (kind for base, kind in _KIND_BASES if issubclass(cls, base)), None
+        )
+    return _TYPE_KINDS[cls]
+
+
+def _kind(value: Any) -> Optional[str]:
+    """Returns the kind of a component that can be referenced or a Python None object."""
+    return _type_kind(type(value))
+
+
+def _slots(cls: type) -> list[str]:
+    """Returns the names of the slots of a class and its bases."""
+    return [
+        name
+        for base in reversed(cls.__mro__)
+        for name in base.__dict__.get("__slots__", ())
+    ]
+
+
+def _attributes(objs: list) -> list[tuple[str, list, Optional[list]]]:
+    """Collects the attributes of objects of the same class.
+
+    Args:
+      objs: objects storing their attributes in their __dict__ or in slots
+
+    Returns:
+      attribute names, values (None for missing attributes) and the objects having the attribute (None if all have it)
+
+    """
+    if not hasattr(objs[0], "__dict__"):
+        names = _slots(type(objs[0]))
+        try:
+            rows = list(map(attrgetter(*names), objs))
+        except AttributeError:
+            states = [
+                {name: getattr(obj, name) for name in names if hasattr(obj, name)}
+                for obj in objs
+            ]
+        else:
+            return [
+                (name, list(values), None) for name, values in zip(names, zip(*rows))
+            ]
+    else:
+        states = list(map(vars, objs))
+    layouts = set(map(tuple, states))
+    names = list(dict.fromkeys(name for layout in layouts for name in layout))
+    attributes = []
+    for name in names:
+        present = None
+        if len(layouts) > 1:
+            present = [name in state for state in states]
+            if all(present):
+                present = None
+        attributes.append((name, [state.get(name) for state in states], present))
+    return attributes
+
+
+def _class_name(cls: type) -> str:
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def _class(name: str) -> type:
+    module, qualname = name.split(":")
+    if module.split(".")[0] != "oopnet":
+        raise ValueError(f"Snapshots can only contain OOPNET objects, found {name!r}.")
+    obj = importlib.import_module(module)
+    for attr in qualname.split("."):
+        obj = getattr(obj, attr)
+    return obj
+
+
+class _Encoder:
+    """Converts a Network into arrays and a JSON header."""
+
+    def __init__(self, network: Network):
+        self.network = network
+        self.chunks: list[bytes] = []
+        self.size = 0
+        self.strings: dict[str, int] = {}
+        self.positions: dict[str, dict[int, int]] = {
+            kind: {} for kind in _KINDS.values()
+        }
+        for attr, key in _REGISTRIES:
+            if attr in _KINDS:
+                positions = self.positions[_KINDS[attr]]
+                for obj in self._registry(attr, key).values():
+                    positions[id(obj)] = len(positions)
+
+    def _registry(self, attr: str, key: Optional[str]) -> dict:
+        registry = getattr(self.network, attr)
+        return registry if key is None else registry[key]
+
+    def _add_array(self, array: np.ndarray) -> dict:
+        """Appends an array to the data section and returns its description."""
+        padding = -self.size % _ALIGNMENT
+        if padding:
+            self.chunks.append(bytes(padding))
+            self.size += padding
+        description = {
+            "dtype": array.dtype.str,
+            "offset": self.size,
+            "count": len(array),
+        }
+        data = array.tobytes()
+        self.chunks.append(data)
+        self.size += len(data)
+        return description
+
+    def _add_indices(self, indices: list[int]) -> dict:
+        """Appends positions (-1 for None) as the smallest fitting integer array."""
+        array = np.array(indices, dtype=np.int64)
+        if not len(array) or array.max() < np.iinfo(np.int32).max:
+            array = array.astype(np.int32)
+        return self._add_array(array)
+
+    def _add_strings(self, values: list) -> dict:
+        strings = self.strings
+        return self._add_indices(
+            [
+                -1 if value is None else strings.setdefault(value, len(strings))
+                for value in values
+            ]
+        )
+
+    def _add_json(self, value: Any) -> dict:
+        return self._add_array(
+            np.frombuffer(json.dumps(value).encode(), dtype=np.uint8)
+        )
+
+    def value(self, value: Any) -> Any:
+        """Converts a value to a JSON serialisable object."""
+        if value is None or isinstance(value, (bool, str)):
+            return value
+        if isinstance(value, (int, float)):
+            return value
+        if isinstance(value, np.generic):
+            return value.item()
+        if isinstance(value, list):
+            return [self.value(x) for x in value]
+        if isinstance(value, tuple):
+            return {"$tuple": [self.value(x) for x in value]}
+        if isinstance(value, dict):
+            return {"$dict": [[self.value(k), self.value(v)] for k, v in value.items()]}
+        if isinstance(value, datetime.timedelta):
+            return {"$timedelta": [value.days, value.seconds, value.microseconds]}
+        if isinstance(value, datetime.datetime):
+            return {"$datetime": value.isoformat()}
+        if isinstance(value, datetime.time):
+            return {"$time": value.isoformat()}
+        if isinstance(value, np.ndarray):
+            return {"$array": value.tolist(), "dtype": value.dtype.str}
+        if value is self.network:
+            return {"$network": True}
+        kind = _kind(value)
+        if kind is not None:
+            if id(value) not in self.positions[kind]:
+                raise ValueError(
+                    f"{type(value).__name__} {value.id!r} is referenced but isn't part of the network."
+                )
+            return {"$ref": kind, "id": value.id}
+        if dataclasses.is_dataclass(value) and not isinstance(value, type):
+            return {
+                "$object": _class_name(type(value)),
+                "state": {k: self.value(v) for k, v in vars(value).items()},
+            }
+        raise TypeError(
+            f"Objects of type {type(value).__name__} can't be stored in snapshots."
+        )
+
+    def _reference_positions(self, types: set, values: list) -> Optional[tuple]:
+        """Returns the kind and the positions of referenced components or a Python None object."""
+        kinds = {_type_kind(cls) for cls in types if cls is not type(None)}
+        if len(kinds) != 1 or None in kinds:
+            return None
+        kind = kinds.pop()
+        positions = self.positions[kind]
+        try:
+            return kind, [
+                -1 if value is None else positions[id(value)] for value in values
+            ]
+        except KeyError:
+            # components that aren't part of the network are reported by value()
+            return None
+
+    def column(self, name: str, values: list, present: Optional[list] = None) -> dict:
+        """Stores the values of an attribute of many components.
+
+        Args:
+          name: attribute name
+          values: attribute values
+          present: if not all components have the attribute, a list of booleans marking the ones that have it
+
+        Returns:
+          column description for the header
+
+        """
+        column = {"name": name}
+        if present is not None:
+            column["present"] = self._add_array(np.array(present, dtype=bool))
+            values = [value for value, p in zip(values, present) if p]
+
+        types = set(map(type, values))
+        primitive = types <= {float, int, bool, str, type(None)}
+        reference = None if primitive else self._reference_positions(types, values)
+        if values and all(value is self.network for value in values):
+            column["type"] = "network"
+        elif len(types) == 1 and primitive and values.count(values[0]) == len(values):
+            column["type"] = "const"
+            column["value"] = values[0]
+        elif types <= {float}:
+            column["type"] = "float"
+            column["data"] = self._add_array(np.array(values, dtype=np.float64))
+        elif types == {int}:
+            column["type"] = "int"
+            column["data"] = self._add_array(np.array(values, dtype=np.int64))
+        elif types == {bool}:
+            column["type"] = "bool"
+            column["data"] = self._add_array(np.array(values, dtype=bool))
+        elif types <= {str, type(None)}:
+            column["type"] = "str"
+            column["data"] = self._add_strings(values)
+        elif types == {float, type(None)}:
+            column["type"] = "optfloat"
+            column["none"] = self._add_array(
+                np.array([value is None for value in values])
+            )
+            column["data"] = self._add_array(
+                np.array(
+                    [np.nan if value is None else value for value in values],
+                    dtype=np.float64,
+                )
+            )
+        elif reference is not None:
+            column["type"] = "ref"
+            column["kind"], positions = reference
+            column["data"] = self._add_indices(positions)
+        elif (
+            types
+            and all(issubclass(cls, list) for cls in types)
+            and all(type(x) is float for value in values for x in value)
+        ):
+            column["type"] = "floats"
+            column["lengths"] = self._add_array(
+                np.array([len(value) for value in values], dtype=np.int64)
+            )
+            column["data"] = self._add_array(
+                np.array([x for value in values for x in value], dtype=np.float64)
+            )
+        else:
+            column["type"] = "json"
+            column["data"] = self._add_json([self.value(value) for value in values])
+        return column
+
+    def registry(self, attr: str, key: Optional[str]) -> dict:
+        """Stores all components of a registry.
+
+        Args:
+          attr: name of the registry's Network attribute
+          key: key of the ComponentRegistry in a SuperComponentRegistry
+
+        Returns:
+          registry description for the header
+
+        """
+        registry = self._registry(attr, key)
+        objs = list(registry.values())
+        classes = list(dict.fromkeys(type(obj) for obj in objs))
+        class_positions = {cls: position for position, cls in enumerate(classes)}
+        description = {
+            "attr": attr,
+            "key": key,
+            "keys": self._add_strings(list(registry.keys())),
+            "order": self._add_indices([class_positions[type(obj)] for obj in objs]),
+            "classes": [],
+        }
+        for cls in classes:
+            columns = [
+                self.column(name, values, present)
+                for name, values, present in _attributes(
+                    [obj for obj in objs if type(obj) is cls]
+                )
+            ]
+            description["classes"].append(
+                {"class": _class_name(cls), "columns": columns}
+            )
+        return description
+
+    def encode(self, source: Optional[dict] = None) -> bytes:
+        """Encodes the network.
+
+        Args:
+          source: description of the EPANET input file the network was read from
+
+        Returns:
+          snapshot file content
+
+        """
+        registries = [self.registry(attr, key) for attr, key in _REGISTRIES]
+        network = self._add_json(
+            {
+                field.name: self.value(getattr(self.network, field.name))
+                for field in dataclasses.fields(self.network)
+                if field.name not in _SKIPPED_FIELDS
+            }
+        )
+        strings = list(self.strings)
+        if any("\0" in string for string in strings):
+            string_encoding = "json"
+            string_table = json.dumps(strings)
+        else:
+            string_encoding = "nul"
+            string_table = "\0".join(strings)
+        header = {
+            "version": SNAPSHOT_VERSION,
+            "source": source,
+            "strings": self._add_array(
+                np.frombuffer(string_table.encode(), dtype=np.uint8)
+            ),
+            "string_encoding": string_encoding,
+            "registries": registries,
+            "network": network,
+        }
+        header = json.dumps(header).encode()
+        header += b" " * (-(len(_MAGIC) + 8 + len(header)) % _ALIGNMENT)
+        return b"".join([_MAGIC, struct.pack("<Q", len(header)), header] + self.chunks)
+
+
+class _Decoder:
+    """Restores a Network from the arrays and the JSON header of a snapshot."""
+
+    def __init__(self, network: Network, buffer: bytes, header: dict, offset: int):
+        self.network = network
+        self.buffer = buffer
+        self.offset = offset
+        self.header = header
+        table = self.array(header["strings"]).tobytes().decode()
+        if header["string_encoding"] == "json":
+            self.strings = json.loads(table)
+        else:
+            self.strings = table.split("\0") if table else []
+        # index -1 is used for None
+        self.strings.append(None)
+        self.components: dict[str, list] = {kind: [] for kind in _KINDS.values()}
+        self._lookups: dict[str, dict] = {}
+
+    def _lookup(self, kind: str, id: str) -> NetworkComponent:
+        if kind not in self._lookups:
+            self._lookups[kind] = {obj.id: obj for obj in self.components[kind]}
+        try:
+            return self._lookups[kind][id]
+        except KeyError:
+            raise ComponentNotExistingError(id) from None
+
+    def _object_hook(self, obj: dict) -> Any:
+        if "$tuple" in obj:
+            return tuple(obj["$tuple"])
+        if "$dict" in obj:
+            return {k: v for k, v in obj["$dict"]}
+        if "$timedelta" in obj:
+            days, seconds, microseconds = obj["$timedelta"]
+            return datetime.timedelta(
+                days=days, seconds=seconds, microseconds=microseconds
+            )
+        if "$datetime" in obj:
+            return datetime.datetime.fromisoformat(obj["$datetime"])
+        if "$time" in obj:
+            return datetime.time.fromisoformat(obj["$time"])
+        if "$array" in obj:
+            return np.array(obj["$array"], dtype=obj["dtype"])
+        if "$network" in obj:
+            return self.network
+        if "$ref" in obj:
+            return self._lookup(obj["$ref"], obj["id"])
+        if "$object" in obj:
+            value = object.__new__(_class(obj["$object"]))
+            value.__dict__.update(obj["state"])
+            return value
+        return obj
+
+    def array(self, description: dict) -> np.ndarray:
+        return np.frombuffer(
+            self.buffer,
+            dtype=description["dtype"],
+            count=description["count"],
+            offset=self.offset + description["offset"],
+        )
+
+    def json(self, description: dict) -> Any:
+        return json.loads(
+            self.array(description).tobytes().decode(), object_hook=self._object_hook
+        )
+
+    def column(self, column: dict, length: int) -> list:
+        """Restores the values of an attribute of many components."""
+        present = None
+        if "present" in column:
+            present = self.array(column["present"])
+            length = int(present.sum())
+
+        kind = column["type"]
+        if kind == "network":
+            values = [self.network] * length
+        elif kind == "const":
+            values = [column["value"]] * length
+        elif kind in {"float", "int", "bool"}:
+            values = self.array(column["data"]).tolist()
+        elif kind == "str":
+            strings = self.strings
+            values = [strings[i] for i in self.array(column["data"]).tolist()]
+        elif kind == "optfloat":
+            values = self.array(column["data"]).tolist()
+            for i in np.flatnonzero(self.array(column["none"])).tolist():
+                values[i] = None
+        elif kind == "ref":
+            components = self.components[column["kind"]] + [None]
+            values = [components[i] for i in self.array(column["data"]).tolist()]
+        elif kind == "floats":
+            flat = self.array(column["data"]).tolist()
+            ends = np.cumsum(self.array(column["lengths"])).tolist()
+            values = [flat[start:end] for start, end in zip([0] + ends[:-1], ends)]
+        elif kind == "json":
+            values = self.json(column["data"])
+        else:
+            raise ValueError(f"Unknown snapshot column type {kind!r}.")
+
+        if present is not None:
+            values = iter(values)
+            values = [next(values) if p else _ABSENT for p in present.tolist()]
+        return values
+
+    def registry(self, description: dict):
+        """Restores all components of a registry."""
+        order = self.array(description["order"])
+        new = object.__new__
+        objs_by_class = []
+        for position, cls_description in enumerate(description["classes"]):
+            cls = _class(cls_description["class"])
+            length = int(np.count_nonzero(order == position))
+            names = [column["name"] for column in cls_description["columns"]]
+            columns = [
+                self.column(column, length) for column in cls_description["columns"]
+            ]
+            objs = [new(cls) for _ in range(length)]
+            if not cls.__dictoffset__:
+                # slotted components without __dict__, the attributes are set column-wise by the slots' descriptors
+                for name, column in zip(names, columns):
+                    setter = getattr(cls, name).__set__
+                    for obj, value in zip(objs, column):
+                        if value is not _ABSENT:
+                            setter(obj, value)
+            elif any("present" in column for column in cls_description["columns"]):
+                for obj, row in zip(objs, zip(*columns)):
+                    obj.__dict__ = {
+                        name: value
+                        for name, value in zip(names, row)
+                        if value is not _ABSENT
+                    }
+            else:
+                for obj, row in zip(objs, zip(*columns)):
+                    obj.__dict__ = dict(zip(names, row))
+            objs_by_class.append(iter(objs))
+
+        if len(objs_by_class) == 1:
+            objs = list(objs_by_class[0])
+        else:
+            objs = [next(objs_by_class[position]) for position in order.tolist()]
+
+        registry = getattr(self.network, description["attr"])
+        if description["key"] is not None:
+            registry = registry[description["key"]]
+        strings = self.strings
+        dict.update(
+            registry,
+            zip([strings[i] for i in self.array(description["keys"]).tolist()], objs),
+        )
+        if description["attr"] in _KINDS:
+            kind = _KINDS[description["attr"]]
+            self.components[kind].extend(objs)
+            self._lookups.pop(kind, None)
+
+    def decode(self) -> Network:
+        for description in self.header["registries"]:
+            self.registry(description)
+        for name, value in self.json(self.header["network"]).items():
+            setattr(self.network, name, value)
+        return self.network
+
+
+def _read_header(buffer: bytes) -> tuple[dict, int]:
+    """Reads the header of a snapshot and returns it with the data section's offset."""
+    if buffer[: len(_MAGIC)] != _MAGIC:
+        raise ValueError("The file is not an OOPNET snapshot.")
+    start = len(_MAGIC) + 8
+    (length,) = struct.unpack("<Q", buffer[len(_MAGIC) : start])
+    header = json.loads(buffer[start : start + length].decode())
+    if header.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(
+            f"Snapshot version {header.get('version')} is not supported (expected {SNAPSHOT_VERSION})."
+        )
+    return header, start + length
+
+
+def save_snapshot(network: Network, filename: str, source: Optional[dict] = None):
+    """Saves a network as a binary snapshot.
+
+    The snapshot is written to a temporary file first and then moved to filename, so other processes never read
+    incomplete snapshots.
+
+    Args:
+      network: OOPNET network object
+      filename: snapshot filename
+      source: description of the EPANET input file the network was read from (used by the sidecar cache)
+
+    """
+    logger.info(f"Saving snapshot to {filename!r}")
+    with paused_gc():
+        content = _Encoder(network).encode(source)
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(content)
+        os.replace(tmp, filename)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def load_snapshot(
+    network: Network, filename: str, source: Optional[dict] = None
+) -> Network:
+    """Loads a network from a binary snapshot.
+
+    Args:
+      network: empty OOPNET network object the snapshot is restored into
+      filename: snapshot filename
+      source: if passed, the snapshot is only loaded if it was created from this EPANET input file, otherwise a
+        ValueError is raised
+
+    Returns:
+      network object
+
+    """
+    logger.info(f"Loading snapshot from {filename!r}")
+    with open(filename, "rb") as file:
+        buffer = file.read()
+    header, offset = _read_header(buffer)
+    if source is not None and header["source"] != source:
+        raise ValueError(f"The snapshot {filename!r} is outdated.")
+    with paused_gc():
+        return _Decoder(network, buffer, header, offset).decode()
+
+
+def _describe_source(filename: str) -> dict:
+    """Describes an EPANET input file by its modification time, size and SHA-256 hash.
+
+    The OOPNET version is part of the description, since networks read by other versions (e.g., with a different unit
+    conversion) may differ even though the input file didn't change.
+
+    """
+    stat = os.stat(filename)
+    sha = hashlib.sha256()
+    with open(filename, "rb") as file:
+        sha.update(file.read())
+    return {
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": sha.hexdigest(),
+        "oopnet": __version__,
+    }
+
+
+def read_cached(network: Network, filename: str, stream: bool = False) -> Network:
+    """Reads an EPANET input file using a sidecar snapshot as cache.
+
+    If a snapshot (filename + SNAPSHOT_SUFFIX) exists, that was created by the same OOPNET and snapshot versions from a
+    file with the same modification time and SHA-256 hash, the network is loaded from the snapshot. Otherwise, the input file is read and the snapshot is
+    (re)created. Failing to write the snapshot (e.g., in a read-only directory) is logged but doesn't raise an error.
+
+    Args:
+      network: empty OOPNET network object
+      filename: filename of the EPANET input file
+      stream: if True, the input file is read with read_stream
+
+    Returns:
+      network object
+
+    """
+    sidecar = filename + SNAPSHOT_SUFFIX
+    source = _describe_source(filename)
+    if os.path.isfile(sidecar):
+        try:
+            return load_snapshot(network, sidecar, source=source)
+        except (OSError, ValueError, KeyError, struct.error) as e:
+            logger.info(f"Not using snapshot {sidecar!r}: {e}")
+            network = type(network)()
+    if stream:
+        read_stream(network, filename=filename)
+    else:
+        read(network, filename=filename)
+    try:
+        save_snapshot(network, sidecar, source=source)
+    except OSError as e:
+        logger.warning(f"Couldn't save snapshot {sidecar!r}: {e}")
+    return network
@@ -13,18 +13,46 @@ Possible: (This are the flow units)
 - CMD ... cubic meters per day
 
 The Input of OOPNET is possible in all units, but OOPNET uses and returns SI-Units (LPS).
+
+The conversion is table-driven: ATTRIBUTE_QUANTITIES and CURVE_QUANTITIES list the unit-bearing attributes of the
+network components and the physical quantity they describe, unit_factors returns the conversion factor of every
+quantity for a flow unit. Each attribute is converted once for all components at the same time.
 """
-import logging
 
-import numpy as np
+from __future__ import annotations
+import logging
+from contextlib import contextmanager
+from operator import attrgetter
+from typing import Any, Iterator, Optional, TYPE_CHECKING
 
+from oopnet.elements.network_components import (
+    Junction,
+    Reservoir,
+    Tank,
+    Pipe,
+    Pump,
+    Valve,
+    PRV,
+    PSV,
+    PBV,
+    FCV,
+    GPV,
+)
+from oopnet.elements.system_operation import Curve
 from oopnet.utils.getters.element_lists import (
     get_junctions,
     get_tanks,
     get_reservoirs,
     get_pipes,
+    get_pumps,
+    get_valves,
+    get_controls,
+    get_rules,
 )
 
+if TYPE_CHECKING:
+    from oopnet.elements.network import Network
+
 logger = logging.getLogger(__name__)
 
 FEET2METER = 0.3048
@@ -41,120 +69,297 @@ MLD2LPS = 11.5741
 CMH2LPS = 0.27778
 CMD2LPS = 0.0115741
 
+# flow units and their conversion factors to LPS
+FLOW_UNITS = {
+    "CFS": CFS2LPS,
+    "GPM": GPM2LPS,
+    "MGD": MGD2LPS,
+    "IMGD": IMGD2LPS,
+    "AFD": AFD2LPS,
+    "LPS": 1.0,
+    "LPM": LPM2LPS,
+    "MLD": MLD2LPS,
+    "CMH": CMH2LPS,
+    "CMD": CMD2LPS,
+}
+US_UNITS = ("CFS", "GPM", "MGD", "IMGD", "AFD")
+# significant digits of values converted for writing, removes the rounding errors of converting back and forth
+SIGNIFICANT_DIGITS = 12
+
+# unit-bearing component attributes and their quantities
+ATTRIBUTE_QUANTITIES = (
+    (Junction, "elevation", "length"),
+    (Junction, "demand", "flow"),
+    (Junction, "emittercoefficient", "emitter"),
+    (Reservoir, "elevation", "length"),
+    (Reservoir, "head", "length"),
+    (Tank, "elevation", "length"),
+    (Tank, "initlevel", "length"),
+    (Tank, "minlevel", "length"),
+    (Tank, "maxlevel", "length"),
+    (Tank, "diameter", "length"),
+    (Tank, "minvolume", "volume"),
+    (Pipe, "length", "length"),
+    (Pipe, "diameter", "diameter"),
+    (Pipe, "roughness", "roughness"),
+    (Pipe, "reactionwall", "wallreaction"),
+    (Pump, "power", "power"),
+    (Valve, "diameter", "diameter"),
+    (PRV, "maximum_pressure", "pressure"),
+    (PSV, "pressure_limit", "pressure"),
+    (PBV, "pressure_drop", "pressure"),
+    (FCV, "maximum_flow", "flow"),
+)
+
+# component attributes referencing curves and the quantities of the curves' x and y values
+CURVE_QUANTITIES = (
+    (Pump, "head", "flow", "length"),
+    (Tank, "volumecurve", "length", "volume"),
+    (GPV, "headloss_curve", "flow", "length"),
+)
+
+# quantities of valve settings used in controls and rules
+SETTING_QUANTITIES = {PRV: "pressure", PSV: "pressure", PBV: "pressure", FCV: "flow"}
+
+# quantities of the attributes used in rule conditions
+RULE_QUANTITIES = {
+    "DEMAND": "flow",
+    "HEAD": "length",
+    "LEVEL": "length",
+    "PRESSURE": "pressure",
+    "FLOW": "flow",
+}
+
+_COMPONENT_GETTERS = {
+    Junction: get_junctions,
+    Reservoir: get_reservoirs,
+    Tank: get_tanks,
+    Pipe: get_pipes,
+    Pump: get_pumps,
+    Valve: get_valves,
+}
+
+
+def unit_factors(
+    units: str,
+    headloss: str = "H-W",
+    emitterexponent: float = 0.5,
+    orderwall: float = 1.0,
+) -> dict[str, float]:
+    """Returns the factors for converting all quantities from an EPANET flow unit to OOPNET's SI units.
+
+    Args:
+      units: EPANET flow unit, e.g. 'GPM'
+      headloss: headloss formula, Darcy-Weisbach roughnesses have units
+      emitterexponent: exponent of the emitters' pressure, the emitter coefficients' units depend on it
+      orderwall: order of wall reactions, the wall reaction coefficients' units depend on it
+
+    Returns:
+      quantity names and factors
+
+    """
+    try:
+        flow = FLOW_UNITS[units.upper()]
+    except KeyError:
+        raise ValueError(f"Illegal unit {units} defined.")
+    us = units.upper() in US_UNITS
+    length = FEET2METER if us else 1.0
+    pressure = PSI2METER if us else 1.0
+    return {
+        "flow": flow,
+        "length": length,
+        "diameter": INCH2MILLIMETER if us else 1.0,
+        "volume": length**3,
+        "power": HORESEPOWER2KILOWATTS if us else 1.0,
+        "pressure": pressure,
+        # millifeet and millimeters
+        "roughness": length if headloss == "D-W" else 1.0,
+        "emitter": flow / pressure**emitterexponent,
+        # zero-order wall reactions are given per area, first-order ones per length
+        "wallreaction": length**-2 if orderwall == 0 else length,
+    }
+
+
+def _network_factors(network: Network, units: str) -> dict[str, float]:
+    """Returns the factors for converting a network from its current units to other units."""
+    args = (
+        network.options.headloss,
+        network.options.emitterexponent,
+        network.reactions.orderwall,
+    )
+    source = unit_factors(network.options.units, *args)
+    target = unit_factors(units, *args)
+    return {quantity: source[quantity] / target[quantity] for quantity in source}
+
+
+def _targets(network: Network) -> Iterator[tuple[list, str, str]]:
+    """Collects the network's unit-bearing attributes.
+
+    Args:
+      network: OOPNET network object
+
+    Yields:
+      objects, the name of the attribute to be converted and its quantity
 
-class Converter:
-    """ """
-
-    f_demand: float = 1.0
-    f_diameter_pipes: float = 1.0
-    f_diameter_tanks: float = 1.0
-    f_elevation: float = 1.0
-    f_emitter_coefficient: float = 1.0
-    f_flow: float = 1.0
-    f_hydraulic_head: float = 1.0
-    f_length: float = 1.0
-    f_power: float = 1.0
-    f_pressure: float = 1.0
-    f_reaction_coeff_wall: float = 1.0
-    f_roughness_coeff: float = 1.0
-    f_velocity: float = 1.0
-    f_volume: float = 1.0
-
-    def __init__(self, network):
-        if network.options.units == "LPS":
-            logger.debug("Already using LPS as unit. Skipping conversion.")
-            return
-
-        logger.debug(f"Converting units from {network.options.units} to LPS")
-
-        us_units = ["CFS", "GPM", "MGD", "IMGD", "AFD"]
-
-        if network.options.units in us_units:
-
-            self.f_diameter_pipes = INCH2MILLIMETER
-            self.f_diameter_tanks = FEET2METER
-            self.f_elevation = FEET2METER
-            self.f_hydraulic_head = FEET2METER
-            self.f_length = FEET2METER
-            self.f_power = HORESEPOWER2KILOWATTS
-            self.f_pressure = PSI2METER
-            self.f_reaction_coeff_wall = FEET2METER
-            if network.options.headloss == "D-W":
-                self.f_roughness_coeff = 1.0e3 * FEET2METER
-            self.f_velocity = FEET2METER
-            self.f_volume = FEET2METER**3
-
-        if network.options.units == "CFS":
-            self.f_flow = CFS2LPS
-        elif network.options.units == "GPM":
-            self.f_flow = GPM2LPS
-        elif network.options.units == "MGD":
-            self.f_flow = MGD2LPS
-        elif network.options.units == "IMGD":
-            self.f_flow = IMGD2LPS
-        elif network.options.units == "AFD":
-            self.f_flow = AFD2LPS
-        elif network.options.units == "LPM":
-            self.f_flow = LPM2LPS
-        elif network.options.units == "MLD":
-            self.f_flow = MLD2LPS
-        elif network.options.units == "CMH":
-            self.f_flow = CMH2LPS
-        elif network.options.units == "CMD":
-            self.f_flow = CMD2LPS
-        else:
-            raise ValueError(f"Illegal unit {network.options.units} defined.")
-
-        self.f_demand = self.f_flow
-        si_units = ["LPS", "LPM", "MLD", "CMH", "CMD"]
-
-        if network.options.units in us_units:
-            self.f_emitter_coefficient = self.f_flow * 1.0 / np.sqrt(PSI2METER)
-        elif network.options.units in si_units:
-            self.f_emitter_coefficient = self.f_flow
-
-
-def convert(network):
     """
+    components = {cls: getter(network) for cls, getter in _COMPONENT_GETTERS.items()}
+    for valve_type in SETTING_QUANTITIES.keys() | {GPV}:
+        components[valve_type] = [v for v in components[Valve] if type(v) is valve_type]
+
+    for cls, attribute, quantity in ATTRIBUTE_QUANTITIES:
+        yield components[cls], attribute, quantity
+
+    # curves are converted according to their first use
+    curves = {}
+    for cls, attribute, x, y in CURVE_QUANTITIES:
+        for curve in map(attrgetter(attribute), components[cls]):
+            if isinstance(curve, Curve):
+                curves.setdefault(id(curve), (curve, x, y))
+    for entry in network.energies:
+        if isinstance(entry.value, Curve):
+            curves.setdefault(id(entry.value), (entry.value, "flow", None))
+    for axis, position in (("xvalues", 1), ("yvalues", 2)):
+        by_quantity = {}
+        for curve_quantities in curves.values():
+            if curve_quantities[position] is not None:
+                by_quantity.setdefault(curve_quantities[position], []).append(
+                    curve_quantities[0]
+                )
+        for quantity, objects in by_quantity.items():
+            yield objects, axis, quantity
+
+    # control and rule values depend on the controlled components
+    values = {}
+    for control in get_controls(network):
+        condition, action = control.condition, control.action
+        if condition is not None and condition.object is not None:
+            quantity = "length" if isinstance(condition.object, Tank) else "pressure"
+            values.setdefault(quantity, []).append(condition)
+        if action is not None and type(action.object) in SETTING_QUANTITIES:
+            values.setdefault(SETTING_QUANTITIES[type(action.object)], []).append(
+                action
+            )
+    for rule in get_rules(network):
+        for condition in rule.condition:
+            if condition.attribute == "SETTING":
+                quantity = SETTING_QUANTITIES.get(type(condition.object))
+            else:
+                quantity = RULE_QUANTITIES.get(condition.attribute)
+            if quantity is not None:
+                values.setdefault(quantity, []).append(condition)
+    for quantity, objects in values.items():
+        yield objects, "value", quantity
+
+    # the pressure settings are only used (and written) by pressure driven analyses
+    if network.options.demandmodel == "PDA":
+        yield [network.options], "minimumpressure", "pressure"
+        yield [network.options], "requiredpressure", "pressure"
+    yield [network.reactions], "globalwall", "wallreaction"
+
+
+def _scale_value(value: Any, factor: float, digits: Optional[int] = None) -> Any:
+    """Multiplies numbers and lists of numbers by a factor, all other values are returned unchanged."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        if digits is None:
+            return value * factor
+        return float(f"{value * factor:.{digits}g}")
+    if isinstance(value, list):
+        return [_scale_value(v, factor, digits) for v in value]
+    return value
+
+
+def _scale(
+    objects: list, attribute: str, factor: float, digits: Optional[int] = None
+) -> tuple[list, list]:
+    """Multiplies an attribute of all objects by a factor.
+
+    Objects without a value (None) are skipped.
 
     Args:
-      network:
+      objects: objects to be converted
+      attribute: attribute name
+      factor: conversion factor
+      digits: number of significant digits the results are rounded to (no rounding by default)
 
     Returns:
+      converted objects and their original values
 
     """
+    values = list(map(attrgetter(attribute), objects))
+    if not any(values):
+        # e.g. unused emitters, zeros and missing values aren't changed by the conversion
+        return [], []
+    try:
+        # all values are numbers
+        scaled = [value * factor for value in values]
+        if digits is not None:
+            scaled = [float(f"{value:.{digits}g}") for value in scaled]
+    except TypeError:
+        # lists of numbers and optional values, objects without a value are skipped
+        objects = [obj for obj, value in zip(objects, values) if value is not None]
+        values = [value for value in values if value is not None]
+        scaled = [_scale_value(value, factor, digits) for value in values]
+    for obj, value in zip(objects, scaled):
+        setattr(obj, attribute, value)
+    return objects, values
+
+
+def _convert(
+    network: Network, units: str, digits: Optional[int] = None
+) -> list[tuple[str, list, list]]:
+    """Converts a network to other units and returns the original values."""
+    factors = _network_factors(network, units)
+    original = []
+    for objects, attribute, quantity in _targets(network):
+        factor = factors[quantity]
+        if objects and factor != 1.0:
+            original.append((attribute, *_scale(objects, attribute, factor, digits)))
+    network.options.units = units
+    return original
 
-    if network.options.units == "LPS":
+
+def convert(network: Network, units: str = "LPS"):
+    """Converts all unit-bearing attributes of a network to other units.
+
+    By default, the network is converted from the units of the input file to OOPNET's SI units.
+
+    Args:
+      network: OOPNET network object
+      units: EPANET flow unit the network is converted to
+
+    """
+    units = units.upper()
+    if network.options.units.upper() == units:
+        logger.debug(f"Already using {units} as unit. Skipping conversion.")
+        network.options.units = units
         return
+    logger.debug(f"Converting units from {network.options.units} to {units}")
+    _convert(network, units)
 
-    converter = Converter(network)
 
-    for j in get_junctions(network):
-        if j.emittercoefficient:
-            j.emittercoefficient *= converter.f_emitter_coefficient
-        if j.demand:
-            if isinstance(j.demand, list):
-                j.demand = [x * converter.f_demand for x in j.demand]
-            else:
-                j.demand *= converter.f_demand
-        if j.elevation:
-            j.elevation *= converter.f_elevation
-
-    for t in get_tanks(network):
-        t.diameter *= converter.f_diameter_tanks
-        t.elevation *= converter.f_elevation
-        t.initlevel *= converter.f_elevation
-        t.minlevel *= converter.f_elevation
-        t.maxlevel *= converter.f_elevation
-        t.minvolume *= converter.f_volume
-
-    for r in get_reservoirs(network):
-        r.elevation *= converter.f_elevation
-        r.head *= converter.f_hydraulic_head
-
-    for p in get_pipes(network):
-        p.diameter *= converter.f_diameter_pipes
-        p.length *= converter.f_length
-        p.roughness *= converter.f_roughness_coeff
-
-    network.options.units = "LPS"
+@contextmanager
+def converted(network: Network, units: Optional[str] = None) -> Iterator[Network]:
+    """Context manager temporarily converting a network to other units, e.g. for writing it.
+
+    The converted values are rounded to SIGNIFICANT_DIGITS significant digits, so values read from a file in the same
+    units are written unchanged (e.g., 20 ft instead of 19.999999999999996 ft). The original values are restored
+    exactly afterwards.
+
+    Args:
+      network: OOPNET network object
+      units: EPANET flow unit the network is converted to (default is the network's units)
+
+    """
+    if units is None or units.upper() == network.options.units.upper():
+        yield network
+        return
+    units = units.upper()
+    previous = network.options.units
+    original = _convert(network, units, SIGNIFICANT_DIGITS)
+    try:
+        yield network
+    finally:
+        for attribute, objects, values in original:
+            for obj, value in zip(objects, values):
+                setattr(obj, attribute, value)
+        network.options.units = previous
@@ -1 +1,4 @@
-from .report import SimulationReport
+from .report import SimulationReport, LazySimulationReport, stack_reports
+from .statistics import ReportStatistics
+from .store import ResultStore
+from .sensors import SensorSet
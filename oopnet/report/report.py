@@ -1,12 +1,20 @@
+from __future__ import annotations
 import datetime
-from typing import Optional, Union, Type, Callable
+import os
+import weakref
+from typing import Optional, Union, Type, Callable, Sequence, TYPE_CHECKING
 import logging
 
+import numpy as np
 import pandas as pd
+import xarray as xr
 from xarray import DataArray
 
 from oopnet.simulator.binaryfile_reader import BinaryFileReader
-from oopnet.simulator.reportfile_reader import ReportFileReader
+from oopnet.simulator.reportfile_reader import ReportFileReader, ReportFileIndex
+
+if TYPE_CHECKING:
+    from oopnet.simulator.timing import PhaseTiming
 
 logger = logging.getLogger(__name__)
 
@@ -18,10 +26,15 @@ class SimulationReport:
     Attributes:
         nodes: Node results
         links: Link results
+        timings: wall-clock and CPU time spent in the phases of the simulation (setup, write, execute, parse, build
+            arrays, cleanup) as PhaseTiming objects. Only available for reports created by a simulation.
+
+    The pandas objects returned by the properties (e.g., pressure or flow) are computed once and cached. Every access
+    returns a copy of the cached object, so modifying it doesn't affect the report. Assigning new node or link results
+    clears the cache.
     """
 
-    nodes: DataArray
-    links: DataArray
+    timings: dict[str, PhaseTiming]
 
     def __init__(
         self,
@@ -40,24 +53,214 @@ class SimulationReport:
 
         """
         logger.debug("Creating report.")
+        self._views = {}
         self.nodes, self.links = reader(filename, startdatetime)
+        self.timings = {}
+
+    @classmethod
+    def from_arrays(cls, nodes: DataArray, links: DataArray) -> "SimulationReport":
+        """Creates a SimulationReport from existing node and link results.
+
+        Args:
+            nodes: Node results
+            links: Link results
+
+        Returns:
+            SimulationReport object
+
+        """
+        report = cls.__new__(cls)
+        report._views = {}
+        report.nodes = nodes
+        report.links = links
+        report.timings = {}
+        return report
+
+    @property
+    def nodes(self) -> Optional[DataArray]:
+        """Node results"""
+        return self._nodes
+
+    @nodes.setter
+    def nodes(self, nodes: Optional[DataArray]):
+        self._nodes = nodes
+        self._views = {}
+
+    @property
+    def links(self) -> Optional[DataArray]:
+        """Link results"""
+        return self._links
+
+    @links.setter
+    def links(self, links: Optional[DataArray]):
+        self._links = links
+        self._views = {}
+
+    def __copy__(self) -> "SimulationReport":
+        # copies share the results (and cached views) with the original, but get their own timings
+        report = self.__class__.__new__(self.__class__)
+        report.__dict__.update(self.__dict__)
+        return report
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state.pop("_views", None)
+        return state
+
+    def __setstate__(self, state: dict):
+        # reports pickled by previous versions store the results as plain attributes
+        for name in ("nodes", "links"):
+            if name in state:
+                state[f"_{name}"] = state.pop(name)
+        self.__dict__.update(state)
+        self._views = {}
+
+    def _view(self, key: tuple, compute: Callable):
+        """Returns a cached result and computes it on first access."""
+        if key not in self._views:
+            self._views[key] = compute()
+        return self._views[key]
+
+    def _array(self, kind: str) -> Optional[DataArray]:
+        return self.nodes if kind == "Node" else self.links
+
+    def _labels(self, kind: str) -> dict[str, list]:
+        """Returns the element IDs, variables and points in time (or None) of the node or link results."""
+        array = self._array(kind)
+        if array is None:
+            return {"id": [], "vars": [], "time": None}
+        return {
+            "id": list(array.id.values),
+            "vars": list(array.vars.values),
+            "time": list(array.indexes["time"]) if "time" in array.dims else None,
+        }
+
+    def _values(
+        self, kind: str, vars: list[str], ids: Optional[list[str]]
+    ) -> np.ndarray:
+        """Returns the values of variables of all or some elements with the shape (time, id, vars) or (id, vars)."""
+        positions = self._positions(kind)
+        columns = [positions["vars"][var] for var in vars]
+        values = self._array(kind).values
+        if ids is None:
+            return values[..., columns]
+        rows = [positions["id"][id] for id in ids]
+        return values[..., rows, :][..., columns]
+
+    def _positions(self, kind: str) -> dict[str, dict]:
+        """Returns the positions of the element IDs, variables and points in time of the node or link results."""
+
+        def compute():
+            labels = self._labels(kind)
+            return {
+                name: (
+                    None
+                    if values is None
+                    else {value: position for position, value in enumerate(values)}
+                )
+                for name, values in labels.items()
+            }
+
+        return self._view((kind, "positions"), compute)
+
+    def get(
+        self,
+        vars: Union[str, Sequence[str]],
+        ids: Optional[Sequence[str]] = None,
+        times: Optional[Sequence[datetime.datetime]] = None,
+        kind: Optional[str] = None,
+    ) -> np.ndarray:
+        """Returns the values of one or more variables as a NumPy array.
+
+        Contrary to the properties (e.g., pressure), no pandas objects are created, which makes this method suitable
+        for accessing results in loops (e.g., in optimisations). The values are returned in the order of ids and vars
+        without sorting.
+
+        Args:
+            vars: variable name (e.g., "Pressure") or list of variable names of either nodes or links
+            ids: IDs of the elements. If ids is a Python None object, all elements are returned in the order of the
+                report.
+            times: points in time (ignored for steady state analyses). If times is a Python None object, all points
+                in time are returned.
+            kind: "Node" or "Link". Only required if a variable is reported for both nodes and links (e.g., "Quality").
+
+        Returns:
+            array with the shape (time, id, vars), or (id, vars) for steady state analyses. If vars is a single
+            variable name, the vars dimension is dropped.
+
+        """
+        names = [vars] if isinstance(vars, str) else list(vars)
+        if kind is None:
+            kinds = {
+                candidate
+                for candidate in ("Node", "Link")
+                for var in names
+                if var in self._positions(candidate)["vars"]
+            }
+            if not kinds:
+                raise KeyError(f"Variables {names} are not part of the report.")
+            if len(kinds) > 1:
+                raise ValueError(
+                    f"Variables {names} have to be reported for either nodes or links. Pass kind if a variable is "
+                    f"reported for both."
+                )
+            kind = kinds.pop()
+        positions = self._positions(kind)
+        missing = [var for var in names if var not in positions["vars"]]
+        if missing:
+            raise KeyError(f"{kind}s don't have the variables {missing}.")
+        unknown = [] if ids is None else [id for id in ids if id not in positions["id"]]
+        if unknown:
+            raise KeyError(f"{kind}s {unknown} are not part of the report.")
+
+        values = self._values(kind, names, None if ids is None else list(ids))
+        if times is not None and positions["time"] is not None:
+            try:
+                rows = [positions["time"][pd.Timestamp(time)] for time in times]
+            except KeyError as e:
+                raise KeyError(f"{e.args[0]} is not part of the report.") from None
+            values = values[rows]
+        if isinstance(vars, str):
+            values = values[..., 0]
+        return values
+
+    def _select(
+        self, kind: str, var: str, ids: Optional[list[str]] = None
+    ) -> DataArray:
+        """Selects a single variable of all or some elements.
+
+        Args:
+            kind: "Node" or "Link"
+            var: variable to be selected
+            ids: IDs of the elements to be selected. If ids is a Python None object, all elements are selected.
+
+        Returns:
+            DataArray with the dimensions (time, id) or (id) for steady state analyses
+
+        """
+        array = self._array(kind).sel(vars=var)
+        if ids is not None:
+            array = array.sel(id=ids)
+        return array
 
-    @staticmethod
     def _get(
-        array: DataArray,
+        self,
+        kind: str,
         var: str,
         unit: Optional[str] = None,
         calc: Optional[Callable] = None,
     ):
-        data = array.sel(vars=var).to_pandas().sort_index()
-        if calc:
-            data = calc(data)
-        data.name = f"{var} ({unit})" if unit else var
-        return data
+        def compute():
+            data = self._select(kind, var).to_pandas().sort_index()
+            if calc:
+                data = calc(data)
+            data.name = f"{var} ({unit})" if unit else var
+            return data
 
-    @staticmethod
-    def _get_element_info(array: DataArray, id: str) -> pd.Series:
-        data = array.sel(id=id).to_pandas()
+        return self._view((kind, var, unit), compute).copy()
+
+    def _get_element_info(self, kind: str, id: str) -> pd.Series:
+        data = self._array(kind).sel(id=id).to_pandas()
         data.name = id
         return data
 
@@ -69,7 +272,7 @@ class SimulationReport:
           Pandas Series containing the elevations of the Nodes
 
         """
-        return self._get(self.nodes, "Elevation", "m")
+        return self._get("Node", "Elevation", "m")
 
     @property
     def demand(self) -> Union[pd.Series, pd.DataFrame]:
@@ -79,7 +282,7 @@ class SimulationReport:
           Pandas Series containing the demands of the Nodes
 
         """
-        return self._get(self.nodes, "Demand", "l/s")
+        return self._get("Node", "Demand", "l/s")
 
     @property
     def head(self) -> Union[pd.Series, pd.DataFrame]:
@@ -89,7 +292,7 @@ class SimulationReport:
           Pandas Series containing the heads of the Nodes
 
         """
-        return self._get(self.nodes, "Head", "m")
+        return self._get("Node", "Head", "m")
 
     @property
     def pressure(self) -> Union[pd.Series, pd.DataFrame]:
@@ -99,7 +302,7 @@ class SimulationReport:
           Pandas Series containing the pressures of the Nodes
 
         """
-        return self._get(self.nodes, "Pressure", "m")
+        return self._get("Node", "Pressure", "m")
 
     @property
     def quality(self) -> Union[pd.Series, pd.DataFrame]:
@@ -109,7 +312,7 @@ class SimulationReport:
           Pandas Series containing the qualities of the Nodes
 
         """
-        return self._get(self.nodes, "Quality")
+        return self._get("Node", "Quality")
 
     @property
     def length(self) -> Union[pd.Series, pd.DataFrame]:
@@ -119,7 +322,7 @@ class SimulationReport:
           Pandas Series containing the lengths of the Links
 
         """
-        return self._get(self.links, "Length", "m")
+        return self._get("Link", "Length", "m")
 
     @property
     def diameter(self) -> Union[pd.Series, pd.DataFrame]:
@@ -129,7 +332,7 @@ class SimulationReport:
           Pandas Series containing the diameters of the Links
 
         """
-        return self._get(self.links, "Diameter", "m")
+        return self._get("Link", "Diameter", "m")
 
     @property
     def flow(self) -> Union[pd.Series, pd.DataFrame]:
@@ -139,7 +342,7 @@ class SimulationReport:
           Pandas Series containing the flows of the Links
 
         """
-        return self._get(self.links, "Flow", "l/s")
+        return self._get("Link", "Flow", "l/s")
 
     @property
     def velocity(self) -> Union[pd.Series, pd.DataFrame]:
@@ -149,7 +352,7 @@ class SimulationReport:
           Pandas Series containing the velocities of the Links
 
         """
-        return self._get(self.links, "Velocity", "m/s")
+        return self._get("Link", "Velocity", "m/s")
 
     @property
     def headlossper1000m(self) -> Union[pd.Series, pd.DataFrame]:
@@ -159,7 +362,7 @@ class SimulationReport:
           Pandas Series containing the headlosses of the Links
 
         """
-        return self._get(self.links, "Headloss", "/1000m")
+        return self._get("Link", "Headloss", "/1000m")
 
     @property
     def headloss(self) -> Union[pd.Series, pd.DataFrame]:
@@ -177,7 +380,7 @@ class SimulationReport:
             l = l.replace(0, 1000.0)
             return l * data / 1000.0
 
-        return self._get(self.links, "Headloss", "m", convert)
+        return self._get("Link", "Headloss", "m", convert)
 
     @property
     def position(self) -> Union[pd.Series, pd.DataFrame]:
@@ -187,7 +390,7 @@ class SimulationReport:
           Pandas Series containing the positions of the Links
 
         """
-        return self._get(self.links, "Position")
+        return self._get("Link", "Position")
 
     @property
     def settings(self):
@@ -197,7 +400,7 @@ class SimulationReport:
           Pandas Series containing the settings of the Links
 
         """
-        return self._get(self.links, "Setting")
+        return self._get("Link", "Setting")
 
     @property
     def reaction(self) -> Union[pd.Series, pd.DataFrame]:
@@ -207,7 +410,7 @@ class SimulationReport:
           Pandas Series containing the reactions of the Links
 
         """
-        return self._get(self.links, "Reaction", "mass/L/day")
+        return self._get("Link", "Reaction", "mass/L/day")
 
     @property
     def ffactor(self) -> Union[pd.Series, pd.DataFrame]:
@@ -217,7 +420,7 @@ class SimulationReport:
           Pandas Series containing the ffactors of the Links
 
         """
-        return self._get(self.links, "F-Factor")
+        return self._get("Link", "F-Factor")
 
     def get_node_info(self, id: str) -> pd.Series:
         """Gets the Node information from a simulation report object.
@@ -229,7 +432,7 @@ class SimulationReport:
           Pandas Series containing the information of the specified Node
 
         """
-        return self._get_element_info(self.nodes, id)
+        return self._get_element_info("Node", id)
 
     def get_link_info(self, id: str) -> pd.Series:
         """Gets the Link information from a simulation report object.
@@ -241,4 +444,168 @@ class SimulationReport:
           Pandas Series containing the information of the links
 
         """
-        return self._get_element_info(self.links, id)
+        return self._get_element_info("Link", id)
+
+
+def _remove_file(filename: str):
+    if os.path.isfile(filename):
+        os.remove(filename)
+
+
+def _from_arrays(nodes: DataArray, links: DataArray, timings: dict) -> SimulationReport:
+    report = SimulationReport.from_arrays(nodes, links)
+    report.timings = timings
+    return report
+
+
+class LazySimulationReport(SimulationReport):
+    """Simulation results, that are read from an EPANET report file on first access.
+
+    The report file is indexed once when the object is created. Variables (and elements) are only parsed when they are
+    accessed and are cached afterwards, so parse time and memory scale with the used results instead of the size of the
+    report file. Accessing nodes or links reads all variables of all elements. Like for SimulationReports, the results
+    can be replaced by assigning to nodes or links, the report file isn't read for these results afterwards.
+
+    Attributes:
+        nodes: Node results
+        links: Link results
+        timings: wall-clock and CPU time spent in the phases of the simulation
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        startdatetime: Optional[datetime.datetime] = None,
+        delete: bool = False,
+    ):
+        """LazySimulationReport init method.
+
+        Args:
+            filename: EPANET report file
+            startdatetime: start datetime of the simulation
+            delete: if True, the report file is deleted when the object (and all its copies) are garbage collected
+
+        """
+        logger.debug("Creating lazy report.")
+        self._index = ReportFileIndex(filename, startdatetime)
+        self._arrays: dict[tuple, Optional[DataArray]] = {}
+        self._views = {}
+        self.timings = {}
+        if delete:
+            # copies share the index, the file is needed as long as one of them exists
+            weakref.finalize(self._index, _remove_file, filename)
+
+    def _read(self, kind: str, vars: list[str], ids: Optional[list[str]]) -> DataArray:
+        """Reads variables of elements from the report file."""
+        data = self._index.read(kind, vars, ids)
+        coords = {
+            "id": self._index.ids[kind] if ids is None else list(ids),
+            "vars": vars,
+        }
+        times = self._index.times[kind]
+        if times is None:
+            return DataArray(data[0], dims=("id", "vars"), coords=coords)
+        coords["time"] = times
+        return DataArray(data, dims=("time", "id", "vars"), coords=coords)
+
+    def _all(self, kind: str) -> Optional[DataArray]:
+        """Returns all variables of all elements of a kind."""
+        key = (kind,)
+        if key not in self._arrays:
+            tables = self._index.tables[kind]
+            self._arrays[key] = (
+                self._read(kind, tables[0].vars, None) if tables else None
+            )
+        return self._arrays[key]
+
+    def _set_all(self, kind: str, array: Optional[DataArray]):
+        """Replaces all results of a kind, the results read from the report file before are dropped."""
+        self._arrays = {
+            key: value for key, value in self._arrays.items() if key[0] != kind
+        }
+        self._arrays[(kind,)] = array
+        self._views = {}
+
+    @property
+    def nodes(self) -> Optional[DataArray]:
+        return self._all("Node")
+
+    @nodes.setter
+    def nodes(self, nodes: Optional[DataArray]):
+        self._set_all("Node", nodes)
+
+    @property
+    def links(self) -> Optional[DataArray]:
+        return self._all("Link")
+
+    @links.setter
+    def links(self, links: Optional[DataArray]):
+        self._set_all("Link", links)
+
+    def _select(
+        self, kind: str, var: str, ids: Optional[list[str]] = None
+    ) -> DataArray:
+        if (kind,) in self._arrays:
+            return super()._select(kind, var, ids)
+        key = (kind, var)
+        if key not in self._arrays:
+            if ids is not None:
+                subset = (kind, var, tuple(ids))
+                if subset not in self._arrays:
+                    self._arrays[subset] = self._read(kind, [var], ids).sel(vars=var)
+                return self._arrays[subset]
+            self._arrays[key] = self._read(kind, [var], None).sel(vars=var)
+        array = self._arrays[key]
+        if ids is not None:
+            array = array.sel(id=ids)
+        return array
+
+    def _labels(self, kind: str) -> dict[str, list]:
+        if (kind,) in self._arrays:
+            return super()._labels(kind)
+        tables = self._index.tables[kind]
+        times = self._index.times[kind]
+        return {
+            "id": self._index.ids[kind],
+            "vars": tables[0].vars if tables else [],
+            "time": None if times is None else [pd.Timestamp(time) for time in times],
+        }
+
+    def _values(
+        self, kind: str, vars: list[str], ids: Optional[list[str]]
+    ) -> np.ndarray:
+        if (kind,) in self._arrays:
+            return super()._values(kind, vars, ids)
+        return np.stack([self._select(kind, var, ids).values for var in vars], axis=-1)
+
+    def _get_element_info(self, kind: str, id: str) -> pd.Series:
+        if (kind,) in self._arrays:
+            return super()._get_element_info(kind, id)
+        vars = self._index.tables[kind][0].vars
+        data = self._read(kind, vars, [id]).sel(id=id).to_pandas()
+        data.name = id
+        return data
+
+    def __reduce__(self):
+        return _from_arrays, (self.nodes, self.links, self.timings)
+
+
+def stack_reports(
+    reports: Sequence[SimulationReport], scenarios: Optional[Sequence] = None
+) -> SimulationReport:
+    """Stacks multiple simulation reports into a single report with an additional "scenario" dimension.
+
+    Args:
+        reports: SimulationReport objects to be stacked
+        scenarios: scenario labels (default is the reports' position in reports)
+
+    Returns:
+        SimulationReport with node and link results stacked along the "scenario" dimension
+
+    """
+    if scenarios is None:
+        scenarios = list(range(len(reports)))
+    index = pd.Index(scenarios, name="scenario")
+    nodes = xr.concat([rpt.nodes for rpt in reports], dim=index)
+    links = xr.concat([rpt.links for rpt in reports], dim=index)
+    return SimulationReport.from_arrays(nodes, links)
@@ -0,0 +1,227 @@
+from __future__ import annotations
+import logging
+from typing import Optional, Sequence, Union
+
+import numpy as np
+
+from oopnet.report.report import SimulationReport
+from oopnet.report.store import ResultStore
+
+logger = logging.getLogger(__name__)
+
+# number of decimals of flow and pressure measurements used by make_measurement
+DEFAULT_PRECISION = {"Flow": 3, "Pressure": 2}
+
+
+class SensorSet:
+    """Set of sensors for extracting measurements from simulation results.
+
+    Sensors are defined by a dictionary with the measured variables as keys and the IDs of the measured nodes or links
+    as values (e.g., {'Flow': ['P-01', 'P-10'], 'Pressure': ['J-02', 'J-31']}). Measurements are ordered by the
+    variables' names and the IDs' order.
+
+    The sensors' positions in the results are resolved once, when the first report is processed. All further reports
+    have to contain the same elements in the same order (e.g., reports of the same network). Measurements of many
+    reports are extracted with NumPy fancy indexing into a single (runs, sensors) array, or (runs, time, sensors) for
+    extended period simulations.
+
+    Measurements can be disturbed by additive Gaussian noise and rounded to the sensors' precision.
+
+    Attributes:
+      sensors: measured variables and the IDs of the measured elements
+      precision: number of decimals per variable. Variables without precision aren't rounded.
+      noise: standard deviation of the measurement noise per variable, either a single value or one value per sensor
+      labels: (variable, ID) tuples of all sensors in the order of the measurements
+
+    """
+
+    def __init__(
+        self,
+        sensors: dict[str, Sequence[str]],
+        precision: Optional[dict[str, int]] = None,
+        noise: Optional[dict[str, Union[float, Sequence[float]]]] = None,
+    ):
+        self.sensors = {var: list(sensors[var]) for var in sorted(sensors)}
+        self.precision = (
+            DEFAULT_PRECISION.copy() if precision is None else dict(precision)
+        )
+        self.noise = {} if noise is None else dict(noise)
+        self.labels = [(var, id) for var, ids in self.sensors.items() for id in ids]
+        self._groups: Optional[list[dict]] = None
+        self._decimals: Optional[list[tuple[slice, int]]] = None
+        self._std: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def _resolve(self, vars: dict[str, Sequence[str]]):
+        """Resolves the sensors to positions.
+
+        Args:
+          vars: variables reported for nodes and links
+
+        """
+        groups = {}
+        for var, ids in self.sensors.items():
+            kinds = [kind for kind in ("Node", "Link") if var in vars[kind]]
+            if not kinds:
+                raise KeyError(f"{var!r} is not part of the results.")
+            if len(kinds) > 1:
+                raise ValueError(f"{var!r} is reported for both nodes and links.")
+            groups.setdefault(kinds[0], []).append(var)
+
+        self._groups = []
+        offsets = {}
+        start = 0
+        for var, ids in self.sensors.items():
+            offsets[var] = start
+            start += len(ids)
+        for kind, kind_vars in groups.items():
+            # unique IDs of the kind's sensors, read once per report
+            kind_ids = list(
+                dict.fromkeys(id for var in kind_vars for id in self.sensors[var])
+            )
+            id_positions = {id: position for position, id in enumerate(kind_ids)}
+            rows, columns, outputs = [], [], []
+            for column, var in enumerate(kind_vars):
+                ids = self.sensors[var]
+                rows.extend(id_positions[id] for id in ids)
+                columns.extend([column] * len(ids))
+                outputs.extend(range(offsets[var], offsets[var] + len(ids)))
+            self._groups.append(
+                {
+                    "kind": kind,
+                    "vars": kind_vars,
+                    "ids": kind_ids,
+                    "rows": np.array(rows, dtype=int),
+                    "columns": np.array(columns, dtype=int),
+                    "outputs": np.array(outputs, dtype=int),
+                }
+            )
+
+        self._decimals = [
+            (slice(offsets[var], offsets[var] + len(ids)), self.precision[var])
+            for var, ids in self.sensors.items()
+            if self.precision.get(var) is not None
+        ]
+        std = np.zeros(len(self))
+        for var, value in self.noise.items():
+            if var in offsets:
+                std[offsets[var] : offsets[var] + len(self.sensors[var])] = value
+        self._std = std
+
+    def _extract_report(self, report: SimulationReport) -> np.ndarray:
+        if self._groups is None:
+            self._resolve(
+                {kind: report._labels(kind)["vars"] for kind in ("Node", "Link")}
+            )
+        result = None
+        for group in self._groups:
+            values = report._values(group["kind"], group["vars"], group["ids"])
+            if result is None:
+                result = np.empty(values.shape[:-2] + (len(self),))
+            result[..., group["outputs"]] = values[..., group["rows"], group["columns"]]
+        return np.empty(len(self)) if result is None else result
+
+    def _extract_store(
+        self, store: ResultStore, scenarios: Union[slice, Sequence[int], None]
+    ) -> np.ndarray:
+        if self._groups is None:
+            self._resolve(
+                {
+                    kind: (
+                        []
+                        if store._metadata is None or store._metadata[kind] is None
+                        else store._metadata[kind]["vars"]
+                    )
+                    for kind in ("Node", "Link")
+                }
+            )
+        result = None
+        for group in self._groups:
+            values = store.read(
+                group["kind"], vars=group["vars"], ids=group["ids"], scenarios=scenarios
+            ).values
+            if result is None:
+                result = np.empty(values.shape[:-2] + (len(self),))
+            result[..., group["outputs"]] = values[..., group["rows"], group["columns"]]
+        return np.empty(len(self)) if result is None else result
+
+    def extract(
+        self,
+        reports: Union[SimulationReport, Sequence[SimulationReport], ResultStore],
+        scenarios: Union[slice, Sequence[int], None] = None,
+    ) -> np.ndarray:
+        """Extracts the exact values at the sensors without noise and rounding.
+
+        Args:
+          reports: a single OOPNET report object, a sequence of report objects or a ResultStore
+          scenarios: scenarios to be read from a ResultStore (default is all scenarios)
+
+        Returns:
+          array with the shape (sensors) or (time, sensors) for a single report and (runs, sensors) or
+          (runs, time, sensors) for multiple reports
+
+        """
+        if isinstance(reports, ResultStore):
+            return self._extract_store(reports, scenarios)
+        if isinstance(reports, SimulationReport):
+            return self._extract_report(reports)
+        reports = list(reports)
+        if not reports:
+            return np.empty((0, len(self)))
+        first = self._extract_report(reports[0])
+        result = np.empty((len(reports),) + first.shape)
+        result[0] = first
+        for index, report in enumerate(reports[1:], start=1):
+            result[index] = self._extract_report(report)
+        return result
+
+    def apply(
+        self,
+        values: np.ndarray,
+        rng: Union[np.random.Generator, int, None] = None,
+    ) -> np.ndarray:
+        """Applies the noise and precision models to exact values.
+
+        Args:
+          values: array returned by extract
+          rng: NumPy random generator or seed used for the noise
+
+        Returns:
+          measurements with the same shape as values
+
+        """
+        if self._std is None:
+            raise ValueError(
+                "The sensors haven't been resolved yet, call extract first."
+            )
+        values = np.array(values, dtype=float)
+        if self._std.any():
+            rng = np.random.default_rng(rng)
+            values += rng.standard_normal(values.shape) * self._std
+        for columns, decimals in self._decimals:
+            values[..., columns] = np.around(values[..., columns], decimals=decimals)
+        return values
+
+    def measure(
+        self,
+        reports: Union[SimulationReport, Sequence[SimulationReport], ResultStore],
+        rng: Union[np.random.Generator, int, None] = None,
+        scenarios: Union[slice, Sequence[int], None] = None,
+    ) -> np.ndarray:
+        """Simulates measurements: extracts the values at the sensors and applies the noise and precision models.
+
+        Args:
+          reports: a single OOPNET report object, a sequence of report objects or a ResultStore
+          rng: NumPy random generator or seed used for the noise
+          scenarios: scenarios to be read from a ResultStore (default is all scenarios)
+
+        Returns:
+          measurements with the same shape as returned by extract
+
+        """
+        return self.apply(self.extract(reports, scenarios), rng)
+
+    def __repr__(self) -> str:
+        return f"SensorSet({len(self)} sensors: {', '.join(f'{var}={len(ids)}' for var, ids in self.sensors.items())})"
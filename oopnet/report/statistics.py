@@ -0,0 +1,393 @@
+from __future__ import annotations
+import copy
+import logging
+from typing import Iterable, Optional, Sequence, Union
+
+import numpy as np
+from xarray import DataArray
+
+from oopnet.report.report import SimulationReport
+
+logger = logging.getLogger(__name__)
+
+
+def _marker_increments(quantile: float) -> np.ndarray:
+    """Returns the increments of the P² markers' desired positions per observation."""
+    return np.array([0.0, quantile / 2, quantile, (1 + quantile) / 2, 1.0])
+
+
+def _interpolate(
+    x: np.ndarray,
+    xp: np.ndarray,
+    fp: np.ndarray,
+    left: Union[float, np.ndarray],
+    right: Union[float, np.ndarray],
+) -> np.ndarray:
+    """Element-wise linear interpolation along the first axis.
+
+    Args:
+      x: points to be evaluated with the shape (m, ...)
+      xp: sorted sample points with the shape (k, ...)
+      fp: values at the sample points with the shape (k, ...)
+      left: value for points below xp[0]
+      right: value for points above xp[-1]
+
+    Returns:
+      interpolated values with the shape (m, ...)
+
+    """
+    upper = np.clip((xp[None] <= x[:, None]).sum(axis=1), 1, len(xp) - 1)
+    x_lo = np.take_along_axis(xp, upper - 1, axis=0)
+    x_hi = np.take_along_axis(xp, upper, axis=0)
+    f_lo = np.take_along_axis(fp, upper - 1, axis=0)
+    f_hi = np.take_along_axis(fp, upper, axis=0)
+    width = x_hi - x_lo
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = np.where(width > 0, f_lo + (x - x_lo) * (f_hi - f_lo) / width, f_hi)
+    values = np.where(x < xp[0], left, values)
+    return np.where(x > xp[-1], right, values)
+
+
+class _ArrayStatistics:
+    """Running statistics of equally shaped arrays.
+
+    Mean and variance are updated with Welford's algorithm, quantiles are estimated with the P² algorithm (Jain and
+    Chlamtac, 1985) that keeps five markers per quantile and array element. The first five observations are buffered
+    for initialising the markers.
+
+    Attributes:
+      quantiles: estimated quantiles
+      count: number of added arrays
+
+    """
+
+    def __init__(self, quantiles: Sequence[float]):
+        self.quantiles = tuple(quantiles)
+        self.count = 0
+        self.mean: Optional[np.ndarray] = None
+        self.m2: Optional[np.ndarray] = None
+        self.min: Optional[np.ndarray] = None
+        self.max: Optional[np.ndarray] = None
+        self.heights: list[np.ndarray] = []
+        self.positions: list[np.ndarray] = []
+        self._buffer: list[np.ndarray] = []
+
+    def add(self, values: np.ndarray):
+        values = np.asarray(values, dtype=float)
+        if self.count == 0:
+            self.mean = np.zeros_like(values)
+            self.m2 = np.zeros_like(values)
+            self.min = values.copy()
+            self.max = values.copy()
+        elif values.shape != self.mean.shape:
+            raise ValueError(
+                f"Expected results with the shape {self.mean.shape} but got {values.shape}."
+            )
+        self.count += 1
+        delta = values - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (values - self.mean)
+        np.minimum(self.min, values, out=self.min)
+        np.maximum(self.max, values, out=self.max)
+        self._update_markers(values)
+
+    def _update_markers(self, values: np.ndarray):
+        if self.count <= 5:
+            self._buffer.append(values.copy())
+            if self.count == 5:
+                heights = np.sort(np.stack(self._buffer), axis=0)
+                positions = np.broadcast_to(
+                    np.arange(1.0, 6.0).reshape((5,) + (1,) * values.ndim),
+                    heights.shape,
+                )
+                self.heights = [heights.copy() for _ in self.quantiles]
+                self.positions = [positions.copy() for _ in self.quantiles]
+                self._buffer = []
+            return
+
+        for quantile, q, n in zip(self.quantiles, self.heights, self.positions):
+            # markers above the observation move up by one
+            for i in (1, 2, 3):
+                n[i] += values < q[i]
+            n[4] += 1
+            np.minimum(q[0], values, out=q[0])
+            np.maximum(q[4], values, out=q[4])
+            desired = 1 + (self.count - 1) * _marker_increments(quantile)
+            self._adjust_markers(q, n, desired)
+
+    @staticmethod
+    def _adjust_markers(q: np.ndarray, n: np.ndarray, desired: np.ndarray):
+        """Moves the inner markers towards their desired positions (P² algorithm)."""
+        for i in (1, 2, 3):
+            d = desired[i] - n[i]
+            up = (d >= 1) & (n[i + 1] - n[i] > 1)
+            down = (d <= -1) & (n[i - 1] - n[i] < -1)
+            move = np.nonzero(up | down)
+            if not move[0].size:
+                continue
+            s = np.where(up[move], 1.0, -1.0)
+            q_lo, q_i, q_hi = q[i - 1][move], q[i][move], q[i + 1][move]
+            n_lo, n_i, n_hi = n[i - 1][move], n[i][move], n[i + 1][move]
+            parabolic = q_i + s / (n_hi - n_lo) * (
+                (n_i - n_lo + s) * (q_hi - q_i) / (n_hi - n_i)
+                + (n_hi - n_i - s) * (q_i - q_lo) / (n_i - n_lo)
+            )
+            linear = np.where(
+                s > 0,
+                q_i + (q_hi - q_i) / (n_hi - n_i),
+                q_i - (q_lo - q_i) / (n_lo - n_i),
+            )
+            q[i][move] = np.where(
+                (q_lo < parabolic) & (parabolic < q_hi), parabolic, linear
+            )
+            n[i][move] = n_i + s
+
+    def merge(self, other: _ArrayStatistics):
+        if other.quantiles != self.quantiles:
+            raise ValueError(
+                "Only statistics estimating the same quantiles can be merged."
+            )
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.__dict__.update(copy.deepcopy(other.__dict__))
+            return
+        if other.mean.shape != self.mean.shape:
+            raise ValueError(
+                f"Expected results with the shape {self.mean.shape} but got {other.mean.shape}."
+            )
+        if other.count < 5 or self.count < 5:
+            small, large = (other, self) if other.count < 5 else (self, other)
+            if small is self:
+                buffer = self._buffer
+                self.__init__(self.quantiles)
+                self.merge(large)
+            else:
+                buffer = small._buffer
+            for values in buffer:
+                self.add(values)
+            return
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta**2 * self.count * other.count / count
+        self.mean += delta * other.count / count
+        np.minimum(self.min, other.min, out=self.min)
+        np.maximum(self.max, other.max, out=self.max)
+        for index, quantile in enumerate(self.quantiles):
+            self.heights[index], self.positions[index] = self._merge_markers(
+                self.heights[index],
+                self.positions[index],
+                self.count,
+                other.heights[index],
+                other.positions[index],
+                other.count,
+                quantile,
+            )
+        self.count = count
+
+    @staticmethod
+    def _merge_markers(q_a, n_a, count_a, q_b, n_b, count_b, quantile):
+        """Approximates the P² markers of the union of two samples.
+
+        Both samples' distribution functions are approximated by interpolating linearly between their markers. The
+        merged markers are placed where the summed distribution functions reach the markers' desired positions.
+        """
+        count = count_a + count_b
+        candidates = np.sort(np.concatenate([q_a, q_b]), axis=0)
+        ranks = _interpolate(candidates, q_a, n_a, 0.0, count_a) + _interpolate(
+            candidates, q_b, n_b, 0.0, count_b
+        )
+        desired = 1 + (count - 1) * _marker_increments(quantile)
+        shape = (5,) + (1,) * (q_a.ndim - 1)
+        targets = np.broadcast_to(desired.reshape(shape), q_a.shape)
+        heights = _interpolate(
+            targets, ranks, candidates, candidates[0], candidates[-1]
+        )
+        heights[0] = np.minimum(q_a[0], q_b[0])
+        heights[4] = np.maximum(q_a[4], q_b[4])
+        heights = np.maximum.accumulate(heights, axis=0)
+        positions = np.empty_like(heights)
+        positions[0] = 1
+        positions[4] = count
+        for i in (1, 2, 3):
+            positions[i] = np.clip(
+                round(desired[i]), positions[i - 1] + 1, count - 4 + i
+            )
+        return heights, positions
+
+    def quantile(self, quantile: float) -> np.ndarray:
+        if self.count < 5:
+            return np.quantile(np.stack(self._buffer), quantile, axis=0)
+        if quantile == 0:
+            return self.min.copy()
+        if quantile == 1:
+            return self.max.copy()
+        if quantile not in self.quantiles:
+            raise ValueError(
+                f"Quantile {quantile} is not estimated, available quantiles are {self.quantiles}."
+            )
+        return self.heights[self.quantiles.index(quantile)][2].copy()
+
+
+class ReportStatistics:
+    """Running statistics over many SimulationReports.
+
+    Reports are added one at a time and only the statistics are kept, so that the memory usage doesn't depend on the
+    number of simulations (e.g., in Monte Carlo simulations). For every element, variable and point in time, the mean,
+    variance, minimum, maximum and approximate quantiles are computed. The statistics are returned as SimulationReport
+    objects, so that the usual properties can be used::
+
+        stats = ReportStatistics()
+        for rpt in reports:
+            stats.add(rpt)
+        stats.mean().pressure
+
+    Mean, variance, minimum and maximum are exact, quantiles are estimated with the P² algorithm without storing the
+    observations. Statistics computed in different processes can be combined with merge. Merging is exact except for
+    the quantiles, which are approximated from both statistics' P² markers.
+
+    All added reports have to contain the same elements, variables and points in time.
+
+    Attributes:
+      quantiles: quantiles to be estimated
+      count: number of added reports
+
+    """
+
+    def __init__(self, quantiles: Sequence[float] = (0.05, 0.5, 0.95)):
+        for quantile in quantiles:
+            if not 0 < quantile < 1:
+                raise ValueError(
+                    f"Quantiles have to be between 0 and 1, got {quantile}."
+                )
+        self.quantiles = tuple(quantiles)
+        self.count = 0
+        self._statistics = {
+            "Node": _ArrayStatistics(self.quantiles),
+            "Link": _ArrayStatistics(self.quantiles),
+        }
+        self._templates: dict[str, Optional[DataArray]] = {"Node": None, "Link": None}
+
+    def add(self, report: SimulationReport):
+        """Adds the results of a simulation.
+
+        Args:
+          report: OOPNET report object
+
+        """
+        arrays = {"Node": report.nodes, "Link": report.links}
+        for kind, array in arrays.items():
+            if array is None:
+                continue
+            if self._templates[kind] is None:
+                self._templates[kind] = array.copy(data=np.empty(array.shape))
+            self._statistics[kind].add(array.values)
+        self.count += 1
+
+    def update(self, reports: Iterable[SimulationReport]) -> ReportStatistics:
+        """Adds the results of multiple simulations.
+
+        Args:
+          reports: OOPNET report objects
+
+        Returns:
+          the ReportStatistics object itself
+
+        """
+        for report in reports:
+            self.add(report)
+        return self
+
+    def merge(self, other: ReportStatistics) -> ReportStatistics:
+        """Combines the statistics with the statistics of other reports (e.g., computed by another process).
+
+        Args:
+          other: ReportStatistics object estimating the same quantiles
+
+        Returns:
+          the ReportStatistics object itself
+
+        """
+        for kind, statistics in self._statistics.items():
+            statistics.merge(other._statistics[kind])
+            if self._templates[kind] is None:
+                self._templates[kind] = other._templates[kind]
+        self.count += other.count
+        return self
+
+    def _report(self, values: dict[str, Optional[np.ndarray]]) -> SimulationReport:
+        """Wraps the statistics of nodes and links in a SimulationReport."""
+        arrays = {}
+        for kind, template in self._templates.items():
+            arrays[kind] = (
+                None if template is None else template.copy(data=values[kind])
+            )
+        return SimulationReport.from_arrays(arrays["Node"], arrays["Link"])
+
+    def _compute(self, method) -> SimulationReport:
+        if self.count == 0:
+            raise ValueError("No reports have been added yet.")
+        return self._report(
+            {
+                kind: None if self._templates[kind] is None else method(statistics)
+                for kind, statistics in self._statistics.items()
+            }
+        )
+
+    def mean(self) -> SimulationReport:
+        """Returns the mean of all added reports."""
+        return self._compute(lambda statistics: statistics.mean.copy())
+
+    def var(self, ddof: int = 1) -> SimulationReport:
+        """Returns the variance of all added reports.
+
+        Args:
+          ddof: delta degrees of freedom, the divisor used is count - ddof (default is the sample variance like in
+            pandas)
+
+        """
+        if self.count - ddof <= 0:
+            raise ValueError(
+                f"At least {ddof + 1} reports are required for ddof={ddof}."
+            )
+        return self._compute(
+            lambda statistics: statistics.m2 / (statistics.count - ddof)
+        )
+
+    def std(self, ddof: int = 1) -> SimulationReport:
+        """Returns the standard deviation of all added reports.
+
+        Args:
+          ddof: delta degrees of freedom, the divisor used is count - ddof
+
+        """
+        if self.count - ddof <= 0:
+            raise ValueError(
+                f"At least {ddof + 1} reports are required for ddof={ddof}."
+            )
+        return self._compute(
+            lambda statistics: np.sqrt(statistics.m2 / (statistics.count - ddof))
+        )
+
+    def min(self) -> SimulationReport:
+        """Returns the minimum of all added reports."""
+        return self._compute(lambda statistics: statistics.min.copy())
+
+    def max(self) -> SimulationReport:
+        """Returns the maximum of all added reports."""
+        return self._compute(lambda statistics: statistics.max.copy())
+
+    def quantile(self, quantile: float) -> SimulationReport:
+        """Returns an estimated quantile of all added reports.
+
+        Quantiles are exact as long as less than five reports were added.
+
+        Args:
+          quantile: one of the quantiles passed on initialisation, 0 (minimum) or 1 (maximum)
+
+        """
+        return self._compute(lambda statistics: statistics.quantile(quantile))
+
+    def __repr__(self) -> str:
+        return f"ReportStatistics(count={self.count}, quantiles={self.quantiles})"
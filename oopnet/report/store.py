@@ -0,0 +1,443 @@
+from __future__ import annotations
+import datetime
+import json
+import logging
+import os
+import queue
+import threading
+from typing import Any, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from numpy.lib.format import open_memmap
+from xarray import DataArray
+
+from oopnet.report.report import SimulationReport
+
+logger = logging.getLogger(__name__)
+
+_KINDS = ("Node", "Link")
+
+
+def _to_json(value: Any) -> Any:
+    """Converts NumPy and datetime objects in parameter sets to JSON serializable objects."""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (datetime.datetime, datetime.timedelta)):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable.")
+
+
+def _positions(
+    labels: list, selection: Optional[Sequence], name: str
+) -> Union[slice, np.ndarray]:
+    """Translates selected labels to positions."""
+    if selection is None:
+        return slice(None)
+    index = {label: position for position, label in enumerate(labels)}
+    try:
+        return np.array([index[label] for label in selection], dtype=int)
+    except KeyError as e:
+        raise KeyError(
+            f"{name} {e.args[0]!r} is not part of the result store."
+        ) from None
+
+
+class ResultStore:
+    """Columnar on-disk store for the results of many simulations.
+
+    Node and link results of every appended report are written to chunked NumPy arrays (.npy files) with the shape
+    (scenario, time, id, vars), or (scenario, id, vars) for steady state analyses. Each chunk holds chunksize scenarios.
+    Element IDs, variables and points in time are stored once in metadata.json and the parameter set of every scenario
+    is appended to scenarios.jsonl. Reads are memory-mapped, so that only the selected part of the results is loaded.
+
+    All stored reports have to contain the same elements, variables and points in time. The layout of the store's
+    directory::
+
+        metadata.json
+        scenarios.jsonl
+        Node/chunk-000000.npy
+        Link/chunk-000000.npy
+
+    If background is True, appended reports are written by a background thread, so that archiving doesn't block running
+    simulations. Call flush to wait until all appended reports were written. Errors raised by the background thread are
+    re-raised by the next call of append, flush or close.
+
+    Attributes:
+      directory: directory of the store. Existing stores are opened and new reports are appended.
+      chunksize: number of scenarios per chunk file
+      dtype: data type of the stored values
+      background: if True, reports are written by a background thread
+      readonly: if True, reports can't be appended
+
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        chunksize: int = 1000,
+        dtype: Union[str, np.dtype] = "float64",
+        background: bool = False,
+        readonly: bool = False,
+        maxqueue: int = 100,
+    ):
+        """ResultStore init method.
+
+        Args:
+          directory: directory of the store
+          chunksize: number of scenarios per chunk file (ignored for existing stores)
+          dtype: data type of the stored values (ignored for existing stores)
+          background: if True, reports are written by a background thread
+          readonly: if True, an existing store is opened for reading only
+          maxqueue: maximum number of reports waiting to be written by the background thread before append blocks
+
+        """
+        self.directory = directory
+        self.chunksize = chunksize
+        self.dtype = np.dtype(dtype)
+        self.background = background
+        self.readonly = readonly
+        self._metadata: Optional[dict] = None
+        self._count = 0
+        # chunk files currently written to and chunk files opened for reading
+        self._writers: dict[str, tuple[int, np.memmap]] = {}
+        self._readers: dict[tuple[str, int], np.memmap] = {}
+        self._lock = threading.Lock()
+        self._queue: Optional[queue.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+
+        if os.path.isfile(self._path("metadata.json")):
+            with open(self._path("metadata.json")) as file:
+                self._metadata = json.load(file)
+            self.chunksize = self._metadata["chunksize"]
+            self.dtype = np.dtype(self._metadata["dtype"])
+            with open(self._path("scenarios.jsonl")) as file:
+                self._count = sum(1 for line in file if line.strip())
+        elif readonly:
+            raise FileNotFoundError(f"{directory!r} doesn't contain a result store.")
+        else:
+            os.makedirs(directory, exist_ok=True)
+
+        if background and not readonly:
+            self._queue = queue.Queue(maxsize=maxqueue)
+            self._thread = threading.Thread(
+                target=self._work, name="ResultStoreWriter", daemon=True
+            )
+            self._thread.start()
+
+    def _path(self, *parts: str) -> str:
+        return os.path.join(self.directory, *parts)
+
+    def _chunk_path(self, kind: str, chunk: int) -> str:
+        return self._path(kind, f"chunk-{chunk:06d}.npy")
+
+    @staticmethod
+    def _describe(array: Optional[DataArray]) -> Optional[dict]:
+        """Returns the coordinates of node or link results."""
+        if array is None:
+            return None
+        times = None
+        if "time" in array.dims:
+            times = [pd.Timestamp(time).isoformat() for time in array.time.values]
+        return {
+            "ids": [str(id) for id in array.id.values],
+            "vars": [str(var) for var in array.vars.values],
+            "times": times,
+        }
+
+    def _arrays(self, report: SimulationReport) -> dict[str, Optional[np.ndarray]]:
+        """Returns the report's results in the store's dimension order."""
+        arrays = {}
+        for kind, array in zip(_KINDS, (report.nodes, report.links)):
+            if array is None:
+                arrays[kind] = None
+                continue
+            dims = ("time", "id", "vars") if "time" in array.dims else ("id", "vars")
+            arrays[kind] = array.transpose(*dims).values
+        return arrays
+
+    def _initialise(self, report: SimulationReport):
+        """Creates the store's metadata from the first report."""
+        self._metadata = {
+            "version": 1,
+            "chunksize": self.chunksize,
+            "dtype": self.dtype.str,
+            "Node": self._describe(report.nodes),
+            "Link": self._describe(report.links),
+        }
+        for kind in _KINDS:
+            if self._metadata[kind] is not None:
+                os.makedirs(self._path(kind), exist_ok=True)
+        with open(self._path("metadata.json"), "w") as file:
+            json.dump(self._metadata, file)
+        open(self._path("scenarios.jsonl"), "a").close()
+
+    def _shape(self, kind: str) -> tuple[int, ...]:
+        """Returns the shape of a single scenario's results."""
+        metadata = self._metadata[kind]
+        shape = (len(metadata["ids"]), len(metadata["vars"]))
+        if metadata["times"] is not None:
+            shape = (len(metadata["times"]),) + shape
+        return shape
+
+    def _writer(self, kind: str, chunk: int) -> np.memmap:
+        """Returns the memory-mapped chunk file to be written to and creates it if necessary."""
+        if kind in self._writers and self._writers[kind][0] == chunk:
+            return self._writers[kind][1]
+        self._close_writer(kind)
+        path = self._chunk_path(kind, chunk)
+        if os.path.isfile(path):
+            memmap = open_memmap(path, mode="r+")
+        else:
+            memmap = open_memmap(
+                path,
+                mode="w+",
+                dtype=self.dtype,
+                shape=(self.chunksize,) + self._shape(kind),
+            )
+        self._writers[kind] = (chunk, memmap)
+        return memmap
+
+    def _close_writer(self, kind: str, sync: bool = False):
+        """Closes a chunk file. Unless sync is True, writing the data to disk is left to the operating system."""
+        if kind in self._writers:
+            memmap = self._writers.pop(kind)[1]
+            if sync:
+                memmap.flush()
+
+    def _reader(self, kind: str, chunk: int) -> np.memmap:
+        """Returns a read-only memory-mapped chunk file."""
+        key = (kind, chunk)
+        if key not in self._readers:
+            self._readers[key] = open_memmap(self._chunk_path(kind, chunk), mode="r")
+        return self._readers[key]
+
+    def _write(
+        self, arrays: dict[str, Optional[np.ndarray]], parameters: Optional[dict]
+    ):
+        """Writes the results and parameter set of a scenario."""
+        with self._lock:
+            scenario = self._count
+        chunk, position = divmod(scenario, self.chunksize)
+        for kind, values in arrays.items():
+            if self._metadata[kind] is None:
+                continue
+            if values is None or values.shape != self._shape(kind):
+                raise ValueError(
+                    f"Expected {kind.lower()} results with the shape {self._shape(kind)} but got "
+                    f"{None if values is None else values.shape}."
+                )
+            self._writer(kind, chunk)[position] = values
+            if position == self.chunksize - 1:
+                self._close_writer(kind)
+        with open(self._path("scenarios.jsonl"), "a") as file:
+            file.write(
+                json.dumps(
+                    {"scenario": scenario, "parameters": parameters}, default=_to_json
+                )
+                + "\n"
+            )
+        with self._lock:
+            self._count += 1
+
+    def _work(self):
+        """Writes queued reports in the background thread."""
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                if self._error is None:
+                    self._write(*item)
+            except BaseException as e:
+                logger.exception("Writing to the result store failed")
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def append(self, report: SimulationReport, parameters: Optional[dict] = None):
+        """Appends the results of a simulation.
+
+        Args:
+          report: OOPNET report object
+          parameters: JSON serializable parameter set of the scenario (e.g., the deltas passed to a
+            SimulationWorkerPool). NumPy arrays are stored as lists.
+
+        """
+        if self.readonly:
+            raise PermissionError("The result store was opened read-only.")
+        self._raise_error()
+        if self._metadata is None:
+            self._initialise(report)
+        arrays = self._arrays(report)
+        if self._queue is not None:
+            self._queue.put((arrays, parameters))
+        else:
+            self._write(arrays, parameters)
+
+    def flush(self):
+        """Waits until all appended reports are written and writes the current chunk files to disk."""
+        if self._queue is not None:
+            self._queue.join()
+        self._raise_error()
+        for _, memmap in self._writers.values():
+            memmap.flush()
+
+    def close(self):
+        """Writes all appended reports and stops the background thread."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+            self._queue = None
+        for kind in list(self._writers):
+            self._close_writer(kind, sync=True)
+        self._readers.clear()
+        self._raise_error()
+
+    def __len__(self) -> int:
+        """Returns the number of written scenarios."""
+        with self._lock:
+            return self._count
+
+    def __enter__(self) -> ResultStore:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def ids(self) -> dict[str, Optional[list[str]]]:
+        """Node and link IDs in the order of the store."""
+        return {
+            kind: (
+                None
+                if self._metadata is None or self._metadata[kind] is None
+                else self._metadata[kind]["ids"]
+            )
+            for kind in _KINDS
+        }
+
+    @property
+    def times(self) -> Optional[list[datetime.datetime]]:
+        """Points in time of the stored results or None for steady state analyses."""
+        for kind in _KINDS:
+            if self._metadata is not None and self._metadata[kind] is not None:
+                times = self._metadata[kind]["times"]
+                return (
+                    None
+                    if times is None
+                    else [datetime.datetime.fromisoformat(time) for time in times]
+                )
+        return None
+
+    @property
+    def parameters(self) -> list[Optional[dict]]:
+        """Parameter sets of all stored scenarios."""
+        if self._metadata is None:
+            return []
+        count = len(self)
+        parameters = []
+        with open(self._path("scenarios.jsonl")) as file:
+            for line in file:
+                if line.strip() and len(parameters) < count:
+                    parameters.append(json.loads(line)["parameters"])
+        return parameters
+
+    def read(
+        self,
+        kind: str,
+        vars: Optional[Sequence[str]] = None,
+        ids: Optional[Sequence[str]] = None,
+        times: Optional[Sequence[datetime.datetime]] = None,
+        scenarios: Union[slice, Sequence[int], None] = None,
+    ) -> Optional[DataArray]:
+        """Reads a slice of the stored node or link results.
+
+        Only the selected values are loaded from the memory-mapped chunk files.
+
+        Args:
+          kind: "Node" or "Link"
+          vars: variables to be read (default is all variables)
+          ids: element IDs to be read (default is all elements)
+          times: points in time to be read (default is all points in time, ignored for steady state analyses)
+          scenarios: slice or positions of the scenarios to be read (default is all scenarios)
+
+        Returns:
+          DataArray with the dimensions (scenario, time, id, vars) or (scenario, id, vars) for steady state analyses
+          or a Python None object, if the store doesn't contain results of this kind
+
+        """
+        if self._metadata is None or self._metadata[kind] is None:
+            return None
+        metadata = self._metadata[kind]
+        count = len(self)
+        if scenarios is None:
+            scenarios = slice(None)
+        positions = np.arange(count)[scenarios]
+
+        selection = []
+        coords = {"scenario": positions}
+        dims = ["scenario"]
+        if metadata["times"] is not None:
+            all_times = [pd.Timestamp(time) for time in metadata["times"]]
+            selected = _positions(
+                all_times,
+                None if times is None else [pd.Timestamp(t) for t in times],
+                "Time",
+            )
+            selection.append(selected)
+            coords["time"] = np.array(all_times)[selected]
+            dims.append("time")
+        for name, labels, selected in (
+            ("id", metadata["ids"], ids),
+            ("vars", metadata["vars"], vars),
+        ):
+            selected_positions = _positions(labels, selected, name)
+            selection.append(selected_positions)
+            coords[name] = np.array(labels, dtype=object)[selected_positions]
+            dims.append(name)
+
+        shape = [len(positions)] + [len(coords[dim]) for dim in dims[1:]]
+        data = np.empty(shape, dtype=self.dtype)
+        chunks, local = np.divmod(positions, self.chunksize)
+        for chunk in np.unique(chunks):
+            mask = chunks == chunk
+            memmap = self._reader(kind, int(chunk))
+            index = [local[mask]] + [
+                np.arange(size)[selected]
+                for size, selected in zip(memmap.shape[1:], selection)
+            ]
+            data[mask] = memmap[np.ix_(*index)]
+        return DataArray(data, dims=dims, coords=coords)
+
+    def report(self, scenario: int) -> SimulationReport:
+        """Returns the results of a single scenario.
+
+        Args:
+          scenario: position of the scenario
+
+        Returns:
+          SimulationReport object
+
+        """
+        if not -len(self) <= scenario < len(self):
+            raise IndexError(f"Scenario {scenario} is out of range.")
+        arrays = [self.read(kind, scenarios=[scenario]) for kind in _KINDS]
+        return SimulationReport.from_arrays(
+            *[
+                None if array is None else array.isel(scenario=0, drop=True)
+                for array in arrays
+            ]
+        )
+
+    def __repr__(self) -> str:
+        return f"ResultStore({self.directory!r}, scenarios={len(self)})"
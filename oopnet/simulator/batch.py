@@ -0,0 +1,120 @@
+from __future__ import annotations
+import logging
+import tempfile
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from copy import deepcopy
+from typing import Callable, Iterable, Iterator, Optional, Union, TYPE_CHECKING
+
+from oopnet.report.report import SimulationReport, stack_reports
+from oopnet.simulator.epanet2 import scratch_directory
+
+if TYPE_CHECKING:
+    from oopnet.elements.network import Network
+
+logger = logging.getLogger(__name__)
+
+
+def _simulate(
+    scenario: Union[Network, Callable[[Network], Optional[Network]]],
+    network: Optional[Network],
+    path: Optional[str],
+    run_kwargs: dict,
+) -> SimulationReport:
+    """Simulates a single scenario in its own scratch directory.
+
+    Args:
+      scenario: either a Network or a callable that modifies a copy of network
+      network: base Network used for modifier callables
+      path: parent directory for the scratch directory
+      run_kwargs: keyword arguments passed to Network.run
+
+    Returns:
+      OOPNET report object
+
+    """
+    if callable(scenario):
+        modified = deepcopy(network)
+        scenario = scenario(modified) or modified
+    with tempfile.TemporaryDirectory(
+        prefix="oopnet_", dir=path or scratch_directory()
+    ) as scratch:
+        return scenario.run(path=scratch, **run_kwargs)
+
+
+def _executor_class(executor: str) -> type[Executor]:
+    """Returns the executor class by its name."""
+    if executor == "process":
+        return ProcessPoolExecutor
+    elif executor == "thread":
+        return ThreadPoolExecutor
+    raise ValueError(
+        f"Executor must either be 'process', 'thread' or a concurrent.futures.Executor but {executor!r} was submitted."
+    )
+
+
+def _iterate(
+    scenarios: list,
+    network: Optional[Network],
+    executor: Union[type[Executor], Executor],
+    max_workers: Optional[int],
+    path: Optional[str],
+    run_kwargs: dict,
+) -> Iterator[SimulationReport]:
+    n = len(scenarios)
+    args = ([network] * n, [path] * n, [run_kwargs] * n)
+    if isinstance(executor, Executor):
+        yield from executor.map(_simulate, scenarios, *args)
+    else:
+        with executor(max_workers=max_workers) as pool:
+            yield from pool.map(_simulate, scenarios, *args)
+
+
+def run_many(
+    scenarios: Iterable[Union[Network, Callable[[Network], Optional[Network]]]],
+    network: Optional[Network] = None,
+    executor: Union[str, Executor] = "process",
+    max_workers: Optional[int] = None,
+    path: Optional[str] = None,
+    stack: bool = False,
+    **run_kwargs,
+) -> Union[Iterator[SimulationReport], SimulationReport]:
+    """Simulates many scenarios in parallel.
+
+    A scenario is either a Network object or a callable, that takes a copy of the base network passed as network and
+    modifies it (e.g., by changing junction demands). If the callable returns a Network, this Network is simulated
+    instead of the modified copy. When using a process executor, the callables have to be picklable (e.g., module level
+    functions).
+
+    Every simulation runs in its own temporary scratch directory, that is removed after the simulation is finished.
+
+    Args:
+      scenarios: Networks or modifier callables to be simulated
+      network: base Network for modifier callables
+      executor: "process" for a ProcessPoolExecutor, "thread" for a ThreadPoolExecutor or an existing
+        concurrent.futures.Executor object (it won't be shut down)
+      max_workers: maximum number of workers used by the executor
+      path: parent directory for the scratch directories. If path is a Python None object the directory returned by
+        scratch_directory is used.
+      stack: if True, all reports are stacked into a single report with an additional "scenario" dimension
+      **run_kwargs: further keyword arguments passed to Network.run (e.g., engine or startdatetime)
+
+    Returns:
+      iterator over the OOPNET report objects in the order of the scenarios, or a single stacked report if stack is True
+
+    Raises:
+      ValueError: if the executor is unknown or scenarios are defined by modifier functions without passing a base
+        network. The arguments are checked when calling run_many, not when iterating over the reports.
+
+    """
+    scenarios = list(scenarios)
+    if not isinstance(executor, Executor):
+        executor = _executor_class(executor)
+    if network is None and any(callable(scenario) for scenario in scenarios):
+        raise ValueError(
+            "A base network has to be passed when running scenarios defined by modifier functions."
+        )
+    logger.info(f"Simulating {len(scenarios)} scenarios")
+    reports = _iterate(scenarios, network, executor, max_workers, path, run_kwargs)
+    if stack:
+        return stack_reports(list(reports))
+    return reports
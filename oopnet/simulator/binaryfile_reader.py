@@ -1,30 +1,152 @@
+import datetime
 import logging
+import os
+from typing import Optional
+
 import numpy as np
+import xarray as xr
+
+from oopnet.simulator.reportfile_reader import seconds2datetime
+from oopnet.utils.oopnet_logging import logging_decorator
 
 logger = logging.getLogger(__name__)
 
+MAGIC_NUMBER = 516114521
+PROLOG_INTEGERS = 15
+TITLE_LENGTH = 80
+FILENAME_LENGTH = 260
+ID_LENGTH = 32
+EPILOG_LENGTH = 28
+
+NODE_VARS = ["Demand", "Head", "Pressure", "Quality"]
+LINK_VARS = [
+    "Flow",
+    "Velocity",
+    "Headloss",
+    "Quality",
+    "Status",
+    "Setting",
+    "Reaction",
+    "F-Factor",
+]
+
+
+class BinaryFileFormatError(Exception):
+    """Exception for files that are not valid EPANET binary output files.
+
+    EPANET writes a magic number to the beginning and the end of every binary output file. If these numbers are
+    missing, the file was either not written by EPANET or the simulation was aborted.
+
+    """
+
+    def __init__(self, filename):
+        msg = f"{filename!r} is not a valid EPANET binary output file."
+        super().__init__(msg)
+
 
+@logging_decorator(logger)
 class BinaryFileReader:
-    def __new__(cls, filename: str, *args, **kwargs):
+    """Reads the simulation results from an EPANET binary output file.
+
+    The binary output file holds the results in full precision and is not limited by the Network's Reportprecision
+    settings. All node and link variables stored in the file are read, no matter which report parameters are enabled.
+    Results are returned in the same structure as the ReportFileReader does.
+
+    """
+
+    def __new__(
+        cls, filename: str, startdatetime: Optional[datetime.datetime] = None
+    ) -> tuple[xr.DataArray, xr.DataArray]:
+        logger.debug("Reading Binary File")
         with open(filename, "rb") as file:
-            prolog = np.fromfile(file, dtype=np.int32, count=15)
-            cls._read_prolog(prolog)
-
-    @classmethod
-    def _read_prolog(cls, prolog):
-        print(prolog)
-        magic = prolog[0]
-        version = prolog[1]
-        nnodes = prolog[2]
-        ntanks = prolog[3]
-        nlinks = prolog[4]
-        npumps = prolog[5]
-        nvalve = prolog[6]
-        # wqopt = QualType(prolog[7])
-        # srctrace = prolog[8]
-        # flowunits = FlowUnits(prolog[9])
-        # presunits = PressureUnits(prolog[10])
-        # statsflag = StatisticsType(prolog[11])
-        # reportstart = prolog[12]
-        # reportstep = prolog[13]
-        # duration = prolog[14]
+            prolog = np.fromfile(file, dtype=np.int32, count=PROLOG_INTEGERS)
+            if len(prolog) < PROLOG_INTEGERS or prolog[0] != MAGIC_NUMBER:
+                raise BinaryFileFormatError(filename)
+            (
+                _,
+                _,
+                nnodes,
+                ntanks,
+                nlinks,
+                npumps,
+                _,
+                _,
+                _,
+                _,
+                _,
+                _,
+                reportstart,
+                reportstep,
+                duration,
+            ) = (int(x) for x in prolog)
+
+            file.seek(-EPILOG_LENGTH, os.SEEK_END)
+            epilog = np.fromfile(file, dtype=np.int32, count=EPILOG_LENGTH // 4)
+            if epilog[-1] != MAGIC_NUMBER:
+                raise BinaryFileFormatError(filename)
+            nperiods = int(epilog[-3])
+
+            file.seek(
+                PROLOG_INTEGERS * 4
+                + 3 * TITLE_LENGTH
+                + 2 * FILENAME_LENGTH
+                + 2 * ID_LENGTH
+            )
+            node_ids = cls._read_ids(file, nnodes)
+            link_ids = cls._read_ids(file, nlinks)
+            # skip start and end nodes, link types, tank indices and cross-sectional areas
+            file.seek(3 * nlinks * 4 + 2 * ntanks * 4, os.SEEK_CUR)
+            elevation = np.fromfile(file, dtype=np.float32, count=nnodes)
+            length = np.fromfile(file, dtype=np.float32, count=nlinks)
+            diameter = np.fromfile(file, dtype=np.float32, count=nlinks)
+
+            # skip the energy usage section
+            results_offset = file.tell() + npumps * 28 + 4
+
+        results = np.memmap(
+            filename,
+            dtype=np.float32,
+            mode="r",
+            offset=results_offset,
+            shape=(nperiods, 4 * nnodes + 8 * nlinks),
+        )
+        nodes = np.empty((nperiods, nnodes, len(NODE_VARS) + 1), dtype=np.float32)
+        nodes[:, :, 0] = elevation
+        nodes[:, :, 1:] = (
+            results[:, : 4 * nnodes].reshape(nperiods, 4, nnodes).transpose(0, 2, 1)
+        )
+        links = np.empty((nperiods, nlinks, len(LINK_VARS) + 2), dtype=np.float32)
+        links[:, :, 0] = length
+        links[:, :, 1] = diameter
+        links[:, :, 2:] = (
+            results[:, 4 * nnodes :].reshape(nperiods, 8, nlinks).transpose(0, 2, 1)
+        )
+        del results
+
+        nodes = xr.DataArray(
+            nodes,
+            dims=("time", "id", "vars"),
+            coords={"id": node_ids, "vars": ["Elevation"] + NODE_VARS},
+        )
+        links = xr.DataArray(
+            links,
+            dims=("time", "id", "vars"),
+            coords={"id": link_ids, "vars": ["Length", "Diameter"] + LINK_VARS},
+        )
+        if duration > 0:
+            times = [
+                seconds2datetime(reportstart + period * reportstep, startdatetime)
+                for period in range(nperiods)
+            ]
+            nodes = nodes.assign_coords(time=times)
+            links = links.assign_coords(time=times)
+        else:
+            nodes = nodes.isel(time=0, drop=True)
+            links = links.isel(time=0, drop=True)
+        return nodes, links
+
+    @staticmethod
+    def _read_ids(file, count: int) -> list[str]:
+        """Reads a block of zero-padded ID strings."""
+        ids = np.fromfile(file, dtype=f"S{ID_LENGTH}", count=count)
+        return [x.decode() for x in ids]
@@ -0,0 +1,177 @@
+from __future__ import annotations
+import datetime
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from oopnet.report.report import SimulationReport
+
+logger = logging.getLogger(__name__)
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of a SimulationCache.
+
+    Attributes:
+      hits: number of simulations answered from the cache
+      misses: number of simulations that had to be run
+      maxsize: maximum number of reports kept in memory
+      currsize: number of reports currently kept in memory
+
+    """
+
+    hits: int
+    misses: int
+    maxsize: Optional[int]
+    currsize: int
+
+
+class SimulationCache:
+    """Content-addressed cache for simulation results.
+
+    Reports are stored under a hash of the written EPANET input file, the simulation's startdatetime and the used
+    engine (including the result reader and if the report is lazy). Simulating a Network, that is identical to one that
+    was already simulated, returns a shallow copy of the cached report instead of running EPANET again. The copy's
+    timings describe the current simulation, while its results are shared between all hits and should not be modified.
+
+    Reports are kept in memory in a least recently used (LRU) cache. If a directory is passed, reports are additionally
+    pickled to this directory and can be reused by other processes and sessions.
+
+    Attributes:
+      maxsize: maximum number of reports kept in memory. If maxsize is a Python None object, the in-memory cache is
+        unbounded, if maxsize is 0 reports are only stored in directory
+      directory: optional directory for storing reports on disk
+      hits: number of simulations answered from the cache
+      misses: number of simulations that had to be run
+
+    """
+
+    def __init__(self, maxsize: Optional[int] = 128, directory: Optional[str] = None):
+        self.maxsize = maxsize
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._reports: OrderedDict[str, SimulationReport] = OrderedDict()
+        self._lock = threading.Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(
+        filename: str,
+        startdatetime: Optional[datetime.datetime] = None,
+        engine: str = "",
+        content: Optional[bytes] = None,
+    ) -> str:
+        """Computes the cache key of a simulation.
+
+        Args:
+          filename: written EPANET input file
+          startdatetime: start datetime passed to the simulation
+          engine: string identifying the engine, its version and the result reader
+          content: content of the written input file, if it is already known (the file isn't read again then)
+
+        Returns:
+          hexadecimal SHA-256 digest
+
+        """
+        sha = hashlib.sha256()
+        if content is None:
+            with open(filename, "rb") as file:
+                content = file.read()
+        sha.update(content)
+        sha.update(f"\0{startdatetime!r}\0{engine}".encode())
+        return sha.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def get(self, key: str) -> Optional[SimulationReport]:
+        """Returns the cached report for key and updates the hit/miss statistics.
+
+        Args:
+          key: cache key created by SimulationCache.key
+
+        Returns:
+          cached OOPNET report object or a Python None object, if no report is cached for key
+
+        """
+        with self._lock:
+            report = self._reports.get(key)
+            if report is not None:
+                self._reports.move_to_end(key)
+                self.hits += 1
+                return report
+        if self.directory is not None and os.path.isfile(self._path(key)):
+            with open(self._path(key), "rb") as file:
+                report = pickle.load(file)
+            self._store(key, report)
+        with self._lock:
+            if report is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return report
+
+    def put(self, key: str, report: SimulationReport):
+        """Stores a report in the cache.
+
+        Args:
+          key: cache key created by SimulationCache.key
+          report: OOPNET report object
+
+        """
+        self._store(key, report)
+        if self.directory is not None:
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as file:
+                pickle.dump(report, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._path(key))
+
+    def _store(self, key: str, report: SimulationReport):
+        """Stores a report in memory and evicts the least recently used reports."""
+        if self.maxsize == 0:
+            return
+        with self._lock:
+            self._reports[key] = report
+            self._reports.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self._reports) > self.maxsize:
+                    self._reports.popitem(last=False)
+
+    def info(self) -> CacheInfo:
+        """Returns the cache's hit/miss statistics."""
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._reports))
+
+    def clear(self):
+        """Removes all reports from memory and from directory and resets the statistics."""
+        with self._lock:
+            self._reports.clear()
+            self.hits = 0
+            self.misses = 0
+        if self.directory is not None:
+            for name in os.listdir(self.directory):
+                if name.endswith(".pkl"):
+                    os.remove(os.path.join(self.directory, name))
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._reports)
+
+    def __repr__(self) -> str:
+        hits, misses, maxsize, currsize = self.info()
+        return f"SimulationCache(hits={hits}, misses={misses}, maxsize={maxsize}, currsize={currsize})"
@@ -1,24 +1,71 @@
 from __future__ import annotations
+import asyncio
+import copy
 import datetime
+import functools
 import os
 from sys import platform as _platform
 import subprocess
+import threading
 import uuid
 import shutil
 import re
-from typing import Union, Optional, TYPE_CHECKING
+from typing import Union, Optional, Type, TYPE_CHECKING
 import logging
 
-from oopnet.simulator.reportfile_reader import ReportFileReader
+from oopnet.simulator.reportfile_reader import (
+    ReportFileReader,
+    report2blocks,
+    blocks2xray,
+)
 from oopnet.simulator.binaryfile_reader import BinaryFileReader
+from oopnet.simulator.toolkit import ToolkitReader, get_version
+from oopnet.simulator.error_manager import ErrorManager
+from oopnet.simulator.timing import PhaseTimer
 from oopnet.utils import utils
-from oopnet.report.report import SimulationReport
+from oopnet.report.report import SimulationReport, LazySimulationReport
 from oopnet.utils.oopnet_logging import logging_decorator
 
 if TYPE_CHECKING:
     from oopnet.elements.network import Network
+    from oopnet.simulator.cache import SimulationCache
 
 logger = logging.getLogger(__name__)
+timings_logger = logging.getLogger(f"{__name__}.timings")
+
+TMPFS = "/dev/shm"
+
+
+def scratch_directory() -> str:
+    """Returns the default directory for temporary simulation files.
+
+    The directory is chosen in the following order:
+
+    - the directory set in the OOPNET_SCRATCH environment variable
+    - a directory on a memory-backed tmpfs (/dev/shm), if available, to avoid writing to persistent storage
+    - the folder "tmp" in the current working directory
+
+    Returns:
+      path to the scratch directory, that is created if it does not exist
+
+    """
+    path = os.environ.get("OOPNET_SCRATCH")
+    if path:
+        utils.mkdir(path)
+        return path
+    if os.path.isdir(TMPFS) and os.access(TMPFS, os.W_OK | os.X_OK):
+        path = os.path.join(
+            TMPFS, f"oopnet-{os.getuid()}" if hasattr(os, "getuid") else "oopnet"
+        )
+        try:
+            os.makedirs(path, exist_ok=True)
+        except OSError:
+            pass
+        else:
+            if os.access(path, os.W_OK | os.X_OK):
+                return path
+    utils.mkdir("tmp")
+    return "tmp"
 
 
 # todo: add proper documentation
@@ -31,7 +78,20 @@ class ModelSimulator:
       thing: either an OOPNET network object or the filename of an EPANET input file
       filename: if thing is an OOPNET network, filename is an option to perform command line EPANET simulations with a specific filename. If filename is a Python None object then a file with a random UUID (universally unique identifier) is generated
       delete: if delete is True the EPANET Input and Report file is deleted, if False then the simulation results won't be deleted and are stored in a folder named path
-      path: Path were to perform the simulations. If path is a Python None object then a tmp-folder is generated
+      path: Path were to perform the simulations. If path is a Python None object and delete is True, the scratch
+        directory returned by scratch_directory (e.g., on /dev/shm) is used, otherwise a tmp-folder is generated
+      engine: EPANET engine used for the simulation. "cli" calls command line EPANET in a separate process, "toolkit"
+        runs the simulation in-process with the EPANET toolkit shared library
+      library: path to the EPANET shared library used by the "toolkit" engine. If library is a Python None object, the
+        library is searched for
+      reader: specifies whether the report file (ReportFileReader) or the binary output file (BinaryFileReader) created
+        by command line EPANET is read
+      cache: optional SimulationCache. If the written input file was already simulated, the cached report is returned
+        instead of running EPANET again
+      fifo: if True, command line EPANET writes its report to a named pipe that is read while EPANET is running, so
+        the report file is never stored. Only available for the "cli" engine on POSIX systems.
+      lazy: if True, a LazySimulationReport is returned, that only parses the results when they are accessed. The
+        report file is kept until the report object is garbage collected. Only available when reading report files.
 
     Returns:
       OOPNET report object
@@ -46,6 +106,14 @@ class ModelSimulator:
         path: Optional[str] = None,
         startdatetime: Optional[datetime.datetime] = None,
         output: bool = False,
+        engine: str = "cli",
+        library: Optional[str] = None,
+        reader: Union[
+            Type[ReportFileReader], Type[BinaryFileReader]
+        ] = ReportFileReader,
+        cache: Optional[SimulationCache] = None,
+        fifo: bool = False,
+        lazy: bool = False,
     ):
         self.thing = thing
         self.filename = filename
@@ -53,14 +121,27 @@ class ModelSimulator:
         self.path = path
         self.startdatetime = startdatetime
         self.output = output
+        self.engine = engine
+        self.library = library
+        self.reader = reader
+        self.cache = cache
+        self.fifo = fifo
+        self.lazy = lazy
         self.command = None
+        self._cache_key = None
+        self._report_content = None
+        self._content = None
+        self._timer = PhaseTimer()
 
     def _set_path(self):
         """Sets path for temporary file placement."""
         # Set Path and generate it, if it does not exist
         if self.path is None:
-            self.path = "tmp"
-            utils.mkdir(self.path)
+            if self.delete:
+                self.path = scratch_directory()
+            else:
+                self.path = "tmp"
+                utils.mkdir(self.path)
         elif isinstance(self.path, str):
             if not os.path.isdir(self.path):
                 utils.mkdir(self.path)
@@ -106,8 +187,8 @@ class ModelSimulator:
         self.command = cmd
         logger.debug(f"Running command {cmd}")
 
-    def _execute(self):
-        """Executes simulation and parses output."""
+    def _log_output(self, out: bytes, err: bytes):
+        """Logs EPANET's stdout and stderr if output is enabled."""
 
         def decorate_string(stdout_bytes: bytes) -> str:
             """
@@ -125,38 +206,292 @@ class ModelSimulator:
             out = re.sub(pattern, ". ", out).strip()
             return out
 
-        self.thing.write(filename=self.filename)
-
-        cmd = subprocess.run(self.command, capture_output=True, shell=False)
-        out, err = cmd.stdout, cmd.stderr
         if out and self.output:
             logger.info(decorate_string(out))
         if err and self.output:
             logger.info(decorate_string(err))
 
-    def run(self):
-        """Simulates a hydraulic model using EPANET."""
-        logging.info("Simulating model")
+    def _execute(self):
+        """Executes simulation and parses output."""
+        if self.fifo:
+            return self._execute_fifo()
+        cmd = subprocess.run(self.command, capture_output=True, shell=False)
+        self._log_output(cmd.stdout, cmd.stderr)
+
+    def _execute_fifo(self):
+        """Executes simulation while reading EPANET's report from a named pipe."""
+        rpt_file = self.filename.replace(".inp", ".rpt")
+        os.mkfifo(rpt_file)
+        # opening the read end without blocking and keeping a write end open ourselves ensures, that the reader
+        # neither blocks until EPANET opens the pipe nor reads EOF before EPANET started writing
+        read_fd = os.open(rpt_file, os.O_RDONLY | os.O_NONBLOCK)
+        os.set_blocking(read_fd, True)
+        write_fd = os.open(rpt_file, os.O_WRONLY)
+        content = []
+
+        def read():
+            with os.fdopen(read_fd, "r") as fifo:
+                content.extend(fifo.readlines())
+
+        thread = threading.Thread(target=read, daemon=True)
+        thread.start()
+        try:
+            cmd = subprocess.run(self.command, capture_output=True, shell=False)
+        finally:
+            os.close(write_fd)
+            thread.join()
+        self._report_content = content
+        self._log_output(cmd.stdout, cmd.stderr)
+
+    async def _aexecute(self):
+        """Executes simulation asynchronously."""
+        proc = await asyncio.create_subprocess_exec(
+            *self.command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            out, err = await proc.communicate()
+        except asyncio.CancelledError:
+            proc.kill()
+            await proc.wait()
+            raise
+        self._log_output(out, err)
+
+    def _remove_files(self, report: bool = True):
+        """Removes the EPANET input, report and binary output files.
+
+        Args:
+          report: if False, the report file is kept
+
+        """
+        os.remove(self.filename)
+        rpt_file = self.filename.replace(".inp", ".rpt")
+        out_file = self.filename.replace(".inp", ".out")
+        if report and os.path.exists(rpt_file):
+            os.remove(rpt_file)
+        if os.path.isfile(out_file):
+            os.remove(out_file)
+
+    def _prepare(self):
+        """Checks the engine and prepares the simulation's path, filename and report settings."""
+        if self.engine not in ("cli", "toolkit"):
+            raise ValueError(
+                f"Engine must either be 'cli' or 'toolkit' but {self.engine!r} was submitted."
+            )
+        if self.fifo and (self.engine != "cli" or not hasattr(os, "mkfifo")):
+            raise ValueError(
+                "FIFO mode is only available for the 'cli' engine on systems supporting named pipes."
+            )
+        if self.lazy and (
+            self.engine != "cli" or self.fifo or self.reader is not ReportFileReader
+        ):
+            raise ValueError(
+                "Lazy reports are only available when reading report files written by the 'cli' engine."
+            )
         self._set_path()
         self._set_filename()
         self._setup_report()
-        self._create_command()
-        self._execute()
 
+    def _engine_version(self) -> str:
+        """Returns a string identifying the engine, its version, the result reader and if the report is lazy."""
+        if self.engine == "toolkit":
+            return f"toolkit {get_version(self.library)}"
+        executable = shutil.which(self.command[0]) or self.command[0]
         try:
-            rpt = SimulationReport(
-                self.filename.replace(".inp", ".rpt"),
-                startdatetime=self.startdatetime,
-                reader=ReportFileReader,
+            stat = os.stat(executable)
+            executable += f" {stat.st_size} {stat.st_mtime_ns}"
+        except OSError:
+            # the simulation reports the missing executable itself
+            pass
+        reader = getattr(self.reader, "__name__", repr(self.reader))
+        lazy = " lazy" if self.lazy else ""
+        return f"cli {executable} {reader}{lazy}"
+
+    def _write(self):
+        """Writes the input file."""
+        with self._timer.phase("write"):
+            self._content = self.thing.to_bytes()
+            with open(self.filename, "wb") as fid:
+                fid.write(self._content)
+
+    def _lookup_cache(self) -> Optional[SimulationReport]:
+        """Looks up the simulation in the cache.
+
+        Returns:
+          copy of the cached OOPNET report object holding this simulation's timings or a Python None object, if the
+          simulation has to be run
+
+        """
+        if self.cache is None:
+            return None
+        with self._timer.phase("cache"):
+            self._cache_key = self.cache.key(
+                self.filename,
+                self.startdatetime,
+                self._engine_version(),
+                content=self._content,
             )
+            rpt = self.cache.get(self._cache_key)
+        if rpt is not None:
+            logger.debug(f"Cache hit for {self._cache_key}")
+            if self.delete:
+                with self._timer.phase("cleanup"):
+                    self._remove_files()
+            rpt = copy.copy(rpt)
+            rpt.timings = self._timer.timings
+            self._log_timings()
+        return rpt
+
+    def _read_cli_results(self) -> SimulationReport:
+        """Reads the results of a command line EPANET simulation from the report or the binary output file."""
+        rpt_file = self.filename.replace(".inp", ".rpt")
+        if self.lazy:
+            with self._timer.phase("parse"):
+                return LazySimulationReport(
+                    rpt_file, startdatetime=self.startdatetime, delete=self.delete
+                )
+        if self.reader is ReportFileReader:
+            with self._timer.phase("parse"):
+                if self._report_content is None:
+                    with open(rpt_file, "r") as fid:
+                        self._report_content = fid.readlines()
+                blocks = report2blocks(self._report_content)
+            with self._timer.phase("build arrays"):
+                return SimulationReport.from_arrays(
+                    *blocks2xray(blocks, self.startdatetime)
+                )
+
+        with self._timer.phase("parse"):
+            if self.reader is BinaryFileReader:
+                error_manager = ErrorManager()
+                if self._report_content is None:
+                    error_manager.check_file(rpt_file)
+                else:
+                    error_manager.check_lines(self._report_content)
+                error_manager.raise_errors()
+                rpt_file = self.filename.replace(".inp", ".out")
+            return SimulationReport(
+                rpt_file, startdatetime=self.startdatetime, reader=self.reader
+            )
+
+    def _read_report(self) -> SimulationReport:
+        """Reads the simulation results and removes the simulation files if delete is True."""
+        rpt = None
+        try:
+            if self.engine == "toolkit":
+                with self._timer.phase("execute"):
+                    rpt = SimulationReport(
+                        self.filename,
+                        startdatetime=self.startdatetime,
+                        reader=functools.partial(ToolkitReader, library=self.library),
+                    )
+            else:
+                rpt = self._read_cli_results()
         finally:
             if self.delete:
-                os.remove(self.filename)
-                rpt_file = self.filename.replace(".inp", ".rpt")
-                out_file = self.filename.replace(".inp", ".out")
-                if os.path.isfile(rpt_file):
-                    os.remove(rpt_file)
-                if os.path.isfile(out_file):
-                    os.remove(out_file)
-        if rpt:
+                with self._timer.phase("cleanup"):
+                    # lazy reports remove their report file themselves
+                    self._remove_files(report=not isinstance(rpt, LazySimulationReport))
+        rpt.timings = self._timer.timings
+        self._log_timings()
+        if self.cache is not None:
+            self.cache.put(self._cache_key, rpt)
+        return rpt
+
+    def _log_timings(self):
+        """Emits a structured log record containing the timings of the simulation's phases."""
+        timings_logger.debug(
+            "Simulation timings: "
+            + ", ".join(
+                f"{name} {timing.wall:.6f} s"
+                for name, timing in self._timer.timings.items()
+            ),
+            extra={
+                "engine": self.engine,
+                "inputfile": self.filename,
+                "timings": self._timer.as_dict(),
+            },
+        )
+
+    def run(self):
+        """Simulates a hydraulic model using EPANET."""
+        return self._run(PhaseTimer())
+
+    def _run(self, timer: PhaseTimer) -> SimulationReport:
+        logging.info("Simulating model")
+        self._timer = timer
+        with self._timer.phase("setup"):
+            self._prepare()
+            if self.engine == "cli":
+                self._create_command()
+
+        self._write()
+        rpt = self._lookup_cache()
+        if rpt is not None:
             return rpt
+        if self.engine == "cli":
+            with self._timer.phase("execute"):
+                self._execute()
+        return self._read_report()
+
+    async def arun(
+        self, semaphore: Optional[asyncio.Semaphore] = None
+    ) -> SimulationReport:
+        """Simulates a hydraulic model using EPANET without blocking the event loop.
+
+        Command line EPANET is started as an asyncio subprocess, while writing the input file, cache lookups and parsing
+        the results are done in the event loop's default executor. Simulations using the toolkit engine are run in the
+        executor as a whole, as are simulations in FIFO mode.
+
+        Only the wall-clock time of the phases is recorded in the report's timings, their CPU times are None. The
+        process' CPU time would include all other coroutines, executor jobs and simulations running concurrently.
+
+        Args:
+          semaphore: semaphore limiting the number of concurrent simulations
+
+        Returns:
+          OOPNET report object
+
+        """
+        if semaphore is None:
+            return await self._arun()
+        async with semaphore:
+            return await self._arun()
+
+    async def _arun(self) -> SimulationReport:
+        logging.info("Simulating model asynchronously")
+        loop = asyncio.get_running_loop()
+        if self.engine == "toolkit" or self.fifo:
+            return await loop.run_in_executor(None, self._run, PhaseTimer(cpu=False))
+
+        self._timer = PhaseTimer(cpu=False)
+        with self._timer.phase("setup"):
+            self._prepare()
+            self._create_command()
+        write = loop.run_in_executor(None, self._write)
+        try:
+            # cancelling the task doesn't stop the write, so it's shielded and the files are removed when it's done
+            await asyncio.shield(write)
+            rpt = await loop.run_in_executor(None, self._lookup_cache)
+            if rpt is not None:
+                return rpt
+            with self._timer.phase("execute"):
+                await self._aexecute()
+        except BaseException:
+            write.add_done_callback(self._discard_files)
+            raise
+        return await loop.run_in_executor(None, self._read_report)
+
+    def _discard_files(self, write: asyncio.Future):
+        """Removes the files of a failed or cancelled asynchronous simulation after its input file was written.
+
+        Args:
+          write: future of the input file's write step
+
+        """
+        if not write.cancelled():
+            # a failed write was reported by the simulation's exception already
+            write.exception()
+        if self.delete and os.path.isfile(self.filename):
+            self._remove_files()
@@ -1,4 +1,5 @@
 from re import compile
+from typing import Iterable
 
 from oopnet.simulator.simulation_errors import get_error_list, EPANETSimulationError
 
@@ -64,3 +65,26 @@ class ErrorManager:
             raise EPANETSimulationError(
                 [err(msg, details) for err, msg, details in self.found_errors]
             )
+
+    def check_file(self, filename: str):
+        """Checks all lines of an EPANET report file for errors and stores them together with their details.
+
+        Args:
+            filename: report file to be checked
+
+        """
+        with open(filename, "r") as fid:
+            self.check_lines(fid)
+
+    def check_lines(self, lines: Iterable[str]):
+        """Checks the lines of an EPANET report for errors and stores them together with their details.
+
+        Args:
+            lines: report lines to be checked
+
+        """
+        error_found = False
+        for line in lines:
+            if error_found and len(line.strip()) != 0:
+                self.append_error_details(line)
+            error_found = self.check_line(line)
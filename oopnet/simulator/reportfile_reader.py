@@ -1,9 +1,13 @@
 from typing import Optional, Union
 import datetime
+import mmap
 import re
 import logging
+import warnings
 from collections import Counter
+from dataclasses import dataclass
 
+import numpy as np
 import pandas as pd
 import xarray as xr
 from xarray import DataArray, Dataset
@@ -30,6 +34,25 @@ def str2hms(timestring: str) -> tuple[int, int, float]:
     return hours, minutes, seconds
 
 
+def seconds2datetime(
+    seconds: float, startdatetime: Optional[datetime.datetime] = None
+) -> datetime.datetime:
+    """Converts the seconds passed since the simulation start to a datetime object.
+
+    Args:
+      seconds: seconds passed since the simulation start
+      startdatetime: simulation start (default is 01-01-2016)
+
+    Returns:
+        point in time as datetime object
+    """
+    if startdatetime is None:
+        startdatetime = datetime.datetime(
+            year=2016, month=1, day=1, hour=0, minute=0, second=0
+        )
+    return startdatetime + datetime.timedelta(seconds=seconds)
+
+
 def blockkey2typetime(
     blockkey: str, startdatetime: Optional[datetime.datetime] = None
 ) -> tuple[str, datetime.datetime]:
@@ -49,71 +72,98 @@ def blockkey2typetime(
     if len(vals) > 3:
         time = vals[3]
         hours, minutes, seconds = str2hms(time)
-        if startdatetime is None:
-            today = datetime.datetime(
-                year=2016, month=1, day=1, hour=0, minute=0, second=0
-            )
-        else:
-            today = startdatetime
-        time = today + datetime.timedelta(hours=hours, minutes=minutes, seconds=seconds)
+        time = seconds2datetime(hours * 3600 + minutes * 60 + seconds, startdatetime)
         # time = datetime.timedelta(hours=hours, minutes=minutes, seconds=seconds)
     else:
         time = None
     return kind, time
 
 
-def lst2xray(lst: list) -> xr.DataArray:
-    """
+def _split_item(item: str) -> list[str]:
+    new_entries = []
+    new_entry = ""
+    for index, char in enumerate(item):
+        if char in ["+", "-"] and new_entry and index != 0 and item[index - 1] != "e":
+            new_entries.append(new_entry)
+            new_entry = ""
+        new_entry += char
+    if new_entry:
+        new_entries.append(new_entry)
+    return new_entries
+
+
+def split_glued_values(entry: list[str]) -> list[str]:
+    """Splits values of a tokenized report line, that EPANET glued together (e.g., "12.3-4.5").
 
     Args:
-      lst: list:
+      entry: tokens of a report line
 
     Returns:
+      tokens with separated values
 
     """
+    new_entry = []
+    for item in entry:
+        c = Counter(item)
+        if (
+            "+" in c
+            and "-" in c
+            or "+" in c
+            and c["+"] > 1
+            or "-" in c
+            and (c["-"] > 1 or item[0] != "-" and item[0].isnumeric())
+        ):
+            new_entry.extend(_split_item(item))
+        else:
+            new_entry.append(item)
+    return new_entry
 
-    def split_item(item):
-        new_entries = []
-        new_entry = ""
-        for index, char in enumerate(item):
-            if (
-                char in ["+", "-"]
-                and new_entry
-                and index != 0
-                and item[index - 1] != "e"
-            ):
-                new_entries.append(new_entry)
-                new_entry = ""
-            new_entry += char
-        if new_entry:
-            new_entries.append(new_entry)
-        return new_entries
-
-    # check for invalid values
-    for entry_index, entry in enumerate(lst):
-        new_entry = []
-        for index, item in enumerate(entry):
-            c = Counter(item)
-            if (
-                    "+" in c
-                    and "-" in c
-                    or "+" in c
-                    and c["+"] > 1
-                    or "-" in c
-                    and (c["-"] > 1 or item[0] != "-" and item[0].isnumeric())
-            ):
-                new_items = split_item(item)
-                new_entry.extend(new_items)
-            else:
-                new_entry.append(item)
-            lst[entry_index] = new_entry
 
-    lst[2:] = [x[: len(lst[0]) + 1] for x in lst[2:]]
-    frame = pd.DataFrame.from_dict(lst[2:])
-    frame.columns = ["id"] + lst[0]
-    frame[lst[0]] = frame[lst[0]].applymap(float)
-    frame.set_index("id", inplace=True)
-    return xr.DataArray(frame)
+_ID_EXP = re.compile(r"^[ \t]*\S+", re.MULTILINE)
+# trailing link and node types (e.g., "Pump" or "Tank"), excluding "e" to keep exponents intact
+_TEXT_EXP = re.compile(r"[A-DF-Za-df-z][^\n]*")
+_GLUED_EXP = re.compile(r"(?<=[0-9.])(?=[-+])")
+
+
+def _parse_rows(rows: list[str], n_vars: int) -> np.ndarray:
+    """Converts table rows to a float array token by token."""
+    return np.array(
+        [
+            [float(value) for value in split_glued_values(row.split())[1 : n_vars + 1]]
+            for row in rows
+        ],
+        dtype=float,
+    ).reshape(len(rows), n_vars)
+
+
+def parse_table(text: str, n_vars: int) -> np.ndarray:
+    """Converts the data rows of a node or link results table to a float array.
+
+    The element IDs in the first column and the node/link types in the last column are removed and values, that were
+    glued together by EPANET (e.g., "12.34-5.67"), are separated before the whole table is converted with NumPy at
+    once. Tables that can't be converted this way are parsed row by row.
+
+    Args:
+      text: data rows of the table
+      n_vars: number of variables in the table
+
+    Returns:
+      array with the shape (rows, n_vars)
+
+    """
+    rows = text.splitlines()
+    values = _TEXT_EXP.sub("", _ID_EXP.sub("", text))
+    if "e" in values or "E" in values or "+" in values:
+        values = _GLUED_EXP.sub(" ", values)
+    else:
+        values = values.replace("-", " -")
+    with warnings.catch_warnings():
+        # NumPy warns about data it can't convert, these tables are parsed row by row
+        warnings.simplefilter("ignore", DeprecationWarning)
+        array = np.fromstring(values, sep=" ")
+    if array.size != len(rows) * n_vars:
+        return _parse_rows(rows, n_vars)
+    return array.reshape(len(rows), n_vars)
 
 
 # todo: refactor
@@ -125,63 +175,269 @@ class ReportFileReader:
         logger.debug("Reading Report File")
         with open(filename, "r") as fid:
             content = fid.readlines()
-            # print(content)
-            block = {}
-            key = "start"
-            block[key] = []
-            error_manager = ErrorManager()
-            error_found = False
-
-            for linenumber, line in enumerate(content):
-                if error_found and len(line.strip()) != 0:
-                    error_manager.append_error_details(line)
-
-                error_found = error_manager.check_line(line)
-                if len(line.strip()) == 0:
-                    key = content[linenumber + 1]
-                    key = re.sub(r"\s+", " ", key.replace("\n", "").strip())
-                    block[key] = []
-                else:
-                    line = re.sub(r"\s+", " ", line.replace("\n", "").strip())
-                    if line not in key and (
-                        line in key or not line.startswith("---------")
-                    ):
-                        block[key].append(line.split(" "))
-        error_manager.raise_errors()
-        links = None
-        nodes = None
-        data = None
-
-        format = "%y.%m.%d %H:%M:%S"
-        for k in list(block.keys()):
-            if "Node" not in k and "Link" not in k:
-                block.pop(k)
-
-        for kind in ["Node", "Link"]:
-            times = []
-            # for key in sorted(block.iterkeys(), key=lambda x: x.split(' ')[3].zfill(8)):
-            for key in sorted(block.keys()):
-                if key.startswith(kind):
-                    kind, time = blockkey2typetime(key, startdatetime=startdatetime)
-                    if time is not None:
-                        times.append(time)
-
-            frames = []
-            for key in sorted(block.keys()):
-                if key.startswith(kind):
-                    lst = block[key]
-                    x = lst2xray(lst)
-                    frames.append(x)
-            if frames:
-                if times:
-                    data = xr.concat(frames, times)
-                    data = data.rename({"concat_dim": "time", "dim_1": "vars"})
-                else:
-                    data = frames[0]
-                    data = data.rename({"dim_1": "vars"})
-            if kind == "Node":
-                nodes = data
+        return parse_report(content, startdatetime)
+
+
+def parse_report(
+    content: list[str], startdatetime: Optional[datetime.datetime] = None
+) -> tuple[Union[DataArray, Dataset, None], Union[DataArray, Dataset, None]]:
+    """Parses the lines of an EPANET report.
+
+    Args:
+      content: lines of the report
+      startdatetime: start datetime of the simulation
+
+    Returns:
+      node and link results
+
+    """
+    return blocks2xray(report2blocks(content), startdatetime)
+
+
+_CONTINUED = " (continued)"
+
+
+def report2blocks(content: list[str]) -> dict[str, list[str]]:
+    """Splits the lines of an EPANET report into blocks and raises the errors found in the report.
+
+    Args:
+      content: lines of the report
+
+    Returns:
+      blocks of lines (without headings and separators) with the blocks' headings as keys
+
+    """
+    block = {}
+    key = "start"
+    block[key] = []
+    heading = 0
+    in_table = False
+    repeated = 0
+    error_manager = ErrorManager()
+    error_found = False
+
+    for linenumber, line in enumerate(content):
+        if error_found and len(line.strip()) != 0:
+            error_manager.append_error_details(line)
+
+        # results tables don't contain any errors
+        error_found = not in_table and error_manager.check_line(line)
+        stripped = line.strip()
+        if len(stripped) == 0:
+            # EPANET 2.3 terminates the report with a blank line
+            if linenumber + 1 == len(content):
+                break
+            key = " ".join(content[linenumber + 1].split())
+            heading = linenumber + 1
+            in_table = key.startswith(("Node Results", "Link Results"))
+            if in_table and key.endswith(_CONTINUED):
+                # tables split by page breaks repeat the variable names and units
+                key = key[: -len(_CONTINUED)]
+                repeated = 2
+            else:
+                block[key] = []
+        elif linenumber != heading and not stripped.startswith("---------"):
+            if repeated:
+                repeated -= 1
+            else:
+                block[key].append(line if line.endswith("\n") else line + "\n")
+    error_manager.raise_errors()
+    return block
+
+
+def blocks2xray(
+    block: dict[str, list[str]],
+    startdatetime: Optional[datetime.datetime] = None,
+) -> tuple[Union[DataArray, Dataset, None], Union[DataArray, Dataset, None]]:
+    """Converts the node and link blocks of an EPANET report to DataArrays.
+
+    The values of all tables of a kind are written into a single preallocated (time, id, vars) array. The tables are
+    ordered by their parsed points in time.
+
+    Args:
+      block: blocks returned by report2blocks
+      startdatetime: start datetime of the simulation
+
+    Returns:
+      node and link results
+
+    """
+    results = {"Node": None, "Link": None}
+    for kind in results:
+        tables = []
+        for key, lines in block.items():
+            if key.startswith(kind):
+                _, time = blockkey2typetime(key, startdatetime=startdatetime)
+                tables.append((time, lines))
+        if not tables:
+            continue
+        tables.sort(key=lambda table: (table[0] is not None, table[0]))
+
+        lines = tables[0][1]
+        vars = lines[0].split()
+        ids = [row.split(None, 1)[0] for row in lines[2:]]
+        data = np.empty((len(tables), len(ids), len(vars)), dtype=float)
+        for index, (_, lines) in enumerate(tables):
+            rows = lines[2:]
+            if len(rows) != len(ids):
+                raise ValueError(
+                    f"Expected {len(ids)} rows in every {kind.lower()} results table but found {len(rows)}."
+                )
+            data[index] = parse_table("".join(rows), len(vars))
+
+        coords = {"id": ids, "vars": vars}
+        if tables[0][0] is None:
+            results[kind] = xr.DataArray(data[0], dims=("id", "vars"), coords=coords)
+        else:
+            coords["time"] = [time for time, _ in tables]
+            results[kind] = xr.DataArray(
+                data, dims=("time", "id", "vars"), coords=coords
+            )
+
+    return results["Node"], results["Link"]
+
+
+@dataclass
+class ReportTable:
+    """Location of a node or link results table in an EPANET report file.
+
+    Attributes:
+      kind: "Node" or "Link"
+      time: point in time of the results or None for steady state analyses
+      vars: names of the reported variables
+      parts: byte offsets of the first data row and after the last data row of every part of the table (tables are
+        split by page breaks if the report's page size is set)
+
+    """
+
+    kind: str
+    time: Optional[datetime.datetime]
+    vars: list[str]
+    parts: list[tuple[int, int]]
+
+
+_TABLE_EXP = re.compile(
+    rb"^ *(Node|Link) Results(?: at (\S+) hrs)?:[ \t]*(\(continued\))?[ \t\r]*$",
+    re.MULTILINE,
+)
+# tables end with a blank line or a form feed
+_TABLE_END_EXP = re.compile(rb"\n[ \t\r\f]*(\n|$)")
+
+
+class ReportFileIndex:
+    """Index of the node and link results tables in an EPANET report file.
+
+    The report file is scanned once for the tables' positions without parsing their values. Afterwards, single
+    variables of single elements can be read without parsing the whole file.
+
+    Attributes:
+      filename: EPANET report file
+      tables: dictionary with "Node" and "Link" as keys and the kind's ReportTable objects sorted by time as values
+      ids: dictionary with "Node" and "Link" as keys and the element IDs in the order of the report as values
+
+    """
+
+    def __init__(
+        self, filename: str, startdatetime: Optional[datetime.datetime] = None
+    ):
+        self.filename = filename
+        self.tables: dict[str, list[ReportTable]] = {"Node": [], "Link": []}
+        self.ids: dict[str, list[str]] = {"Node": [], "Link": []}
+        with open(filename, "rb") as file, mmap.mmap(
+            file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as content:
+            self._scan(content, startdatetime)
+
+    def _scan(self, content: mmap.mmap, startdatetime: Optional[datetime.datetime]):
+        first_table = None
+        for match in _TABLE_EXP.finditer(content):
+            kind, time = match.group(1).decode(), match.group(2)
+            if first_table is None:
+                first_table = match.start()
+            if time is not None:
+                hours, minutes, seconds = str2hms(time.decode())
+                time = seconds2datetime(
+                    hours * 3600 + minutes * 60 + seconds, startdatetime
+                )
+            # heading, separator, variable names, units and separator precede the data rows
+            position = match.end() + 1
+            header = []
+            for _ in range(4):
+                end = content.find(b"\n", position)
+                header.append(content[position:end])
+                position = end + 1
+            end = _TABLE_END_EXP.search(content, position)
+            end = end.start() + 1 if end else len(content)
+            if match.group(3):
+                self.tables[kind][-1].parts.append((position, end))
             else:
-                links = data
+                self.tables[kind].append(
+                    ReportTable(
+                        kind, time, header[1].decode().split(), [(position, end)]
+                    )
+                )
+
+        # EPANET reports errors before any results
+        error_manager = ErrorManager()
+        error_manager.check_lines(
+            content[: first_table or len(content)].decode().splitlines()
+        )
+        error_manager.raise_errors()
+
+        for kind, tables in self.tables.items():
+            if tables:
+                tables.sort(key=lambda table: (table.time is not None, table.time))
+                rows = b"".join(
+                    content[start:end] for start, end in tables[0].parts
+                ).split(b"\n")
+                self.ids[kind] = [
+                    row.split(None, 1)[0].decode() for row in rows if row.strip()
+                ]
+
+    def read(
+        self, kind: str, vars: list[str], ids: Optional[list[str]] = None
+    ) -> np.ndarray:
+        """Reads variables of elements from all tables of a kind.
+
+        Args:
+          kind: "Node" or "Link"
+          vars: variables to be read
+          ids: IDs of the elements to be read. If ids is a Python None object, all elements are read.
+
+        Returns:
+          array with the shape (time, id, vars)
+
+        """
+        tables = self.tables[kind]
+        if not tables:
+            raise KeyError(f"The report file doesn't contain {kind.lower()} results.")
+        positions = None
+        if ids is not None:
+            index = {id: position for position, id in enumerate(self.ids[kind])}
+            positions = [index[id] for id in ids]
+        columns = [tables[0].vars.index(var) for var in vars]
+        n_rows = len(self.ids[kind]) if positions is None else len(positions)
+        data = np.empty((len(tables), n_rows, len(columns)), dtype=float)
+        n_vars = len(tables[0].vars)
+        with open(self.filename, "rb") as file:
+            for table_index, table in enumerate(tables):
+                parts = []
+                for start, end in table.parts:
+                    file.seek(start)
+                    parts.append(file.read(end - start))
+                text = b"".join(parts).decode()
+                if positions is not None:
+                    rows = text.splitlines(keepends=True)
+                    text = "".join(rows[position] for position in positions)
+                data[table_index] = parse_table(text, n_vars)[:, columns]
+        return data
 
-        return nodes, links
+    @property
+    def times(self) -> dict[str, Optional[list[datetime.datetime]]]:
+        """Points in time of the node and link results or None for steady state analyses."""
+        return {
+            kind: [table.time for table in tables]
+            if tables and tables[0].time is not None
+            else None
+            for kind, tables in self.tables.items()
+        }
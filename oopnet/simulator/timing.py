@@ -0,0 +1,72 @@
+from __future__ import annotations
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+
+@dataclass
+class PhaseTiming:
+    """Time spent in a single phase of a simulation.
+
+    Attributes:
+      wall: elapsed wall-clock time in seconds
+      cpu: CPU time in seconds used by the Python process and its child processes (e.g., command line EPANET), None if
+        it wasn't measured
+
+    """
+
+    wall: float = 0.0
+    cpu: Optional[float] = 0.0
+
+
+def _cpu_time() -> float:
+    """Returns the CPU time used by the current process and its terminated child processes."""
+    times = os.times()
+    return time.process_time() + times.children_user + times.children_system
+
+
+class PhaseTimer:
+    """Measures the wall-clock and CPU time of the phases of a simulation.
+
+    The CPU time is the one of the whole process, which includes everything else running concurrently (e.g., other
+    threads or coroutines and child processes terminated in the meantime). Measuring it only makes sense, if nothing
+    else runs during the phases.
+
+    Attributes:
+      timings: measured phases and their timings in the order they were first entered
+      cpu: if False, only the wall-clock time is measured and the phases' CPU times are None
+
+    """
+
+    def __init__(self, cpu: bool = True):
+        self.timings: dict[str, PhaseTiming] = {}
+        self.cpu = cpu
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Measures the time spent in the context. Repeated phases are summed up.
+
+        Args:
+          name: name of the phase
+
+        """
+        wall = time.perf_counter()
+        cpu = _cpu_time() if self.cpu else None
+        try:
+            yield
+        finally:
+            timing = self.timings.setdefault(
+                name, PhaseTiming(cpu=0.0 if self.cpu else None)
+            )
+            timing.wall += time.perf_counter() - wall
+            if self.cpu:
+                timing.cpu += _cpu_time() - cpu
+
+    def as_dict(self) -> dict[str, dict[str, float]]:
+        """Returns the timings as a plain dictionary suitable for structured logging."""
+        return {
+            name: {"wall": timing.wall, "cpu": timing.cpu}
+            for name, timing in self.timings.items()
+        }
@@ -0,0 +1,411 @@
+from __future__ import annotations
+import ctypes
+import ctypes.util
+import datetime
+import functools
+import glob
+import importlib.util
+import logging
+import os
+from sys import platform as _platform
+from typing import Optional
+
+import numpy as np
+import xarray as xr
+
+from oopnet.simulator.error_manager import ErrorManager
+from oopnet.simulator.reportfile_reader import seconds2datetime
+from oopnet.simulator.simulation_errors import get_error_list, EPANETSimulationError
+from oopnet.utils.oopnet_logging import logging_decorator
+
+logger = logging.getLogger(__name__)
+
+# EPANET toolkit constants (see epanet2_enums.h)
+EN_NODECOUNT = 0
+EN_LINKCOUNT = 2
+
+EN_ELEVATION = 0
+EN_DEMAND = 9
+EN_HEAD = 10
+EN_PRESSURE = 11
+EN_QUALITY = 12
+
+EN_DIAMETER = 0
+EN_LENGTH = 1
+EN_FLOW = 8
+EN_VELOCITY = 9
+EN_HEADLOSS = 10
+EN_SETTING = 12
+EN_LINKQUAL = 14
+
+EN_DURATION = 0
+EN_REPORTSTEP = 5
+EN_REPORTSTART = 6
+
+EN_PIPE = 1
+EN_NONE = 0
+EN_LPS = 5
+
+# conversion factors from cubic feet per second to EPANET's flow units (ordered by flow unit code)
+CFS_FACTORS = [
+    1.0,
+    448.831,
+    0.64632,
+    0.5382,
+    1.9837,
+    28.317,
+    1699.0,
+    2.4466,
+    101.94,
+    2446.6,
+    0.028317,
+]
+# flow below which EPANET treats a link as having no flow (in cubic feet per second)
+TINY_FLOW = 1.0e-6
+
+EN_MAXID = 31
+EN_MAXMSG = 255
+
+NODE_VARS = {
+    "Elevation": EN_ELEVATION,
+    "Demand": EN_DEMAND,
+    "Head": EN_HEAD,
+    "Pressure": EN_PRESSURE,
+    "Quality": EN_QUALITY,
+}
+LINK_VARS = {
+    "Length": EN_LENGTH,
+    "Diameter": EN_DIAMETER,
+    "Flow": EN_FLOW,
+    "Velocity": EN_VELOCITY,
+    "Headloss": EN_HEADLOSS,
+    "Quality": EN_LINKQUAL,
+    "Setting": EN_SETTING,
+}
+
+
+def _library_candidates() -> list[str]:
+    """Lists possible locations of the EPANET shared library.
+
+    The environment variable OOPNET_EPANET_LIBRARY takes precedence over the system's library search path and the
+    library shipped with the owa-epanet package.
+
+    """
+    candidates = []
+    if os.environ.get("OOPNET_EPANET_LIBRARY"):
+        candidates.append(os.environ["OOPNET_EPANET_LIBRARY"])
+    for name in ["epanet2", "epanet-2.2", "epanet22", "epanet"]:
+        found = ctypes.util.find_library(name)
+        if found:
+            candidates.append(found)
+    if _platform == "win32":
+        script_dir = os.path.dirname(os.path.realpath(__file__))
+        candidates.append(os.path.join(script_dir, "epanet2.dll"))
+    spec = importlib.util.find_spec("epanet")
+    if spec is not None and spec.submodule_search_locations:
+        for location in spec.submodule_search_locations:
+            candidates.extend(sorted(glob.glob(os.path.join(location, "*epanet2*"))))
+    return candidates
+
+
+@functools.lru_cache(maxsize=None)
+def load_library(path: Optional[str] = None) -> ctypes.CDLL:
+    """Loads the EPANET 2.2 shared library and declares the used toolkit functions.
+
+    Args:
+        path: path to the shared library. If path is None, the library is searched for.
+
+    Raises:
+        FileNotFoundError if no EPANET shared library can be loaded.
+
+    Returns:
+        loaded library
+
+    """
+    candidates = [path] if path else _library_candidates()
+    for candidate in candidates:
+        try:
+            lib = ctypes.CDLL(candidate)
+            lib.EN_createproject
+        except (OSError, AttributeError):
+            continue
+        logger.debug(f"Loaded EPANET toolkit from {candidate!r}")
+        break
+    else:
+        raise FileNotFoundError(
+            "No EPANET 2.2 shared library found. Set the OOPNET_EPANET_LIBRARY environment variable to the library's "
+            "path."
+        )
+
+    ph = ctypes.c_void_p
+    pint = ctypes.POINTER(ctypes.c_int)
+    plong = ctypes.POINTER(ctypes.c_long)
+    pdouble = ctypes.POINTER(ctypes.c_double)
+    signatures = {
+        "EN_createproject": [ctypes.POINTER(ph)],
+        "EN_deleteproject": [ph],
+        "EN_open": [ph, ctypes.c_char_p, ctypes.c_char_p, ctypes.c_char_p],
+        "EN_close": [ph],
+        "EN_openH": [ph],
+        "EN_initH": [ph, ctypes.c_int],
+        "EN_runH": [ph, plong],
+        "EN_nextH": [ph, plong],
+        "EN_closeH": [ph],
+        "EN_openQ": [ph],
+        "EN_initQ": [ph, ctypes.c_int],
+        "EN_runQ": [ph, plong],
+        "EN_nextQ": [ph, plong],
+        "EN_closeQ": [ph],
+        "EN_getcount": [ph, ctypes.c_int, pint],
+        "EN_getnodeid": [ph, ctypes.c_int, ctypes.c_char_p],
+        "EN_getlinkid": [ph, ctypes.c_int, ctypes.c_char_p],
+        "EN_getlinktype": [ph, ctypes.c_int, pint],
+        "EN_getnodevalue": [ph, ctypes.c_int, ctypes.c_int, pdouble],
+        "EN_getlinkvalue": [ph, ctypes.c_int, ctypes.c_int, pdouble],
+        "EN_gettimeparam": [ph, ctypes.c_int, plong],
+        "EN_getqualtype": [ph, pint, pint],
+        "EN_getflowunits": [ph, pint],
+        "EN_geterror": [ctypes.c_int, ctypes.c_char_p, ctypes.c_int],
+        "EN_getversion": [pint],
+    }
+    for name, argtypes in signatures.items():
+        func = getattr(lib, name)
+        func.argtypes = argtypes
+        func.restype = ctypes.c_int
+    return lib
+
+
+def get_version(library: Optional[str] = None) -> int:
+    """Returns the version of the EPANET shared library (e.g., 20200 for EPANET 2.2.0).
+
+    Args:
+        library: path to the shared library. If library is None, the library is searched for.
+
+    """
+    lib = load_library(library)
+    version = ctypes.c_int()
+    lib.EN_getversion(ctypes.byref(version))
+    return version.value
+
+
+class ToolkitError(Exception):
+    """Raised when an EPANET toolkit function returns an error code that is not covered by OOPNET's EPANET errors."""
+
+    def __init__(self, code: int, message: str):
+        self.code = code
+        super().__init__(f"Error {code} - {message}")
+
+
+@logging_decorator(logger)
+class ToolkitReader:
+    """Simulates an EPANET input file with the in-process EPANET toolkit and returns the results.
+
+    Results are returned in the same structure as the ReportFileReader does and can therefore be passed as reader to a
+    SimulationReport. The values are not rounded to the precision defined in the Network's Reportprecision. Reaction
+    rates are not available from the toolkit and are not part of the results.
+
+    """
+
+    def __new__(
+        cls,
+        filename: str,
+        startdatetime: Optional[datetime.datetime] = None,
+        library: Optional[str] = None,
+    ) -> tuple[xr.DataArray, xr.DataArray]:
+        lib = load_library(library)
+        project = ctypes.c_void_p()
+        cls._check(lib, lib.EN_createproject(ctypes.byref(project)))
+        rpt_file = filename.replace(".inp", ".rpt")
+        try:
+            code = lib.EN_open(project, filename.encode(), rpt_file.encode(), b"")
+            if code > 100:
+                lib.EN_close(project)
+                cls._raise_input_errors(lib, code, rpt_file)
+            try:
+                return cls._simulate(lib, project, startdatetime)
+            finally:
+                lib.EN_close(project)
+        finally:
+            lib.EN_deleteproject(project)
+
+    @staticmethod
+    def _check(lib: ctypes.CDLL, code: int):
+        """Raises an EPANETSimulationError if a toolkit function returned an error code (warnings are ignored)."""
+        if code <= 100:
+            return
+        msg = ctypes.create_string_buffer(EN_MAXMSG + 1)
+        lib.EN_geterror(code, msg, EN_MAXMSG)
+        message = msg.value.decode().split(": ", 1)[-1]
+        for error in get_error_list():
+            if error.code == code:
+                raise EPANETSimulationError([error(message, None)])
+        raise ToolkitError(code, message)
+
+    @classmethod
+    def _raise_input_errors(cls, lib: ctypes.CDLL, code: int, rpt_file: str):
+        """Raises all errors EPANET wrote to the report file while reading the input file."""
+        if os.path.isfile(rpt_file):
+            error_manager = ErrorManager()
+            error_manager.check_file(rpt_file)
+            error_manager.raise_errors()
+        cls._check(lib, code)
+
+    @classmethod
+    def _simulate(
+        cls,
+        lib: ctypes.CDLL,
+        project: ctypes.c_void_p,
+        startdatetime: Optional[datetime.datetime],
+    ) -> tuple[xr.DataArray, xr.DataArray]:
+        node_ids = cls._get_ids(lib, project, EN_NODECOUNT, lib.EN_getnodeid)
+        link_ids = cls._get_ids(lib, project, EN_LINKCOUNT, lib.EN_getlinkid)
+        link_types = []
+        for index in range(1, len(link_ids) + 1):
+            link_type = ctypes.c_int()
+            cls._check(lib, lib.EN_getlinktype(project, index, ctypes.byref(link_type)))
+            link_types.append(link_type.value)
+        is_pipe = np.asarray(link_types) <= EN_PIPE
+
+        times = {}
+        for param in [EN_DURATION, EN_REPORTSTEP, EN_REPORTSTART]:
+            value = ctypes.c_long()
+            cls._check(lib, lib.EN_gettimeparam(project, param, ctypes.byref(value)))
+            times[param] = value.value
+        duration = times[EN_DURATION]
+        reportstep = max(times[EN_REPORTSTEP], 1)
+        reportstart = times[EN_REPORTSTART]
+
+        qualtype, tracenode = ctypes.c_int(), ctypes.c_int()
+        cls._check(
+            lib,
+            lib.EN_getqualtype(
+                project, ctypes.byref(qualtype), ctypes.byref(tracenode)
+            ),
+        )
+        quality = qualtype.value != EN_NONE
+        flowunits = ctypes.c_int()
+        cls._check(lib, lib.EN_getflowunits(project, ctypes.byref(flowunits)))
+        tiny_flow = TINY_FLOW * CFS_FACTORS[flowunits.value]
+        us_units = flowunits.value < EN_LPS
+
+        node_frames, link_frames, report_times = [], [], []
+        cls._check(lib, lib.EN_openH(project))
+        cls._check(lib, lib.EN_initH(project, 0))
+        if quality:
+            cls._check(lib, lib.EN_openQ(project))
+            cls._check(lib, lib.EN_initQ(project, 0))
+        t, tstep = ctypes.c_long(), ctypes.c_long(1)
+        while tstep.value > 0:
+            cls._check(lib, lib.EN_runH(project, ctypes.byref(t)))
+            if quality:
+                cls._check(lib, lib.EN_runQ(project, ctypes.byref(t)))
+            if t.value >= reportstart and (t.value - reportstart) % reportstep == 0:
+                report_times.append(t.value)
+                node_frames.append(
+                    cls._get_values(
+                        lib, project, lib.EN_getnodevalue, len(node_ids), NODE_VARS
+                    )
+                )
+                links = cls._get_values(
+                    lib, project, lib.EN_getlinkvalue, len(link_ids), LINK_VARS
+                )
+                link_frames.append(
+                    cls._convert_link_values(links, is_pipe, us_units, tiny_flow)
+                )
+            cls._check(lib, lib.EN_nextH(project, ctypes.byref(tstep)))
+            if quality:
+                cls._check(lib, lib.EN_nextQ(project, ctypes.byref(tstep)))
+        if quality:
+            lib.EN_closeQ(project)
+        lib.EN_closeH(project)
+
+        link_vars = list(LINK_VARS) + ["F-Factor"]
+        nodes = cls._to_xarray(node_frames, node_ids, list(NODE_VARS))
+        links = cls._to_xarray(link_frames, link_ids, link_vars)
+        if duration > 0:
+            timestamps = [seconds2datetime(x, startdatetime) for x in report_times]
+            nodes = nodes.assign_coords(time=timestamps)
+            links = links.assign_coords(time=timestamps)
+        else:
+            nodes = nodes.isel(time=0, drop=True)
+            links = links.isel(time=0, drop=True)
+        return nodes, links
+
+    @classmethod
+    def _get_ids(
+        cls, lib: ctypes.CDLL, project: ctypes.c_void_p, count_code: int, getter
+    ) -> list[str]:
+        count = ctypes.c_int()
+        cls._check(lib, lib.EN_getcount(project, count_code, ctypes.byref(count)))
+        ids = []
+        buffer = ctypes.create_string_buffer(EN_MAXID + 1)
+        for index in range(1, count.value + 1):
+            cls._check(lib, getter(project, index, buffer))
+            ids.append(buffer.value.decode())
+        return ids
+
+    @classmethod
+    def _get_values(
+        cls,
+        lib: ctypes.CDLL,
+        project: ctypes.c_void_p,
+        getter,
+        count: int,
+        variables: dict,
+    ) -> np.ndarray:
+        values = np.empty((count, len(variables)))
+        value = ctypes.c_double()
+        ref = ctypes.byref(value)
+        for index in range(count):
+            for var_index, code in enumerate(variables.values()):
+                cls._check(lib, getter(project, index + 1, code, ref))
+                values[index, var_index] = value.value
+        return values
+
+    @staticmethod
+    def _convert_link_values(
+        values: np.ndarray, is_pipe: np.ndarray, us_units: bool, tiny_flow: float
+    ) -> np.ndarray:
+        """Converts pipe headlosses to headloss per 1000 length units and appends the friction factors.
+
+        The toolkit returns a pipe's total headloss, while EPANET's report file lists unit headlosses. The Darcy-Weisbach
+        friction factor is derived from the unit headloss, the diameter and the velocity like EPANET does for its
+        reports.
+
+        """
+        var_names = list(LINK_VARS)
+        length = values[:, var_names.index("Length")]
+        diameter = values[:, var_names.index("Diameter")]
+        flow = values[:, var_names.index("Flow")]
+        velocity = values[:, var_names.index("Velocity")]
+        headloss = values[:, var_names.index("Headloss")]
+        pipe_length = np.where(is_pipe & (length > 0), length, 1000.0)
+        headloss = np.where(is_pipe, headloss * 1000.0 / pipe_length, headloss)
+        values[:, var_names.index("Headloss")] = headloss
+
+        if us_units:
+            g, diameter_factor = 32.174, 1.0 / 12.0
+        else:
+            g, diameter_factor = 9.81, 1.0 / 1000.0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ffactor = (
+                np.abs(headloss)
+                / 1000.0
+                * diameter
+                * diameter_factor
+                * 2.0
+                * g
+                / velocity**2
+            )
+        ffactor = np.where(is_pipe & (np.abs(flow) > tiny_flow), ffactor, 0.0)
+        return np.column_stack([values, ffactor])
+
+    @staticmethod
+    def _to_xarray(
+        frames: list[np.ndarray], ids: list[str], variables: list[str]
+    ) -> xr.DataArray:
+        return xr.DataArray(
+            np.stack(frames),
+            dims=("time", "id", "vars"),
+            coords={"id": ids, "vars": variables},
+        )
@@ -0,0 +1,217 @@
+from __future__ import annotations
+import logging
+import multiprocessing.util
+import shutil
+import tempfile
+from collections.abc import Mapping
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Iterable, Iterator, Optional, Union, TYPE_CHECKING
+
+import numpy as np
+
+from oopnet.report.report import SimulationReport, stack_reports
+from oopnet.simulator.epanet2 import scratch_directory
+
+if TYPE_CHECKING:
+    from oopnet.elements.network import Network
+    from oopnet.elements.component_registry import ComponentRegistry
+
+logger = logging.getLogger(__name__)
+
+# base network and scratch directory of the current worker process
+_network: Optional[Network] = None
+_scratch: Optional[str] = None
+
+
+def _get_registry(network: Network, name: str) -> ComponentRegistry:
+    """Returns a Network's ComponentRegistry by its name (e.g., "junctions" or "pipes")."""
+    if name in network._nodes:
+        return network._nodes[name]
+    if name in network._links:
+        return network._links[name]
+    if name in ("curves", "patterns"):
+        return getattr(network, f"_{name}")
+    raise ValueError(f"{name!r} is not a valid component type.")
+
+
+def apply_deltas(
+    network: Network, deltas: dict[str, Any]
+) -> list[tuple[Any, str, Any]]:
+    """Changes component attributes of a Network.
+
+    deltas maps keys in the form "<component type>.<attribute>" (e.g., "junctions.demand" or "pipes.roughness") to the
+    new values. Values are either a mapping of component IDs to values, a sequence with one value per component in the
+    order of the Network's component registry or a single value used for all components of the component type.
+
+    Args:
+      network: OOPNET network object to be modified
+      deltas: parameter changes
+
+    Returns:
+      list of (component, attribute, old value) tuples that can be passed to revert_deltas
+
+    """
+    changes = []
+    try:
+        for key, values in deltas.items():
+            try:
+                name, attribute = key.split(".")
+            except ValueError:
+                raise ValueError(
+                    f"Parameter keys must be in the form '<component type>.<attribute>' but {key!r} was submitted."
+                )
+            registry = _get_registry(network, name)
+            if isinstance(values, Mapping):
+                items = [(registry[id], value) for id, value in values.items()]
+            elif np.ndim(values) == 0:
+                items = [(component, values) for component in registry.values()]
+            else:
+                if len(values) != len(registry):
+                    raise ValueError(
+                        f"{len(values)} values were submitted for {key!r} but the network contains {len(registry)} "
+                        f"{name}."
+                    )
+                items = list(zip(registry.values(), values))
+            for component, value in items:
+                if not hasattr(component, attribute):
+                    raise AttributeError(
+                        f"{type(component).__name__} has no attribute {attribute!r}."
+                    )
+                if isinstance(value, np.generic):
+                    value = value.item()
+                changes.append((component, attribute, getattr(component, attribute)))
+                setattr(component, attribute, value)
+    except BaseException:
+        revert_deltas(changes)
+        raise
+    return changes
+
+
+def revert_deltas(changes: list[tuple[Any, str, Any]]):
+    """Reverts changes made by apply_deltas.
+
+    Args:
+      changes: list of (component, attribute, old value) tuples returned by apply_deltas
+
+    """
+    for component, attribute, value in reversed(changes):
+        setattr(component, attribute, value)
+
+
+def _init_worker(network: Union[Network, str], path: Optional[str]):
+    """Loads the base network and creates a scratch directory once per worker process."""
+    global _network, _scratch
+    if isinstance(network, str):
+        from oopnet.elements.network import Network
+
+        network = Network.read(network)
+    _network = network
+    _scratch = tempfile.mkdtemp(prefix="oopnet_", dir=path or scratch_directory())
+    multiprocessing.util.Finalize(
+        None,
+        shutil.rmtree,
+        args=(_scratch,),
+        kwargs={"ignore_errors": True},
+        exitpriority=0,
+    )
+
+
+def _simulate(deltas: dict[str, Any], run_kwargs: dict) -> SimulationReport:
+    """Applies deltas to the worker's base network, simulates it and reverts the changes."""
+    changes = apply_deltas(_network, deltas)
+    try:
+        return _network.run(path=_scratch, **run_kwargs)
+    finally:
+        revert_deltas(changes)
+
+
+class SimulationWorkerPool:
+    """Pool of worker processes simulating variations of a base network.
+
+    Every worker process loads the base network once when it is started. Tasks only contain the parameter changes
+    (deltas) to the base network, which are applied by the worker before simulating the network and reverted
+    afterwards. Contrary to run_many, neither the transferred data nor the copying costs grow with the network's size.
+
+    deltas map keys in the form "<component type>.<attribute>" to the new values (see apply_deltas)::
+
+        with SimulationWorkerPool(network, max_workers=4) as pool:
+            reports = pool.map([{"junctions.demand": demands} for demands in samples])
+
+    Attributes:
+      network: base network or the filename of an EPANET input file that is read by every worker
+      max_workers: maximum number of worker processes
+      path: parent directory for the workers' scratch directories. If path is a Python None object the directory
+        returned by scratch_directory is used.
+      run_kwargs: further keyword arguments passed to Network.run (e.g., engine or startdatetime)
+
+    """
+
+    def __init__(
+        self,
+        network: Union[Network, str],
+        max_workers: Optional[int] = None,
+        path: Optional[str] = None,
+        **run_kwargs,
+    ):
+        self.network = network
+        self.max_workers = max_workers
+        self.path = path
+        self.run_kwargs = run_kwargs
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(network, path),
+        )
+
+    def submit(self, deltas: Optional[dict[str, Any]] = None) -> Future:
+        """Schedules the simulation of the base network with the passed parameter changes.
+
+        Args:
+          deltas: parameter changes. If deltas is a Python None object, the unchanged base network is simulated.
+
+        Returns:
+          Future returning an OOPNET report object
+
+        """
+        return self._executor.submit(_simulate, deltas or {}, self.run_kwargs)
+
+    def map(
+        self,
+        deltas: Iterable[Optional[dict[str, Any]]],
+        chunksize: int = 1,
+        stack: bool = False,
+    ) -> Union[Iterator[SimulationReport], SimulationReport]:
+        """Simulates the base network for every set of parameter changes.
+
+        Args:
+          deltas: parameter changes per simulation
+          chunksize: number of tasks sent to a worker at once
+          stack: if True, all reports are stacked into a single report with an additional "scenario" dimension
+
+        Returns:
+          iterator over the OOPNET report objects in the order of deltas, or a single stacked report if stack is True
+
+        """
+        deltas = [d or {} for d in deltas]
+        logger.info(f"Simulating {len(deltas)} parameter sets")
+        reports = self._executor.map(
+            _simulate, deltas, [self.run_kwargs] * len(deltas), chunksize=chunksize
+        )
+        if stack:
+            return stack_reports(list(reports))
+        return reports
+
+    def close(self, wait: bool = True):
+        """Shuts down the worker processes.
+
+        Args:
+          wait: if True, waits until all pending simulations are finished
+
+        """
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self) -> SimulationWorkerPool:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -12,6 +12,7 @@ from oopnet.elements.network_components import (
     Valve,
 )
 from oopnet.elements.system_operation import Curve, Pattern
+from oopnet.elements.component_registry import IdenticalIDError
 
 if TYPE_CHECKING:
     from oopnet.elements.system_operation import Rule
@@ -37,6 +38,30 @@ def _add_component(
     component_hash[obj.id] = obj
 
 
+@logging_decorator(logger)
+def _add_components(
+    objs: list[NetworkComponent], network: Network, component_hash: dict
+):
+    """Adds many NetworkComponents to a registry at once.
+
+    Args:
+        objs: NetworkComponents that shall be added
+        network: Network to which the NetworkComponents are added
+        component_hash: hash table to which the NetworkComponents are added
+
+    """
+    components = {obj.id: obj for obj in objs}
+    if len(components) < len(objs):
+        seen = set()
+        for obj in objs:
+            if obj.id in seen:
+                raise IdenticalIDError(obj.id)
+            seen.add(obj.id)
+    component_hash.update(components)
+    for obj in objs:
+        obj._network = network
+
+
 def add_pattern(network: Network, pattern: Pattern):
     """Adds a Pattern to an OOPNET network object.
 
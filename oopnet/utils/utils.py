@@ -8,6 +8,7 @@ import numpy as np
 if TYPE_CHECKING:
     from oopnet.elements.network_components import Junction, Pipe
 from oopnet.report.report import SimulationReport
+from oopnet.report.sensors import DEFAULT_PRECISION, SensorSet
 
 
 def mkdir(newdir: str):
@@ -43,6 +44,9 @@ def make_measurement(
 ):
     """This function simulates a measurement in the system at predefined sensorpositions and returns a measurement vector
 
+    If both flows and pressures are measured, the flows are rounded to the pressures' number of decimals as well. See
+    SensorSet for measuring many reports at once.
+
     Args:
       report: OOPNET report object
       sensors: dict with keys 'Flow' and/or 'Pressure' containing the node- resp. linkids as list
@@ -56,19 +60,14 @@ def make_measurement(
       numpy vector containing the measurements
 
     """
-    vec = np.ndarray(0)
-    for what in sorted(sensors.keys()):
-        if what == "Flow":
-            dec = 3 if precision is None else precision[what]
-            vec = np.around(
-                np.concatenate((vec, report.flow[sensors[what]].values)), decimals=dec
-            )
-        elif what == "Pressure":
-            dec = 2 if precision is None else precision[what]
-            vec = np.around(
-                np.concatenate((vec, report.pressure[sensors[what]].values)),
-                decimals=dec,
-            )
+    sensors = {
+        what: ids for what, ids in sensors.items() if what in ("Flow", "Pressure")
+    }
+    vec = SensorSet(sensors, precision).measure(report)
+    decimals = (DEFAULT_PRECISION if precision is None else precision).get("Pressure")
+    if "Flow" in sensors and "Pressure" in sensors and decimals is not None:
+        flows = len(sensors["Flow"])
+        vec[:flows] = np.around(vec[:flows], decimals=decimals)
     return vec
 
 
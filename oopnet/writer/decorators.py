@@ -1,4 +1,8 @@
-from typing import Optional, Callable
+from typing import Optional, Callable, Sequence
+
+# registries of the Node and Link components
+NODE_REGISTRIES = ("junctions", "tanks", "reservoirs")
+LINK_REGISTRIES = ("pipes", "pumps", "valves")
 
 
 class WriterDecorator:
@@ -9,6 +13,10 @@ class WriterDecorator:
         functionname:
         priority:
         writerfunction:
+        registries: names of the registries holding the components the section is rendered from
+        attributes: component attributes the section is rendered from
+        contents: attributes the section is rendered from, that are compared by value (e.g., lists that can be changed
+          in place)
 
     """
 
@@ -19,11 +27,17 @@ class WriterDecorator:
         functionname: Optional[str] = None,
         priority: Optional[int] = None,
         writerfunction: Optional[Callable] = None,
+        registries: tuple[str, ...] = (),
+        attributes: tuple[str, ...] = (),
+        contents: tuple[str, ...] = (),
     ):
         self.sectionname = sectionname
         self.functionname = functionname
         self.priority = priority
         self.writerfunction = writerfunction
+        self.registries = registries
+        self.attributes = attributes
+        self.contents = contents
 
 
 def make_registering_decorator_factory(foreign_decorator_factory):
@@ -70,12 +84,26 @@ def make_registering_decorator_factory(foreign_decorator_factory):
     return new_decorator_factory
 
 
-def section_writer(title: str, priority: int):
+def section_writer(
+    title: str,
+    priority: int,
+    registries: Sequence[str] = (),
+    attributes: Sequence[str] = (),
+    contents: Sequence[str] = (),
+):
     """Synchronization decorator
 
+    Sections declaring the registries and attributes they are rendered from can be reused by a Network's SectionCache
+    as long as none of them changed. All other sections are rendered every time.
+
     Args:
       title: section title
       priority: write priority
+      registries: names of the registries holding the components the section is rendered from (e.g., "junctions")
+      attributes: component attributes the section is rendered from, assignments to them and changes of the lists
+        stored in them are tracked
+      contents: attributes that are compared by value instead, because their changes can't be tracked (e.g.,
+        attributes of Rules, which aren't NetworkComponents)
 
     Returns:
 
@@ -40,6 +40,9 @@ def list_section_writer_callables(modules):
                 functionname=f[0],
                 priority=f[1].decorator_args[1],
                 writerfunction=f[1],
+                registries=tuple(f[1].decorator_kwargs.get("registries", ())),
+                attributes=tuple(f[1].decorator_kwargs.get("attributes", ())),
+                contents=tuple(f[1].decorator_kwargs.get("contents", ())),
             )
             all_functions.append(r)
     return all_functions
@@ -0,0 +1,273 @@
+from __future__ import annotations
+from dataclasses import fields
+from functools import wraps
+from operator import attrgetter
+from typing import Iterable, TextIO, TYPE_CHECKING
+import io
+import pickle
+import threading
+import weakref
+
+from oopnet.elements.base import NetworkComponent
+from oopnet.elements.component_registry import ComponentRegistry
+from oopnet.elements.network_map_tags import Vertex
+from oopnet.writer.decorators import WriterDecorator
+
+if TYPE_CHECKING:
+    from oopnet.elements.network import Network
+
+
+class _ContentPickler(pickle.Pickler):
+    """Pickler replacing referenced NetworkComponents by their IDs, so compared contents never include whole
+    components (and through them the entire Network)."""
+
+    def reducer_override(self, obj):
+        if isinstance(obj, NetworkComponent):
+            return str, (obj.id,)
+        return NotImplemented
+
+
+class _TrackedList(list):
+    """List stored in an attribute of a NetworkComponent, that reports changes made in place to the section cache of
+    the component's Network.
+
+    Attributes:
+      _owner: NetworkComponent the list is stored in
+      _attribute: name of the attribute the list is stored in
+
+    """
+
+    __slots__ = ("_owner", "_attribute")
+
+    def __init__(self, values: Iterable, owner: NetworkComponent, attribute: str):
+        super().__init__(values)
+        self._owner = owner
+        self._attribute = attribute
+
+    def _modified(self):
+        # unpickled and copied lists get their items before their owner
+        network = getattr(getattr(self, "_owner", None), "_network_", None)
+        if network is not None and network._section_cache is not None:
+            network._section_cache.modified(self._attribute)
+
+
+def _mutator(method):
+    """Wraps a list method changing the list in place, so the change is reported to the section cache."""
+
+    @wraps(method)
+    def mutate(self: _TrackedList, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self._modified()
+        return result
+
+    return mutate
+
+
+for _name in (
+    "__setitem__",
+    "__delitem__",
+    "__iadd__",
+    "__imul__",
+    "append",
+    "extend",
+    "insert",
+    "pop",
+    "remove",
+    "clear",
+    "sort",
+    "reverse",
+):
+    setattr(_TrackedList, _name, _mutator(getattr(list, _name)))
+
+
+def _track(component: NetworkComponent, attribute: str, value) -> None:
+    """Replaces a list stored in a component's attribute by a _TrackedList."""
+    if isinstance(value, list) and not (
+        type(value) is _TrackedList and value._owner is component
+    ):
+        object.__setattr__(
+            component, attribute, _TrackedList(value, component, attribute)
+        )
+
+
+def _tracking_setattr(self: NetworkComponent, name: str, value):
+    """Sets an attribute and reports the assignment to the section cache of the component's Network."""
+    object.__setattr__(self, name, value)
+    # unpickled and copied components get their attributes in any order
+    network = getattr(self, "_network_", None)
+    if network is not None and network._section_cache is not None:
+        network._section_cache.assigned(self, name, value)
+
+
+def _vertex_setattr(self: Vertex, name: str, value):
+    """Sets an attribute of a Vertex and reports the change to all section caches, since Vertices don't know their
+    Links."""
+    object.__setattr__(self, name, value)
+    for cache in list(_caches):
+        cache.modified("vertices")
+
+
+_caches: weakref.WeakSet[SectionCache] = weakref.WeakSet()
+_active = 0
+_lock = threading.Lock()
+
+
+def _acquire():
+    """Installs the hooks tracking changes of NetworkComponents and Vertices for another section cache.
+
+    The hooks slow down creating and modifying components considerably (e.g., reading large models takes about twice
+    as long), so they are only installed as long as section caches exist.
+
+    """
+    global _active
+    with _lock:
+        _active += 1
+        NetworkComponent.__setattr__ = _tracking_setattr
+        Vertex.__setattr__ = _vertex_setattr
+
+
+def _release():
+    """Restores the default attribute assignment of NetworkComponents and Vertices once the last section cache was
+    closed."""
+    global _active
+    with _lock:
+        _active -= 1
+        if not _active:
+            del NetworkComponent.__setattr__
+            del Vertex.__setattr__
+
+
+def _registry(network: Network, name: str) -> ComponentRegistry:
+    """Returns a Network's registry by its name (e.g., "junctions" or "curves")."""
+    for super_registry in (network._nodes, network._links):
+        if name in super_registry:
+            return super_registry[name]
+    return getattr(network, f"_{name}")
+
+
+class SectionCache:
+    """Rendered input file sections of a Network, which are reused as long as nothing they were rendered from changed.
+
+    A section is rendered again, if components were added to or removed from the registries it is rendered from (see
+    ComponentRegistry.revision), if one of its attributes was assigned to or changed in place or if the contents of
+    its compared attributes (see section_writer) differ. Renaming any component invalidates all sections.
+
+    Lists stored in the Network's components are replaced by lists reporting their changes to the cache, and Vertex
+    attribute changes are reported to all caches. Changes are only tracked as long as caches exist: the hooks are
+    removed again, when the last cache was closed (see SectionCache.close) or garbage collected.
+
+    Attributes:
+      assignments: number of changes of the components' attributes by attribute name
+      sections: key and text of every rendered section by section name
+
+    """
+
+    def __init__(self, network: Network):
+        self.assignments: dict[str, int] = {}
+        self.sections: dict[str, tuple[tuple, str]] = {}
+        self._register()
+        for super_registry in (network._nodes, network._links):
+            for registry in super_registry.values():
+                self._track(registry.values())
+        self._track(network._curves.values())
+        self._track(network._patterns.values())
+
+    def _register(self):
+        _acquire()
+        _caches.add(self)
+        self._finalizer = weakref.finalize(self, _release)
+
+    @staticmethod
+    def _track(components: Iterable[NetworkComponent]):
+        names = {}
+        for component in components:
+            cls = type(component)
+            if cls not in names:
+                names[cls] = [f.name for f in fields(cls)]
+            for name in names[cls]:
+                value = getattr(component, name, None)
+                if isinstance(value, list):
+                    _track(component, name, value)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_finalizer"]
+        return state
+
+    def __setstate__(self, state: dict):
+        # copies might be modified in another process, that has to track the changes as well
+        self.__dict__.update(state)
+        self._register()
+
+    def close(self):
+        """Stops tracking changes for the cache and removes the hooks, if it was the last one."""
+        _caches.discard(self)
+        self._finalizer()
+
+    def modified(self, attribute: str):
+        """Records a change of a component attribute.
+
+        Args:
+          attribute: attribute name
+
+        """
+        self.assignments[attribute] = self.assignments.get(attribute, 0) + 1
+
+    def assigned(self, component: NetworkComponent, attribute: str, value):
+        """Records an assignment to a component attribute and tracks assigned lists and newly added components.
+
+        Args:
+          component: NetworkComponent the value was assigned to
+          attribute: attribute name
+          value: assigned value
+
+        """
+        if attribute == "_network_":
+            self._track((component,))
+        else:
+            _track(component, attribute, value)
+        self.modified(attribute)
+
+    def key(self, network: Network, writer: WriterDecorator) -> tuple:
+        """Describes the state of everything a section is rendered from.
+
+        Args:
+          network: OOPNET network object
+          writer: section writer
+
+        Returns:
+          key that changes whenever the section's text might change
+
+        """
+        registries = [_registry(network, name) for name in writer.registries]
+        key = (
+            tuple(registry.revision for registry in registries),
+            tuple(
+                self.assignments.get(name, 0) for name in ("_id", *writer.attributes)
+            ),
+        )
+        if writer.contents:
+            getter = attrgetter(*writer.contents)
+            contents = io.BytesIO()
+            _ContentPickler(contents, protocol=pickle.HIGHEST_PROTOCOL).dump(
+                [list(map(getter, registry.values())) for registry in registries]
+            )
+            key += (contents.getvalue(),)
+        return key
+
+    def write(self, network: Network, writer: WriterDecorator, fid: TextIO):
+        """Writes a section, reusing its text if nothing it is rendered from changed.
+
+        Args:
+          network: OOPNET network object
+          writer: section writer
+          fid: output object
+
+        """
+        key = self.key(network, writer)
+        cached = self.sections.get(writer.sectionname)
+        if cached is None or cached[0] != key:
+            text = io.StringIO()
+            writer.writerfunction(network, text)
+            cached = self.sections[writer.sectionname] = (key, text.getvalue())
+        fid.write(cached[1])
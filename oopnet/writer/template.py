@@ -0,0 +1,134 @@
+from __future__ import annotations
+from typing import Any, Sequence, Union, TYPE_CHECKING
+import logging
+import re
+
+import numpy as np
+
+from oopnet.writer.write import to_string
+
+if TYPE_CHECKING:
+    from oopnet.elements.network import Network
+
+logger = logging.getLogger(__name__)
+
+_MARKER = re.compile("\0([0-9]+)\0")
+
+
+class _Placeholder(float):
+    """Number marking the positions of a parameter in a rendered input file.
+
+    It behaves like the parameter's current value (e.g., in the comparisons deciding if a value is written at all), but
+    is formatted as a marker.
+
+    """
+
+    def __new__(cls, value: float, index: int):
+        placeholder = super().__new__(cls, value)
+        placeholder.index = index
+        return placeholder
+
+    def __format__(self, format_spec: str) -> str:
+        return f"\0{self.index}\0"
+
+    def __str__(self) -> str:
+        return self.__format__("")
+
+    __repr__ = __str__
+
+
+class InputTemplate:
+    """EPANET input file with placeholders for numeric parameters.
+
+    Rendering a template only formats the passed values into the prerendered text, no component objects are touched.
+    The result is identical to writing the Network after setting the parameters to the values.
+
+    Attributes:
+      parameters: objects and names of the attributes filled in by render
+
+    """
+
+    def __init__(self, text: str, parameters: Sequence[tuple[Any, str]]):
+        """InputTemplate init method.
+
+        Args:
+          text: rendered input file containing a marker at every position of a parameter
+          parameters: objects and names of the attributes marked in text
+
+        """
+        self.parameters = list(parameters)
+        parts = _MARKER.split(text)
+        missing = set(range(len(self.parameters))) - set(map(int, parts[1::2]))
+        if missing:
+            obj, attribute = self.parameters[min(missing)]
+            raise ValueError(
+                f"The attribute {attribute} of {getattr(obj, 'id', obj)!r} isn't written to the input file."
+            )
+        # str.format template, the literal text's braces have to be escaped
+        literals = [part.replace("{", "{{").replace("}", "}}") for part in parts[::2]]
+        fields = [f"{{{index}}}" for index in parts[1::2]]
+        self._format = "".join(
+            literal + field for literal, field in zip(literals, fields + [""])
+        )
+
+    def __len__(self) -> int:
+        return len(self.parameters)
+
+    def render(self, values: Union[Sequence[float], np.ndarray]) -> str:
+        """Renders the input file for a parameter vector.
+
+        Args:
+          values: one value per parameter, in the order of the parameters
+
+        Returns:
+          EPANET input file content
+
+        """
+        values = np.asarray(values, dtype=float)
+        if values.shape != (len(self.parameters),):
+            raise ValueError(
+                f"Expected {len(self.parameters)} values but {values.shape} were passed."
+            )
+        # formatting Python floats yields the same text as writing the Network
+        return self._format.format(*values.tolist())
+
+    __call__ = render
+
+
+def compile_template(
+    network: Network, parameters: Sequence[tuple[Any, str]]
+) -> InputTemplate:
+    """Renders a Network's input file once with placeholders for numeric parameters.
+
+    The parameters keep their current values while rendering, so everything else in the file (e.g., if an emitter is
+    written at all) depends on these values. Parameters that aren't written for their current values raise a
+    ValueError. The input file is rendered in the Network's units.
+
+    Args:
+      network: OOPNET network object
+      parameters: objects and names of their numeric attributes, e.g. [(junction, "demand"), (pipe, "roughness"),
+        (network.options, "demandmultiplier")]
+
+    Returns:
+      template rendering the input file for parameter vectors
+
+    """
+    parameters = list(parameters)
+    originals = [getattr(obj, attribute) for obj, attribute in parameters]
+    for (obj, attribute), value in zip(parameters, originals):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise TypeError(
+                f"The attribute {attribute} of {getattr(obj, 'id', obj)!r} isn't a number."
+            )
+    # the placeholders must not end up in the section cache
+    cache, network._section_cache = network._section_cache, None
+    try:
+        for index, ((obj, attribute), value) in enumerate(zip(parameters, originals)):
+            setattr(obj, attribute, _Placeholder(value, index))
+        text = to_string(network)
+    finally:
+        for (obj, attribute), value in zip(parameters, originals):
+            setattr(obj, attribute, value)
+        network._section_cache = cache
+    logger.debug(f"Compiled input file template with {len(parameters)} parameters")
+    return InputTemplate(text, parameters)
@@ -1,6 +1,8 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING
+from typing import Optional, TextIO, Union, TYPE_CHECKING
+import io
 import logging
+import os
 
 from oopnet.writer.module_reader import list_section_writer_callables
 from oopnet.writer.writing_modules import (
@@ -10,6 +12,7 @@ from oopnet.writer.writing_modules import (
     write_options_and_reporting,
     write_network_components,
 )
+from oopnet.reader.unit_converter.convert import converted
 from oopnet.utils.oopnet_logging import logging_decorator
 
 if TYPE_CHECKING:
@@ -17,34 +20,81 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# section writers sorted by their priority
+SECTION_WRITERS = sorted(
+    list_section_writer_callables(
+        [
+            write_network_components,
+            write_network_map_tags,
+            write_options_and_reporting,
+            write_system_operation,
+            write_water_quality,
+        ]
+    ),
+    key=lambda x: x.priority,
+)
+
+
+def _write_sections(network: Network, fid: TextIO):
+    """Writes all sections of an EPANET input file to a text stream.
+
+    If the Network has a section cache (see Network.cache_sections), the sections that didn't change since the last
+    write are taken from the cache.
+
+    """
+    cache = network._section_cache
+    for f in SECTION_WRITERS:
+        if f.sectionname in network.raw_sections:
+            # sections that weren't read are written back unchanged
+            print(f"[{f.sectionname}]", file=fid)
+            fid.write(network.raw_sections[f.sectionname])
+        elif cache is not None and f.registries:
+            cache.write(network, f, fid)
+        else:
+            f.writerfunction(network, fid)
+
 
 @logging_decorator(logger)
-def write(network: Network, filename: str) -> int:
+def write(
+    network: Network,
+    filename: Union[str, os.PathLike, TextIO],
+    units: Optional[str] = None,
+) -> int:
     """Converts an OOPNET network to an EPANET input file and saves it with a desired filename.
 
     Args:
       network: OOPNET network object which one wants to be written to a file
-      filename: desired filename/path were the user wants to store the file
+      filename: desired filename/path were the user wants to store the file, or an open text stream (e.g., an
+        io.StringIO object) the input file is written to
+      units: EPANET flow unit used in the file (e.g., 'GPM'), the network is written in OOPNET's SI units by default
 
     Returns:
       0 if successful
 
     """
-    logger.info(f"Writing network to {filename!r}")
+    with converted(network, units):
+        if hasattr(filename, "write"):
+            logger.info("Writing network to passed stream")
+            _write_sections(network, filename)
+        else:
+            logger.info(f"Writing network to {filename!r}")
+            with open(filename, "w") as fid:
+                _write_sections(network, fid)
 
-    modules = [
-        write_network_components,
-        write_network_map_tags,
-        write_options_and_reporting,
-        write_system_operation,
-        write_water_quality,
-    ]
+    return 0
 
-    all_functions = list_section_writer_callables(modules)
 
-    newlist = sorted(all_functions, key=lambda x: x.priority)
-    with open(filename, "w") as fid:
-        for f in newlist:
-            f.writerfunction(network, fid)
+def to_string(network: Network, units: Optional[str] = None) -> str:
+    """Converts an OOPNET network to the content of an EPANET input file without writing a file.
 
-    return 0
+    Args:
+      network: OOPNET network object
+      units: EPANET flow unit used in the input file, see write
+
+    Returns:
+      EPANET input file content
+
+    """
+    fid = io.StringIO()
+    write(network, fid, units)
+    return fid.getvalue()
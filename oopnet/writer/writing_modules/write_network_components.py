@@ -3,7 +3,7 @@ from typing import TYPE_CHECKING
 from io import TextIOWrapper
 import logging
 
-from oopnet.elements.network_components import GPV, TCV, PSV, PRV, PBV, FCV
+from oopnet.elements.network_components import Link, GPV, TCV, PSV, PRV, PBV, FCV
 
 from oopnet.utils.getters.element_lists import (
     get_junctions,
@@ -20,6 +20,9 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# attributes of the Links used by _link_line
+LINK_ATTRIBUTES = ("startnode", "endnode")
+
 
 @section_writer("TITLE", 0)
 def write_title(network: Network, fid: TextIOWrapper):
@@ -37,7 +40,12 @@ def write_title(network: Network, fid: TextIOWrapper):
     print("\n", file=fid)
 
 
-@section_writer("JUNCTIONS", 1)
+@section_writer(
+    "JUNCTIONS",
+    1,
+    registries=("junctions",),
+    attributes=("elevation", "demand", "demandpattern", "comment"),
+)
 def write_junctions(network: Network, fid: TextIOWrapper):
     """Writes Junctions to an EPANET input file.
 
@@ -47,27 +55,27 @@ def write_junctions(network: Network, fid: TextIOWrapper):
 
     """
     logger.debug("Writing Junctions section")
-    print("[JUNCTIONS]", file=fid)
-    print(";id elevation demand demandpattern", file=fid)
+    lines = ["[JUNCTIONS]", ";id elevation demand demandpattern"]
     for j in get_junctions(network):
-        print(j.id, end=" ", file=fid)
-        print(j.elevation, end=" ", file=fid)
-        if isinstance(j.demand, list):
-            print(j.demand[0], end=" ", file=fid)
-        else:
-            print(j.demand, end=" ", file=fid)
+        demand = j.demand[0] if isinstance(j.demand, list) else j.demand
+        line = f"{j.id} {j.elevation} {demand}"
         if j.demandpattern is not None:
             if isinstance(j.demandpattern, list):
-                print(j.demandpattern[0].id, end=" ", file=fid)
+                line += f" {j.demandpattern[0].id}"
             else:
-                print(j.demandpattern.id, end=" ", file=fid)
+                line += f" {j.demandpattern.id}"
         if j.comment is not None:
-            print(";", j.comment, end=" ", file=fid)
-        print("\n", end=" ", file=fid)
-    print("\n", end=" ", file=fid)
+            line += f" ; {j.comment}"
+        lines.append(line)
+    fid.write("\n".join(lines) + "\n\n")
 
 
-@section_writer("RESERVOIRS", 1)
+@section_writer(
+    "RESERVOIRS",
+    1,
+    registries=("reservoirs",),
+    attributes=("head", "headpattern", "comment"),
+)
 def write_reservoirs(network: Network, fid: TextIOWrapper):
     """Writes Reservoirs to an EPANET input file.
 
@@ -77,20 +85,32 @@ def write_reservoirs(network: Network, fid: TextIOWrapper):
 
     """
     logger.debug("Writing Reservoirs section")
-    print("[RESERVOIRS]", file=fid)
-    print(";id head pattern", file=fid)
+    lines = ["[RESERVOIRS]", ";id head pattern"]
     for r in get_reservoirs(network):
-        print(r.id, end=" ", file=fid)
-        print(r.head, end=" ", file=fid)
+        line = f"{r.id} {r.head}"
         if r.headpattern is not None:
-            print(r.headpattern.id, end=" ", file=fid)
+            line += f" {r.headpattern.id}"
         if r.comment is not None:
-            print(";", r.comment, end=" ", file=fid)
-        print("\n", end=" ", file=fid)
-    print("\n", end=" ", file=fid)
-
-
-@section_writer("TANKS", 1)
+            line += f" ; {r.comment}"
+        lines.append(line)
+    fid.write("\n".join(lines) + "\n\n")
+
+
+@section_writer(
+    "TANKS",
+    1,
+    registries=("tanks",),
+    attributes=(
+        "elevation",
+        "initlevel",
+        "minlevel",
+        "maxlevel",
+        "diameter",
+        "minvolume",
+        "volumecurve",
+        "comment",
+    ),
+)
 def write_tanks(network: Network, fid: TextIOWrapper):
     """Writes tanks to an EPANET input file.
 
@@ -100,29 +120,48 @@ def write_tanks(network: Network, fid: TextIOWrapper):
 
     """
     logger.debug("Writing Tanks section")
-    print("[TANKS]", file=fid)
-    print(
+    lines = [
+        "[TANKS]",
         ";id elevation initlevel minlevel maxlevel diameter minvolume volumecurve",
-        file=fid,
-    )
+    ]
     for t in get_tanks(network):
-        print(t.id, end=" ", file=fid)
-        print(t.elevation, end=" ", file=fid)
-        print(t.initlevel, end=" ", file=fid)
-        print(t.minlevel, end=" ", file=fid)
-        print(t.maxlevel, end=" ", file=fid)
-        print(t.diameter, end=" ", file=fid)
+        line = (
+            f"{t.id} {t.elevation} {t.initlevel} {t.minlevel} {t.maxlevel} {t.diameter}"
+        )
         if t.minvolume is not None:
-            print(t.minvolume, end=" ", file=fid)
+            line += f" {t.minvolume}"
         if t.volumecurve is not None:
-            print(t.volumecurve.id, end=" ", file=fid)
+            line += f" {t.volumecurve.id}"
         if t.comment is not None:
-            print(";", t.comment, end=" ", file=fid)
-        print("\n", end=" ", file=fid)
-    print("\n", end=" ", file=fid)
-
-
-@section_writer("PIPES", 2)
+            line += f" ; {t.comment}"
+        lines.append(line)
+    fid.write("\n".join(lines) + "\n\n")
+
+
+def _link_line(l: Link) -> str:
+    """Returns the ID and the node IDs of a link, starting an input file line."""
+    line = l.id
+    if l.startnode is not None:
+        line += f" {l.startnode.id}"
+    if l.endnode is not None:
+        line += f" {l.endnode.id}"
+    return line
+
+
+@section_writer(
+    "PIPES",
+    2,
+    registries=("pipes",),
+    attributes=(
+        *LINK_ATTRIBUTES,
+        "length",
+        "diameter",
+        "roughness",
+        "minorloss",
+        "status",
+        "comment",
+    ),
+)
 def write_pipes(network: Network, fid: TextIOWrapper):
     """Writes pipes to an EPANET input file.
 
@@ -132,29 +171,23 @@ def write_pipes(network: Network, fid: TextIOWrapper):
 
     """
     logger.debug("Writing Pipes section")
-    print("[PIPES]", file=fid)
-    print(
-        ";id startnode endnode length diameter roughness minorloss", file=fid
-    )  # status', file=fid)
+    lines = ["[PIPES]", ";id startnode endnode length diameter roughness minorloss"]
     for p in get_pipes(network):
-        print(p.id, end=" ", file=fid)
-        if p.startnode is not None:
-            print(p.startnode.id, end=" ", file=fid)
-        if p.endnode is not None:
-            print(p.endnode.id, end=" ", file=fid)
-        print(p.length, end=" ", file=fid)
-        print(p.diameter, end=" ", file=fid)
-        print(p.roughness, end=" ", file=fid)
-        print(p.minorloss, end=" ", file=fid)
+        line = f"{_link_line(p)} {p.length} {p.diameter} {p.roughness} {p.minorloss}"
         if p.status == "CV":
-            print(p.status, end=" ", file=fid)
+            line += f" {p.status}"
         if p.comment is not None:
-            print(";", p.comment, end=" ", file=fid)
-        print("\n", end=" ", file=fid)
-    print("\n", end=" ", file=fid)
+            line += f" ; {p.comment}"
+        lines.append(line)
+    fid.write("\n".join(lines) + "\n\n")
 
 
-@section_writer("PUMPS", 2)
+@section_writer(
+    "PUMPS",
+    2,
+    registries=("pumps",),
+    attributes=(*LINK_ATTRIBUTES, "power", "head", "speed", "pattern", "comment"),
+)
 def write_pumps(network: Network, fid: TextIOWrapper):
     """Writes pumps to an EPANET input file.
 
@@ -164,29 +197,40 @@ def write_pumps(network: Network, fid: TextIOWrapper):
 
     """
     logger.debug("Writing Pumps section")
-    print("[PUMPS]", file=fid)
-    print(";id startnode endnode keyword value", file=fid)
+    lines = ["[PUMPS]", ";id startnode endnode keyword value"]
     for p in get_pumps(network):
-        print(p.id, end=" ", file=fid)
-        if p.startnode is not None:
-            print(p.startnode.id, end=" ", file=fid)
-        if p.endnode is not None:
-            print(p.endnode.id, end=" ", file=fid)
+        line = _link_line(p)
         if p.power is not None:
-            print("POWER", p.power, end=" ", file=fid)
+            line += f" POWER {p.power}"
         if p.head is not None:
-            print("HEAD", p.head.id, end=" ", file=fid)
+            line += f" HEAD {p.head.id}"
         if p.speed is not None:
-            print("SPEED", p.speed, end=" ", file=fid)
+            line += f" SPEED {p.speed}"
         if p.pattern is not None:
-            print("PATTERN", p.pattern.id, end=" ", file=fid)
+            line += f" PATTERN {p.pattern.id}"
         if p.comment is not None:
-            print(";", p.comment, end=" ", file=fid)
-        print("\n", end=" ", file=fid)
-    print("\n", end=" ", file=fid)
-
-
-@section_writer("VALVES", 2)
+            line += f" ; {p.comment}"
+        lines.append(line)
+    fid.write("\n".join(lines) + "\n\n")
+
+
+@section_writer(
+    "VALVES",
+    2,
+    registries=("valves",),
+    attributes=(
+        *LINK_ATTRIBUTES,
+        "diameter",
+        "maximum_pressure",
+        "headloss_coefficient",
+        "pressure_limit",
+        "headloss_curve",
+        "pressure_drop",
+        "maximum_flow",
+        "minorloss",
+        "comment",
+    ),
+)
 def write_valves(network: Network, fid: TextIOWrapper):
     """Writes valves to an EPANET input file.
 
@@ -196,36 +240,31 @@ def write_valves(network: Network, fid: TextIOWrapper):
 
     """
     logger.debug("Writing Valves section")
-    print("[VALVES]", file=fid)
-    print(";id startnode endnode diameter valvetype setting minorloss", file=fid)
+    lines = ["[VALVES]", ";id startnode endnode diameter valvetype setting minorloss"]
     for v in get_valves(network):
-        print(v.id, end=" ", file=fid)
-        if v.startnode is not None:
-            print(v.startnode.id, end=" ", file=fid)
-        if v.endnode is not None:
-            print(v.endnode.id, end=" ", file=fid)
-        print(v.diameter, end=" ", file=fid)
-        print(v.__class__.__name__, end=" ", file=fid)
+        line = f"{_link_line(v)} {v.diameter} {v.__class__.__name__}"
         if isinstance(v, PRV):
-            print(v.maximum_pressure, end=" ", file=fid)
+            line += f" {v.maximum_pressure}"
         elif isinstance(v, TCV):
-            print(v.headloss_coefficient, end=" ", file=fid)
+            line += f" {v.headloss_coefficient}"
         elif isinstance(v, PSV):
-            print(v.pressure_limit, end=" ", file=fid)
+            line += f" {v.pressure_limit}"
         elif isinstance(v, GPV):
-            print(v.headloss_curve.id, end=" ", file=fid)
+            line += f" {v.headloss_curve.id}"
         elif isinstance(v, PBV):
-            print(v.pressure_drop, end=" ", file=fid)
+            line += f" {v.pressure_drop}"
         elif isinstance(v, FCV):
-            print(v.maximum_flow, end=" ", file=fid)
-        print(v.minorloss, end=" ", file=fid)
+            line += f" {v.maximum_flow}"
+        line += f" {v.minorloss}"
         if v.comment is not None:
-            print(";", v.comment, end=" ", file=fid)
-        print("\n", end=" ", file=fid)
-    print("\n", end=" ", file=fid)
+            line += f" ; {v.comment}"
+        lines.append(line)
+    fid.write("\n".join(lines) + "\n\n")
 
 
-@section_writer("EMITTERS", 3)
+@section_writer(
+    "EMITTERS", 3, registries=("junctions",), attributes=("emittercoefficient",)
+)
 def write_emitter(network: Network, fid: TextIOWrapper):
     """Writes Junction emitters to an EPANET input file.
 
@@ -235,9 +274,8 @@ def write_emitter(network: Network, fid: TextIOWrapper):
 
     """
     logger.debug("Writing Emitter section")
-    print("[EMITTERS]", file=fid)
-    print(";id emittercoefficient", file=fid)
+    lines = ["[EMITTERS]", ";id emittercoefficient"]
     for j in get_junctions(network):
         if j.emittercoefficient > 0.0:
-            print(j.id, j.emittercoefficient, file=fid)
-    print("\n", file=fid)
+            lines.append(f"{j.id} {j.emittercoefficient}")
+    fid.write("\n".join(lines) + "\n\n")
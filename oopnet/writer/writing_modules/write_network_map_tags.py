@@ -4,7 +4,11 @@ from io import TextIOWrapper
 import logging
 
 from oopnet.utils.getters.element_lists import get_nodes, get_links
-from oopnet.writer.decorators import section_writer
+from oopnet.writer.decorators import (
+    section_writer,
+    NODE_REGISTRIES,
+    LINK_REGISTRIES,
+)
 
 if TYPE_CHECKING:
     from oopnet.elements.network import Network
@@ -12,7 +16,12 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
-@section_writer("COORDINATES", 4)
+@section_writer(
+    "COORDINATES",
+    4,
+    registries=NODE_REGISTRIES,
+    attributes=("xcoordinate", "ycoordinate"),
+)
 def write_coordinates(network: Network, fid: TextIOWrapper):
     """Writes coordinates to an EPANET input file.
 
@@ -22,14 +31,13 @@ def write_coordinates(network: Network, fid: TextIOWrapper):
 
     """
     logger.debug("Writing Coordinates section")
-    print("[COORDINATES]", file=fid)
-    print(";nodeid xcoordinate ycoordinate", file=fid)
+    lines = ["[COORDINATES]", ";nodeid xcoordinate ycoordinate"]
     for n in get_nodes(network):
-        print(n.id, n.xcoordinate, n.ycoordinate, file=fid)
-    print("\n", end=" ", file=fid)
+        lines.append(f"{n.id} {n.xcoordinate} {n.ycoordinate}")
+    fid.write("\n".join(lines) + "\n\n")
 
 
-@section_writer("VERTICES", 4)
+@section_writer("VERTICES", 4, registries=LINK_REGISTRIES, attributes=("vertices",))
 def write_vertices(network: Network, fid: TextIOWrapper):
     """Writes vertices to an EPANET input file.
 
@@ -39,12 +47,11 @@ def write_vertices(network: Network, fid: TextIOWrapper):
 
     """
     logger.debug("Writing Vertices section")
-    print("[VERTICES]", file=fid)
-    print(";linkkid xcoordinate ycoordinate", file=fid)
+    lines = ["[VERTICES]", ";linkkid xcoordinate ycoordinate"]
     for l in get_links(network):
         for v in l.vertices:
-            print(l.id, v.xcoordinate, v.ycoordinate, file=fid)
-    print("\n", end=" ", file=fid)
+            lines.append(f"{l.id} {v.xcoordinate} {v.ycoordinate}")
+    fid.write("\n".join(lines) + "\n\n")
 
 
 @section_writer("LABELS", 4)
@@ -18,7 +18,7 @@ from oopnet.utils.getters.element_lists import (
     get_controls,
     get_rules,
 )
-from oopnet.writer.decorators import section_writer
+from oopnet.writer.decorators import section_writer, LINK_REGISTRIES
 
 if TYPE_CHECKING:
     from oopnet.elements.network import Network
@@ -26,7 +26,7 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
-@section_writer("CURVES", 3)
+@section_writer("CURVES", 3, registries=("curves",), attributes=("xvalues", "yvalues"))
 def write_curves(network: Network, fid: TextIOWrapper):
     """Writes curves to an EPANET input file.
 
@@ -36,15 +36,14 @@ def write_curves(network: Network, fid: TextIOWrapper):
 
     """
     logger.debug("Writing Curves section")
-    print("[CURVES]", file=fid)
-    print(";id xvalue yvalue", file=fid)
+    lines = ["[CURVES]", ";id xvalue yvalue"]
     for c in get_curves(network):
         for x, y in zip(c.xvalues, c.yvalues):
-            print(c.id, x, y, file=fid)
-    print("\n", end=" ", file=fid)
+            lines.append(f"{c.id} {x} {y}")
+    fid.write("\n".join(lines) + "\n\n")
 
 
-@section_writer("PATTERNS", 3)
+@section_writer("PATTERNS", 3, registries=("patterns",), attributes=("multipliers",))
 def write_patterns(network: Network, fid: TextIOWrapper):
     """Writes patterns to an EPANET input file.
 
@@ -54,14 +53,12 @@ def write_patterns(network: Network, fid: TextIOWrapper):
 
     """
     logger.debug("Writing Patterns section")
-    print("[PATTERNS]", file=fid)
-    print(";id multipliers", file=fid)
+    lines = ["[PATTERNS]", ";id multipliers"]
     for p in get_patterns(network):
         for m in p.multipliers:
-            print(p.id, end=" ", file=fid)
-            print(m, file=fid)
-        print("\n", end=" ", file=fid)
-    print("\n", end=" ", file=fid)
+            lines.append(f"{p.id} {m}")
+        lines.append("")
+    fid.write("\n".join(lines) + "\n\n")
 
 
 @section_writer("ENERGY", 3)
@@ -74,24 +71,25 @@ def write_energy(network: Network, fid: TextIOWrapper):
 
     """
     logger.debug("Writing Energy section")
-    print("[ENERGY]", file=fid)
+    lines = ["[ENERGY]"]
     for e in get_energy_entries(network):
+        if e.value is None:
+            continue
         keyword = e.keyword if e.keyword != "DEMAND_CHARGE" else "DEMAND CHARGE"
-        print(keyword, end=" ", file=fid)
+        line = keyword
         if keyword == "PUMP":
-            print(e.pumpid.id, end=" ", file=fid)
+            line += f" {e.pumpid.id}"
         if e.parameter is not None:
-            print(e.parameter, end=" ", file=fid)
-        if e.value is not None:
-            if isinstance(e.value, (Curve, Pattern)):
-                print(e.value.id, end=" ", file=fid)
-            else:
-                print(e.value, end=" ", file=fid)
-            print("\n", end=" ", file=fid)
-    print("\n", end=" ", file=fid)
+            line += f" {e.parameter}"
+        if isinstance(e.value, (Curve, Pattern)):
+            line += f" {e.value.id}"
+        else:
+            line += f" {e.value}"
+        lines.append(line)
+    fid.write("\n".join(lines) + "\n\n")
 
 
-@section_writer("STATUS", 3)
+@section_writer("STATUS", 3, registries=LINK_REGISTRIES, attributes=("status",))
 def write_status(network: Network, fid: TextIOWrapper):
     """Writes status section to an EPANET input file.
 
@@ -101,20 +99,12 @@ def write_status(network: Network, fid: TextIOWrapper):
 
     """
     logger.debug("Writing Status section")
-    print("[STATUS]", file=fid)
-    print(";id status/setting", file=fid)
-    for l in get_pipes(network):
-        if l.status == "CLOSED":
-            print(l.id, l.status, file=fid)
-    for v in get_valves(network):
-        if v.status == "CLOSED":
-            print(v.id, v.status, file=fid)
-    for pu in get_pumps(network):
-        if pu.status == "CLOSED":
-            print(pu.id, pu.status, file=fid)
-        # elif pu.keyword == 'SPEED':
-        #     print(pu.id, pu, file=fid)
-    print("\n", end=" ", file=fid)
+    lines = ["[STATUS]", ";id status/setting"]
+    for links in (get_pipes(network), get_valves(network), get_pumps(network)):
+        for l in links:
+            if l.status == "CLOSED":
+                lines.append(f"{l.id} {l.status}")
+    fid.write("\n".join(lines) + "\n\n")
 
 
 @section_writer("CONTROLS", 3)
@@ -127,29 +117,21 @@ def write_controls(network: Network, fid: TextIOWrapper):
 
     """
     logger.debug("Writing Controls section")
-    print("[CONTROLS]", file=fid)
+    lines = ["[CONTROLS]"]
     for c in get_controls(network):
-        print("LINK", c.action.object.id, c.action.value, end=" ", file=fid)
+        line = f"LINK {c.action.object.id} {c.action.value}"
         if c.condition.object is not None:
-            print(
-                "IF NODE",
-                c.condition.object.id,
-                c.condition.relation,
-                c.condition.value,
-                file=fid,
-            )
+            line += f" IF NODE {c.condition.object.id} {c.condition.relation} {c.condition.value}"
         elif c.condition.time is not None:
-            print("AT TIME", str(c.condition.time)[:-3], file=fid)
+            line += f" AT TIME {str(c.condition.time)[:-3]}"
         elif c.condition.clocktime is not None:
-            print(
-                "AT CLOCKTIME",
-                datetime.datetime.strftime(c.condition.clocktime, "%I:%M %p"),
-                file=fid,
-            )
-    print("\n", end=" ", file=fid)
+            clocktime = datetime.datetime.strftime(c.condition.clocktime, "%I:%M %p")
+            line += f" AT CLOCKTIME {clocktime}"
+        lines.append(line)
+    fid.write("\n".join(lines) + "\n\n")
 
 
-@section_writer("RULES", 3)
+@section_writer("RULES", 3, registries=("rules",), contents=("id", "condition"))
 def write_rules(network: Network, fid: TextIOWrapper):
     """Writes rules to an EPANET input file.
 
@@ -159,44 +141,29 @@ def write_rules(network: Network, fid: TextIOWrapper):
 
     """
     logger.debug("Writing Rules section")
-    print("[RULES]", file=fid)
+    lines = ["[RULES]"]
     for r in get_rules(network):
-        print("RULE", r.id, file=fid)
+        lines.append(f"RULE {r.id}")
         for c in r.condition:
             if isinstance(c.object, NetworkComponent):
-                object_type = "Valve" if isinstance(c.object, Valve) else c.object.__class__.__name__
-
-                print(
-                    c.logical,
-                    object_type,
-                    c.object.id,
-                    c.attribute,
-                    c.relation,
-                    c.value,
-                    file=fid,
+                object_type = (
+                    "Valve"
+                    if isinstance(c.object, Valve)
+                    else c.object.__class__.__name__
+                )
+                lines.append(
+                    f"{c.logical} {object_type} {c.object.id} {c.attribute} {c.relation} {c.value}"
+                )
+            elif c.attribute == "TIME":
+                lines.append(
+                    f"{c.logical} SYSTEM {c.attribute} {c.relation} {str(c.value)[:-3]}"
+                )
+            elif c.attribute == "CLOCKTIME":
+                clocktime = datetime.datetime.strftime(c.value, "%I:%M %p")
+                lines.append(
+                    f"{c.logical} SYSTEM {c.attribute} {c.relation} {clocktime}"
                 )
-            elif c.attribute is not None:
-                object_type = "SYSTEM"
-                if c.attribute == "TIME":
-                    print(
-                        c.logical,
-                        object_type,
-                        c.attribute,
-                        c.relation,
-                        str(c.value)[:-3],
-                        file=fid,
-                    )
-                elif c.attribute == "CLOCKTIME":
-                    timeformat = "%I:%M %p"
-                    print(
-                        c.logical,
-                        object_type,
-                        c.attribute,
-                        c.relation,
-                        datetime.datetime.strftime(c.value, timeformat),
-                        file=fid,
-                    )
-    print("\n", end=" ", file=fid)
+    fid.write("\n".join(lines) + "\n\n")
 
 
 @section_writer("DEMANDS", 3)
@@ -209,21 +176,17 @@ def write_demands(network: Network, fid: TextIOWrapper):
 
     """
     logger.debug("Writing Demands section")
-    print("[DEMANDS]", file=fid)
-    print(";id demand pattern category", file=fid)
+    lines = ["[DEMANDS]", ";id demand pattern category"]
     for j in get_junctions(network):
         if j.demand is None or isinstance(j.demand, (float, int)):
             pass
         elif isinstance(j.demand, list):
             for i, d in enumerate(j.demand):
-                print(j.id, end=" ", file=fid)
-                print(d, end=" ", file=fid)
-                # todo: replace try except
-                try:
-                    print(j.demandpattern[i].id, end=" ", file=fid)
-                except:
-                    pass
-                print("\n", end=" ", file=fid)
+                line = f"{j.id} {d}"
+                if isinstance(j.demandpattern, list) and i < len(j.demandpattern):
+                    if j.demandpattern[i] is not None:
+                        line += f" {j.demandpattern[i].id}"
+                lines.append(line)
         else:
             raise TypeError(f"Unknown demand dtype {type(j.demand)}")
-    print("\n", end=" ", file=fid)
+    fid.write("\n".join(lines) + "\n\n")
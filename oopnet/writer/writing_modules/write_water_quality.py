@@ -4,7 +4,7 @@ from io import TextIOWrapper
 import logging
 
 from oopnet.utils.getters.element_lists import get_tanks, get_nodes
-from oopnet.writer.decorators import section_writer
+from oopnet.writer.decorators import section_writer, NODE_REGISTRIES
 
 if TYPE_CHECKING:
     from oopnet.elements.network import Network
@@ -12,7 +12,9 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
-@section_writer("QUALITY", 3)
+@section_writer(
+    "QUALITY", 3, registries=NODE_REGISTRIES, attributes=("initialquality",)
+)
 def write_quality(network: Network, fid: TextIOWrapper):
     """Writes quality section to an EPANET input file.
 
@@ -22,12 +24,11 @@ def write_quality(network: Network, fid: TextIOWrapper):
 
     """
     logger.debug("Writing Quality section")
-    print("[QUALITY]", file=fid)
-    print(";id initialquality", file=fid)
+    lines = ["[QUALITY]", ";id initialquality"]
     for n in get_nodes(network):
         if n.initialquality > 0.0:
-            print(n.id, n.initialquality, file=fid)
-    print("\n", end=" ", file=fid)
+            lines.append(f"{n.id} {n.initialquality}")
+    fid.write("\n".join(lines) + "\n\n")
 
 
 @section_writer("REACTIONS", 3)
@@ -63,7 +64,12 @@ def write_reactions(network: Network, fid: TextIOWrapper):
     print("\n", end=" ", file=fid)
 
 
-@section_writer("SOURCES", 3)
+@section_writer(
+    "SOURCES",
+    3,
+    registries=NODE_REGISTRIES,
+    attributes=("sourcetype", "strength", "sourcepattern"),
+)
 def write_sources(network: Network, fid: TextIOWrapper):
     """Writes sources section to an EPANET input file.
 
@@ -73,17 +79,16 @@ def write_sources(network: Network, fid: TextIOWrapper):
 
     """
     logger.debug("Writing Sources section")
-    print("[SOURCES]", file=fid)
-    print(";id sourcetype strength sourcepattern", file=fid)
+    lines = ["[SOURCES]", ";id sourcetype strength sourcepattern"]
     for n in get_nodes(network):
         if n.sourcetype:
-            print(n.id, n.sourcetype, end=" ", file=fid)
+            line = f"{n.id} {n.sourcetype}"
             if n.strength > 0.0:
-                print(n.strength, end=" ", file=fid)
+                line += f" {n.strength}"
             if n.sourcepattern:
-                print(n.sourcepattern.id, end=" ", file=fid)
-            print("\n", end=" ", file=fid)
-    print("\n", end=" ", file=fid)
+                line += f" {n.sourcepattern.id}"
+            lines.append(line)
+    fid.write("\n".join(lines) + "\n\n")
 
 
 @section_writer("MIXING", 3)
@@ -96,12 +101,11 @@ def write_mixing(network: Network, fid: TextIOWrapper):
 
     """
     logger.debug("Writing Mixing section")
-    print("[MIXING]", file=fid)
-    print(";tankid mixingmodel compartmentvolume", file=fid)
+    lines = ["[MIXING]", ";tankid mixingmodel compartmentvolume"]
     for t in get_tanks(network):
         if t.mixingmodel:
-            print(t.id, t.mixingmodel, end=" ", file=fid)
+            line = f"{t.id} {t.mixingmodel}"
             if t.compartmentvolume and t.compartmentvolume != 0.0:
-                print(t.compartmentvolume, end=" ", file=fid)
-            print("\n", end=" ", file=fid)
-    print("\n", end=" ", file=fid)
+                line += f" {t.compartmentvolume}"
+            lines.append(line)
+    fid.write("\n".join(lines) + "\n\n")
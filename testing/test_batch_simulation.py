@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import oopnet as on
+from oopnet.utils.getters.element_lists import get_reservoirs
+
+from testing.base import PoulakisEnhancedPDAModel
+
+
+def raise_heads(network: on.Network):
+    for r in get_reservoirs(network):
+        r.head += 10.0
+
+
+def lower_heads(network: on.Network):
+    for r in get_reservoirs(network):
+        r.head -= 10.0
+
+
+class PoulakisEnhancedPDARunManyTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.model = PoulakisEnhancedPDAModel()
+        self.network = self.model.network
+
+    def test_networks(self):
+        reports = list(on.run_many([self.network, self.network], executor='thread', max_workers=2))
+        self.assertEqual(2, len(reports))
+        expected = self.network.run().pressure
+        for rpt in reports:
+            np.testing.assert_array_equal(expected.values, rpt.pressure.values)
+
+    def test_modifiers_thread(self):
+        reports = list(self.network.run_many([raise_heads, lower_heads], executor='thread'))
+        self.assertGreater(reports[0].pressure.sum(), reports[1].pressure.sum())
+        self.assertEqual(self.network.run().head.max(), get_reservoirs(self.network)[0].head)
+
+    def test_modifiers_process(self):
+        reports = list(self.network.run_many([raise_heads, lower_heads], executor='process', max_workers=2))
+        self.assertEqual(2, len(reports))
+        self.assertGreater(reports[0].pressure.sum(), reports[1].pressure.sum())
+
+    def test_stack(self):
+        rpt = self.network.run_many([raise_heads, lower_heads, raise_heads], executor='thread', stack=True)
+        self.assertEqual((3, len(self.network.run().pressure)), rpt.pressure.shape)
+        self.assertEqual([0, 1, 2], list(rpt.nodes.scenario.values))
+        np.testing.assert_array_equal(rpt.pressure.loc[0].values, rpt.pressure.loc[2].values)
+
+    def test_scratch_directories(self):
+        with tempfile.TemporaryDirectory() as path:
+            list(self.network.run_many([raise_heads] * 4, executor='thread', path=path))
+            self.assertEqual([], os.listdir(path))
+
+    def test_missing_network(self):
+        # raised before iterating over the reports
+        with self.assertRaises(ValueError):
+            on.run_many([raise_heads], executor='thread')
+
+    def test_invalid_executor(self):
+        with self.assertRaises(ValueError):
+            on.run_many([self.network], executor='invalid')
+
+
+if __name__ == '__main__':
+    unittest.main()
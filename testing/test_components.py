@@ -1,9 +1,12 @@
+import pickle
 import unittest
 from copy import deepcopy
 
 import numpy as np
 
+from oopnet.elements.network_components import Junction, Pipe, PRV
 from oopnet.elements.network_map_tags import Vertex
+from oopnet.elements.system_operation import Curve, Pattern
 from oopnet.utils.getters.get_by_id import get_link, get_pipe
 from oopnet.utils.getters.element_lists import get_link_ids, get_junction_ids, get_pipe_ids
 
@@ -73,5 +76,38 @@ class TestLink(unittest.TestCase):
         self.assertListEqual([2.0, 2.0], center.tolist())
 
 
+class TestSlots(unittest.TestCase):
+    def setUp(self) -> None:
+        self.model = SimpleModel()
+        self.pipe = get_pipe(self.model.network, 'P-0')
+
+    def test_no_dict(self):
+        for component in (Junction(id='J'), Pipe(id='P'), PRV(id='V'), Curve(id='C'), Pattern(id='P')):
+            self.assertFalse(hasattr(component, '__dict__'))
+        with self.assertRaises(AttributeError):
+            self.pipe.nonexistent = 1
+
+    def test_defaults(self):
+        junction = Junction(id='J')
+        self.assertIsNone(junction._network)
+        self.assertEqual(0.0, junction.demand)
+        self.assertEqual([], Pipe(id='P').vertices)
+
+    def test_pickle(self):
+        pipe = pickle.loads(pickle.dumps(self.pipe))
+        self.assertEqual(self.pipe, pipe)
+        self.assertEqual('P-0', pipe.id)
+        self.assertEqual('J-1', pipe.startnode.id)
+
+    def test_deepcopy(self):
+        network = deepcopy(self.model.network)
+        pipe = get_pipe(network, 'P-0')
+        self.assertEqual(self.pipe, pipe)
+        self.assertIs(network, pipe._network)
+        pipe.id = 'new-ID'
+        self.assertTrue('new-ID' in get_pipe_ids(network))
+        self.assertFalse('new-ID' in get_pipe_ids(self.model.network))
+
+
 if __name__ == '__main__':
     unittest.main()
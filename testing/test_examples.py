@@ -62,6 +62,15 @@ class ExampleTest(unittest.TestCase):
     def test_mc_stereo_multiprocessing(self, mock_show):
         import examples.mc_stereo_multiprocessing
 
+    def test_mc_stereo_run_many(self, mock_show):
+        import examples.mc_stereo_run_many
+
+    def test_mc_stereo_worker_pool(self, mock_show):
+        import examples.mc_stereo_worker_pool
+
+    def test_mc_stereo_statistics(self, mock_show):
+        import examples.mc_stereo_statistics
+
     # def test_mc_stereo_scoop(self, mock_show):
     #     import examples.mc_stereo_scoop
 
@@ -2,6 +2,8 @@ import unittest
 import datetime
 import os
 
+import pandas as pd
+
 from oopnet.elements.network_components import Junction, Tank, Reservoir, Pipe, Pump, Valve
 from oopnet.elements.system_operation import Curve
 from oopnet.utils.getters import *
@@ -246,5 +248,173 @@ class ETownReaderTest(unittest.TestCase):
         self.assertEqual(3, len(l.vertices))
 
 
+class ComponentSectionReaderTest(unittest.TestCase):
+    content = '\n'.join([
+        '[JUNCTIONS]',
+        ';ID\tElev\tDemand',
+        ' J-1\t10\t1.5\t;first   junction',
+        ' J-2  12 ',
+        '[RESERVOIRS]',
+        ' R-1\t50',
+        '[PIPES]',
+        ' P-1\tR-1\tJ-1\t100\t200\t130\t0\topen\t;',
+        ' P-2\tJ-1\tJ-2\t100\t200\t130\t0\tClosed',
+        '[COORDINATES]',
+        ' J-1\t1\t2',
+        '[END]',
+    ])
+
+    def read(self, content):
+        from oopnet import Network
+        return Network.read(content=content)
+
+    def test_components(self):
+        net = self.read(self.content)
+        j1, j2 = get_junction(net, 'J-1'), get_junction(net, 'J-2')
+        self.assertEqual(1.5, j1.demand)
+        self.assertEqual('first junction', j1.comment)
+        self.assertEqual(12, j2.elevation)
+        self.assertIsNone(j2.comment)
+        self.assertEqual((1, 2), (j1.xcoordinate, j1.ycoordinate))
+        p1, p2 = get_pipe(net, 'P-1'), get_pipe(net, 'P-2')
+        self.assertIs(get_reservoir(net, 'R-1'), p1.startnode)
+        self.assertIs(j1, p1.endnode)
+        self.assertEqual('OPEN', p1.status)
+        self.assertIsNone(p1.comment)
+        self.assertEqual('CLOSED', p2.status)
+        for component in [j1, j2, p1, p2]:
+            self.assertIs(net, component._network)
+
+    def test_duplicate_id(self):
+        from oopnet.elements.component_registry import IdenticalIDError
+        with self.assertRaises(IdenticalIDError):
+            self.read(self.content.replace(' J-2  12 ', ' J-1  12 '))
+        with self.assertRaises(IdenticalIDError):
+            self.read(self.content.replace(' R-1\t50', ' J-2\t50'))
+
+    def test_missing_node(self):
+        from oopnet.elements.component_registry import ComponentNotExistingError
+        with self.assertRaises(ComponentNotExistingError):
+            self.read(self.content.replace('J-1\tJ-2\t100', 'J-1\tJ-3\t100'))
+
+    def test_too_many_values(self):
+        from oopnet.reader.factories.base import LengthExceededError
+        with self.assertRaises(LengthExceededError):
+            self.read(self.content.replace(' J-2  12 ', ' J-2  12 0 1 2'))
+
+
+class StreamReaderTest(unittest.TestCase):
+    content = '\n'.join([
+        'lines before the first header',
+        '[COORDINATES]',
+        ' J-1\t1\t2',
+        '[PIPES]',
+        ' P-1\tR-1\tJ-1\t100\t200\t130\t0\topen',
+        '[JUNCTIONS]',
+        ' J-1\t10\t1.5\tPAT-1',
+        '[RESERVOIRS]',
+        ' R-1\t50',
+        '[PATTERNS]',
+        ' PAT-1\t1.0\t1.2',
+        '[TITLE]',
+        'Stream test',
+        '[END]',
+    ])
+
+    def test_forward_references(self):
+        from oopnet import Network
+        net = Network.read(content=self.content, stream=True)
+        j1 = get_junction(net, 'J-1')
+        self.assertIs(get_patterns(net)[0], j1.demandpattern)
+        self.assertEqual((1, 2), (j1.xcoordinate, j1.ycoordinate))
+        self.assertIs(j1, get_pipe(net, 'P-1').endnode)
+        self.assertEqual(Network.read(content=self.content), net)
+
+    def test_models(self):
+        from oopnet import Network
+        set_dir_testing()
+        for filename in [os.path.join('networks', 'Poulakis_enhanced_PDA.inp'),
+                         os.path.join('networks', 'Rules_network.inp'),
+                         os.path.join('..', 'examples', 'data', 'C-town.inp'),
+                         os.path.join('..', 'examples', 'data', 'MICROPOLIS_v1.inp')]:
+            with self.subTest(filename=filename):
+                self.assertEqual(Network.read(filename), Network.read(filename, stream=True))
+
+    def test_errors(self):
+        from oopnet import Network
+        from oopnet.elements.component_registry import ComponentNotExistingError
+        with self.assertRaises(ComponentNotExistingError):
+            Network.read(content=self.content.replace('R-1\tJ-1', 'R-1\tJ-3'), stream=True)
+        with self.assertRaises(ValueError):
+            Network.read(stream=True)
+
+
+class SectionReaderTest(unittest.TestCase):
+    def setUp(self) -> None:
+        set_dir_testing()
+        self.filename = os.path.join('networks', 'C-town.inp')
+
+    def test_select_sections(self):
+        from oopnet.reader.read import select_sections, REQUIRED_SECTIONS, UNIT_SECTIONS
+        selected = select_sections(['[vertices]'])
+        self.assertTrue(set(REQUIRED_SECTIONS) <= selected)
+        self.assertTrue({'VERTICES', 'PUMPS', 'VALVES', 'PATTERNS', 'CURVES'} <= selected)
+        self.assertNotIn('RULES', selected)
+        self.assertTrue(set(UNIT_SECTIONS) <= select_sections(['[vertices]'], 'GPM'))
+        with self.assertRaises(ValueError):
+            select_sections(['NONSENSE'])
+
+    def test_file_units(self):
+        from oopnet.reader.read import file_units
+        with open(os.path.join('..', 'examples', 'data', 'MICROPOLIS_v1.inp')) as f:
+            self.assertEqual('GPM', file_units(f))
+        self.assertEqual('LPS', file_units(['[JUNCTIONS]', 'J-1 0 0']))
+
+    def test_raw_sections(self):
+        from oopnet import Network
+        full = Network.read(self.filename)
+        net = Network.read(self.filename, sections=['COORDINATES', 'VERTICES'])
+        self.assertEqual([], get_controls(net))
+        self.assertIn('CONTROLS', net.raw_sections)
+        self.assertNotIn('COORDINATES', net.raw_sections)
+        self.assertEqual(get_junctions(full), get_junctions(net))
+        self.assertEqual(get_pipe_ids(full), get_pipe_ids(net))
+
+        filename = os.path.join('tmp', 'sections.inp')
+        os.makedirs('tmp', exist_ok=True)
+        net.write(filename)
+        with open(filename) as f:
+            content = f.read()
+        for name, text in net.raw_sections.items():
+            self.assertIn(f'[{name}]\n{text}', content)
+        self.assertEqual(get_controls(full), get_controls(Network.read(filename)))
+
+    def test_unit_sections(self):
+        from oopnet import Network
+        from oopnet.reader.read import UNIT_SECTIONS
+        filename = os.path.join('..', 'examples', 'data', 'MICROPOLIS_v1.inp')
+        net = Network.read(filename, sections=['COORDINATES'])
+        self.assertFalse(set(UNIT_SECTIONS) & net.raw_sections.keys())
+        self.assertEqual(get_rules(Network.read(filename)), get_rules(net))
+
+    def test_run(self):
+        from oopnet import Network
+        rpt = Network.read(self.filename, sections=['PIPES']).run()
+        pd.testing.assert_series_equal(Network.read(self.filename).run().pressure, rpt.pressure)
+
+    def test_edit_settings(self):
+        from oopnet import Network
+        net = Network.read(self.filename, sections=['PIPES'])
+        self.assertNotIn('TIMES', net.raw_sections)
+        net.times.duration = datetime.timedelta(hours=3)
+        self.assertEqual(datetime.timedelta(hours=3), Network.read(content=net.to_string()).times.duration)
+
+    def test_stream(self):
+        from oopnet import Network
+        sections = ['COORDINATES', 'VERTICES']
+        self.assertEqual(Network.read(self.filename, sections=sections),
+                         Network.read(self.filename, sections=sections, stream=True))
+
+
 if __name__ == '__main__':
     unittest.main()
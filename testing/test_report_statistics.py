@@ -0,0 +1,93 @@
+import pickle
+import unittest
+
+import numpy as np
+import xarray as xr
+
+import oopnet as on
+from oopnet.report.report import SimulationReport
+
+from testing.base import PoulakisEnhancedPDAModel, MicropolisModel
+
+
+def create_report(values: np.ndarray) -> SimulationReport:
+    nodes = xr.DataArray(values, dims=('id', 'vars'),
+                         coords={'id': [f'J-{i}' for i in range(values.shape[0])], 'vars': ['Pressure']})
+    return SimulationReport.from_arrays(nodes, None)
+
+
+class ReportStatisticsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.data = np.random.default_rng(0).normal(10.0, 2.0, (2000, 50, 1))
+        self.stats = on.ReportStatistics().update(create_report(values) for values in self.data)
+
+    def test_moments(self):
+        self.assertEqual(2000, self.stats.count)
+        np.testing.assert_allclose(self.data.mean(axis=0), self.stats.mean().nodes.values)
+        np.testing.assert_allclose(self.data.var(axis=0, ddof=1), self.stats.var().nodes.values)
+        np.testing.assert_allclose(self.data.std(axis=0), self.stats.std(ddof=0).nodes.values)
+        np.testing.assert_array_equal(self.data.min(axis=0), self.stats.min().nodes.values)
+        np.testing.assert_array_equal(self.data.max(axis=0), self.stats.max().nodes.values)
+        self.assertIsNone(self.stats.mean().links)
+
+    def test_quantiles(self):
+        for quantile in self.stats.quantiles:
+            expected = np.quantile(self.data, quantile, axis=0)
+            np.testing.assert_allclose(expected, self.stats.quantile(quantile).nodes.values, atol=0.3)
+        with self.assertRaises(ValueError):
+            self.stats.quantile(0.3)
+
+    def test_few_reports(self):
+        stats = on.ReportStatistics().update(create_report(values) for values in self.data[:3])
+        np.testing.assert_allclose(np.quantile(self.data[:3], 0.5, axis=0), stats.quantile(0.5).nodes.values)
+
+    def test_merge(self):
+        parts = [on.ReportStatistics().update(create_report(values) for values in chunk)
+                 for chunk in np.split(self.data, [3, 1000, 1500])]
+        stats = parts[0]
+        for other in parts[1:]:
+            stats.merge(pickle.loads(pickle.dumps(other)))
+        self.assertEqual(2000, stats.count)
+        np.testing.assert_allclose(self.data.mean(axis=0), stats.mean().nodes.values)
+        np.testing.assert_allclose(self.data.var(axis=0, ddof=1), stats.var().nodes.values)
+        np.testing.assert_array_equal(self.data.max(axis=0), stats.max().nodes.values)
+        for quantile in stats.quantiles:
+            expected = np.quantile(self.data, quantile, axis=0)
+            np.testing.assert_allclose(expected, stats.quantile(quantile).nodes.values, atol=0.5)
+
+    def test_shape_mismatch(self):
+        with self.assertRaises(ValueError):
+            self.stats.add(create_report(self.data[0, :10]))
+
+    def test_empty(self):
+        with self.assertRaises(ValueError):
+            on.ReportStatistics().mean()
+
+
+class PoulakisEnhancedPDAStatisticsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.model = PoulakisEnhancedPDAModel()
+        self.reports = [self.model.network.run() for _ in range(3)]
+
+    def test_properties(self):
+        stats = on.ReportStatistics().update(self.reports)
+        self.assertEqual(3, stats.count)
+        pressure = self.reports[0].pressure
+        self.assertTrue(pressure.equals(stats.mean().pressure))
+        self.assertTrue(pressure.equals(stats.quantile(0.5).pressure))
+        self.assertTrue((stats.std().flow == 0).all())
+
+
+class MicropolisStatisticsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.model = MicropolisModel()
+        self.report = self.model.network.run()
+
+    def test_dimensions(self):
+        stats = on.ReportStatistics().update([self.report] * 2)
+        self.assertEqual(self.report.nodes.dims, stats.max().nodes.dims)
+        self.assertTrue(self.report.pressure.equals(stats.min().pressure))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+
+import numpy as np
+
+from oopnet.simulator.reportfile_reader import parse_table, report2blocks, blocks2xray
+
+
+class ParseTableTest(unittest.TestCase):
+    def test_values(self):
+        text = ('  J-01                 1.00    105.08     27.84\n'
+                '  J-02                -0.41     73.51     -4.56\n')
+        np.testing.assert_array_equal([[1.0, 105.08, 27.84], [-0.41, 73.51, -4.56]], parse_table(text, 3))
+
+    def test_glued_values(self):
+        text = '  P-1               1234.00-12345678.90-1234567.89\n'
+        np.testing.assert_array_equal([[1234.0, -12345678.9, -1234567.89]], parse_table(text, 3))
+
+    def test_types(self):
+        text = ('  PU1                  0.00      0.00      1.00  Pump\n'
+                '  V-2                254.00     -0.50      0.00  TCV\n')
+        np.testing.assert_array_equal([[0.0, 0.0, 1.0], [254.0, -0.5, 0.0]], parse_table(text, 3))
+
+    def test_exponents(self):
+        text = '  T1                 1.5e-03-2.00      3.00  Tank\n'
+        np.testing.assert_array_equal([[1.5e-3, -2.0, 3.0]], parse_table(text, 3))
+
+    def test_invalid_values(self):
+        with self.assertRaises(ValueError):
+            parse_table('  J1                 1.00      #N/A\n', 2)
+
+
+class ReportBlocksTest(unittest.TestCase):
+    report = [
+        '\n',
+        '  Node Results at 10:00:00 hrs:\n',
+        '  ----------------------------------\n',
+        '                     Demand      Head\n',
+        '  Node                  LPS         m\n',
+        '  ----------------------------------\n',
+        '  1-2                  3.00    103.00\n',
+        '  J-3                 -4.00    -30.00  Reservoir\n',
+        '\n',
+        '  Node Results at 2:00:00 hrs:\n',
+        '  ----------------------------------\n',
+        '                     Demand      Head\n',
+        '  Node                  LPS         m\n',
+        '  ----------------------------------\n',
+        '  1-2                  1.00    105.08\n',
+        '\x0c\n',
+        '  Page 2\n',
+        '\n',
+        '   \n',
+        '  Node Results at 2:00:00 hrs: (continued)\n',
+        '  ----------------------------------\n',
+        '                     Demand      Head\n',
+        '  Node                  LPS         m\n',
+        '  ----------------------------------\n',
+        '  J-3                 -2.00    -10.00  Reservoir\n',
+        '\n',
+    ]
+
+    def test_report2blocks(self):
+        blocks = report2blocks(self.report)
+        self.assertEqual(['Demand', 'Head'], blocks['Node Results at 2:00:00 hrs:'][0].split())
+        self.assertEqual(4, len(blocks['Node Results at 2:00:00 hrs:']))
+
+    def test_blocks2xray(self):
+        nodes, links = blocks2xray(report2blocks(self.report))
+        self.assertIsNone(links)
+        self.assertEqual(('time', 'id', 'vars'), nodes.dims)
+        self.assertEqual(['1-2', 'J-3'], list(nodes.id.values))
+        self.assertEqual(['Demand', 'Head'], list(nodes.vars.values))
+        self.assertTrue(nodes.time.to_index().is_monotonic_increasing)
+        np.testing.assert_array_equal([[[1.0, 105.08], [-2.0, -10.0]], [[3.0, 103.0], [-4.0, -30.0]]], nodes.values)
+
+
+if __name__ == '__main__':
+    unittest.main()
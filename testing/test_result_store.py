@@ -0,0 +1,100 @@
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+import oopnet as on
+
+from testing.base import PoulakisEnhancedPDAModel, MicropolisModel
+
+
+class PoulakisEnhancedPDAResultStoreTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.model = PoulakisEnhancedPDAModel()
+        self.report = self.model.network.run()
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def fill(self, n: int, **kwargs) -> on.ResultStore:
+        store = on.ResultStore(self.directory, chunksize=3, **kwargs)
+        for i in range(n):
+            store.append(self.report, parameters={'run': i, 'demand': np.array([i, 2.0 * i])})
+        store.flush()
+        return store
+
+    def test_append(self):
+        with self.fill(7) as store:
+            self.assertEqual(7, len(store))
+        store = on.ResultStore(self.directory, readonly=True)
+        self.assertEqual(7, len(store))
+        self.assertIsNone(store.times)
+        self.assertEqual({'run': 6, 'demand': [6.0, 12.0]}, store.parameters[6])
+        report = store.report(6)
+        self.assertTrue(self.report.pressure.equals(report.pressure))
+        self.assertTrue(self.report.flow.equals(report.flow))
+
+    def test_read(self):
+        store = self.fill(7)
+        array = store.read('Node', vars=['Pressure'], ids=['J-03', 'J-31'], scenarios=[1, 5])
+        self.assertEqual(('scenario', 'id', 'vars'), array.dims)
+        self.assertEqual((2, 2, 1), array.shape)
+        np.testing.assert_array_equal([1, 5], array.scenario.values)
+        expected = self.report.nodes.sel(id=['J-03', 'J-31'], vars=['Pressure']).values
+        np.testing.assert_array_equal(expected, array.values[1])
+        self.assertEqual((7,) + self.report.links.shape, store.read('Link').shape)
+        with self.assertRaises(KeyError):
+            store.read('Node', ids=['J-99'])
+        store.close()
+
+    def test_reopen(self):
+        self.fill(4).close()
+        with self.fill(3) as store:
+            self.assertEqual(7, len(store))
+            self.assertEqual(list(range(4)) + list(range(3)), [p['run'] for p in store.parameters])
+
+    def test_background(self):
+        with self.fill(5, background=True) as store:
+            self.assertEqual(5, len(store))
+            np.testing.assert_array_equal(self.report.nodes.values, store.read('Node', scenarios=[4]).values[0])
+
+    def test_background_error(self):
+        store = on.ResultStore(self.directory, background=True)
+        store.append(self.report)
+        store.append(on.SimulationReport.from_arrays(self.report.nodes.isel(id=slice(0, 2)), self.report.links))
+        with self.assertRaises(ValueError):
+            store.flush()
+        store.close()
+
+    def test_readonly(self):
+        with self.assertRaises(FileNotFoundError):
+            on.ResultStore(self.directory, readonly=True)
+        self.fill(1).close()
+        with self.assertRaises(PermissionError):
+            on.ResultStore(self.directory, readonly=True).append(self.report)
+
+
+class MicropolisResultStoreTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.model = MicropolisModel()
+        self.report = self.model.network.run()
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_read_time_slice(self):
+        with on.ResultStore(self.directory, dtype='float32') as store:
+            store.append(self.report)
+            times = list(self.report.nodes.time.to_index()[[1, 3]])
+            array = store.read('Node', vars=['Head'], times=times)
+            self.assertEqual(('scenario', 'time', 'id', 'vars'), array.dims)
+            self.assertEqual(times, list(array.time.to_index()))
+            expected = self.report.nodes.sel(time=times, vars=['Head']).values
+            np.testing.assert_allclose(expected, array.values[0], rtol=1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import datetime
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+import oopnet as on
+from oopnet.utils.utils import make_measurement
+
+from testing.base import PoulakisEnhancedPDAModel, MicropolisModel
+
+
+class PoulakisEnhancedPDASensorSetTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.model = PoulakisEnhancedPDAModel()
+        self.reports = []
+        for demand in (40.0, 50.0, 60.0):
+            on.get_junction(self.model.network, 'J-10').demand = demand
+            self.reports.append(self.model.network.run())
+        self.sensors = {'Pressure': ['J-31', 'J-02'], 'Flow': ['P-01', 'P-10']}
+
+    def expected(self, report):
+        return np.concatenate([report.flow[['P-01', 'P-10']].values, report.pressure[['J-31', 'J-02']].values])
+
+    def test_extract(self):
+        sensors = on.SensorSet(self.sensors)
+        self.assertEqual([('Flow', 'P-01'), ('Flow', 'P-10'), ('Pressure', 'J-31'), ('Pressure', 'J-02')],
+                         sensors.labels)
+        values = sensors.extract(self.reports)
+        self.assertEqual((3, 4), values.shape)
+        for report, row in zip(self.reports, values):
+            np.testing.assert_array_equal(self.expected(report), row)
+        np.testing.assert_array_equal(values[1], sensors.extract(self.reports[1]))
+
+    def test_precision(self):
+        values = on.SensorSet(self.sensors).measure(self.reports[0])
+        np.testing.assert_array_equal(np.around(self.expected(self.reports[0])[:2], 3), values[:2])
+        np.testing.assert_array_equal(np.around(self.expected(self.reports[0])[2:], 2), values[2:])
+        values = on.SensorSet(self.sensors, precision={}).measure(self.reports[0])
+        np.testing.assert_array_equal(self.expected(self.reports[0]), values)
+
+    def test_noise(self):
+        sensors = on.SensorSet(self.sensors, precision={}, noise={'Pressure': [0.0, 1.0]})
+        exact = sensors.extract(self.reports * 200)
+        measured = sensors.measure(self.reports * 200, rng=42)
+        np.testing.assert_array_equal(exact[:, :3], measured[:, :3])
+        self.assertAlmostEqual(1.0, (measured - exact)[:, 3].std(), delta=0.1)
+        np.testing.assert_array_equal(measured, sensors.measure(self.reports * 200, rng=42))
+
+    def test_result_store(self):
+        directory = tempfile.mkdtemp()
+        try:
+            with on.ResultStore(directory) as store:
+                for report in self.reports:
+                    store.append(report)
+                sensors = on.SensorSet(self.sensors)
+                np.testing.assert_array_equal(sensors.extract(self.reports), sensors.extract(store))
+                np.testing.assert_array_equal(sensors.extract(self.reports[1:]), sensors.extract(store, scenarios=[1, 2]))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_lazy_report(self):
+        sensors = on.SensorSet(self.sensors)
+        lazy = self.model.network.run(lazy=True)
+        np.testing.assert_array_equal(sensors.extract(self.reports[-1]), sensors.extract(lazy))
+
+    def test_unknown_variable(self):
+        with self.assertRaises(KeyError):
+            on.SensorSet({'Pressure': ['J-02'], 'Unknown': ['J-02']}).extract(self.reports)
+        with self.assertRaises(KeyError):
+            on.SensorSet({'Pressure': ['P-01']}).extract(self.reports)
+
+    def test_make_measurement(self):
+        expected = self.expected(self.reports[0])
+        expected[:2] = np.around(expected[:2], 3)
+        np.testing.assert_array_equal(np.around(expected, 2), make_measurement(self.reports[0], self.sensors))
+        np.testing.assert_array_equal(on.SensorSet({'Flow': ['P-01']}).measure(self.reports[0]),
+                                      make_measurement(self.reports[0], {'Flow': ['P-01']}))
+
+
+class MicropolisSensorSetTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.model = MicropolisModel()
+        self.model.network.times.duration = datetime.timedelta(hours=3)
+        self.report = self.model.network.run()
+
+    def test_extract(self):
+        ids = list(self.report.pressure.columns[:3])
+        values = on.SensorSet({'Pressure': ids}).extract([self.report] * 2)
+        self.assertEqual((2, 4, 3), values.shape)
+        np.testing.assert_array_equal(self.report.pressure[ids].values, values[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
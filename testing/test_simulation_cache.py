@@ -0,0 +1,102 @@
+import datetime
+import gc
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import oopnet as on
+from oopnet.simulator.binaryfile_reader import BinaryFileReader
+from oopnet.utils.getters.element_lists import get_reservoirs
+
+from testing.base import PoulakisEnhancedPDAModel
+
+
+class PoulakisEnhancedPDACacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.model = PoulakisEnhancedPDAModel()
+        self.network = self.model.network
+        self.cache = on.SimulationCache(maxsize=2)
+
+    def test_hit(self):
+        first = self.network.run(cache=self.cache)
+        second = self.network.run(cache=self.cache)
+        self.assertIs(first.nodes, second.nodes)
+        self.assertEqual((1, 1, 2, 1), tuple(self.cache.info()))
+
+    def test_hit_timings(self):
+        first = self.network.run(cache=self.cache)
+        second = self.network.run(cache=self.cache)
+        self.assertIn('execute', first.timings)
+        self.assertIn('cache', second.timings)
+        self.assertNotIn('execute', second.timings)
+        self.assertNotIn('parse', second.timings)
+
+    def test_lazy(self):
+        self.network.run(cache=self.cache)
+        rpt = self.network.run(cache=self.cache, lazy=True)
+        self.assertIsInstance(rpt, on.LazySimulationReport)
+        self.assertEqual(0, self.cache.hits)
+        lazy_hit = self.network.run(cache=self.cache, lazy=True)
+        self.assertIsInstance(lazy_hit, on.LazySimulationReport)
+        # the copy keeps the report file of the cached report
+        self.cache.clear()
+        del rpt
+        gc.collect()
+        np.testing.assert_array_equal(self.network.run().pressure.values, lazy_hit.pressure.values)
+
+    def test_miss_after_modification(self):
+        first = self.network.run(cache=self.cache)
+        get_reservoirs(self.network)[0].head += 10.0
+        second = self.network.run(cache=self.cache)
+        self.assertIsNot(first, second)
+        self.assertEqual(0, self.cache.hits)
+        self.assertEqual(2, self.cache.misses)
+
+    def test_startdatetime(self):
+        self.network.run(cache=self.cache)
+        self.network.run(cache=self.cache, startdatetime=datetime.datetime(2022, 1, 1))
+        self.assertEqual(0, self.cache.hits)
+
+    def test_reader(self):
+        self.network.run(cache=self.cache)
+        self.network.run(cache=self.cache, reader=BinaryFileReader)
+        self.assertEqual(0, self.cache.hits)
+
+    def test_lru(self):
+        heads = [0.0, 10.0, 20.0]
+        for head in heads:
+            get_reservoirs(self.network)[0].head += head
+            self.network.run(cache=self.cache)
+        self.assertEqual(2, len(self.cache))
+        self.assertEqual(3, self.cache.misses)
+
+    def test_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            expected = self.network.run(cache=on.SimulationCache(directory=directory))
+            self.assertEqual(1, len(os.listdir(directory)))
+            cache = on.SimulationCache(directory=directory)
+            rpt = self.network.run(cache=cache)
+            self.assertEqual(1, cache.hits)
+            np.testing.assert_array_equal(expected.pressure.values, rpt.pressure.values)
+            cache.clear()
+            self.assertEqual([], os.listdir(directory))
+
+    def test_executable_not_found(self):
+        # the executable's size and modification time can't be part of the key, if it isn't found on the PATH
+        with mock.patch('shutil.which', return_value=None):
+            first = self.network.run(cache=self.cache)
+            second = self.network.run(cache=self.cache)
+        self.assertIs(first.nodes, second.nodes)
+
+    def test_files_removed(self):
+        with tempfile.TemporaryDirectory() as path:
+            self.network.run(cache=self.cache, path=path)
+            self.network.run(cache=self.cache, path=path)
+            self.assertEqual([], os.listdir(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,25 @@
+import asyncio
+import datetime
 import os
+import pickle
+import tempfile
+import time
 import unittest
+from unittest import mock
 
 import numpy as np
 import pandas as pd
+import xarray as xr
 
 from oopnet.report import *
+from oopnet.simulator.simulation_errors import EPANETSimulationError, UnconnectedNodeError
+from oopnet.simulator.toolkit import load_library
+from oopnet.simulator.epanet2 import scratch_directory
+from oopnet.simulator.binaryfile_reader import BinaryFileReader, BinaryFileFormatError
+from oopnet.simulator.reportfile_reader import ReportFileReader
+from oopnet.elements.network_components import Junction
+from oopnet.utils.utils import make_measurement
+from oopnet.utils.adders.add_element import add_junction
 
 from testing.base import CTownModel, MicropolisModel, PoulakisEnhancedPDAModel, RulesModel, SimpleModel, \
     activate_all_report_parameters, set_dir_testing, PatternCurveModel
@@ -127,5 +142,346 @@ class PatternCurveModelSimulatorTest(SimulatorTest):
         self.model.network.run()
 
 
+class PoulakisEnhancedPDABinaryFileTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.model = PoulakisEnhancedPDAModel()
+        activate_all_report_parameters(self.model.network)
+        self.rpt = self.model.network.run()
+        self.binary_rpt = self.model.network.run(reader=BinaryFileReader)
+
+    def test_results(self):
+        for prop in ['elevation', 'demand', 'head', 'pressure', 'length', 'diameter', 'flow', 'velocity',
+                     'headlossper1000m', 'ffactor']:
+            expected = getattr(self.rpt, prop)
+            actual = getattr(self.binary_rpt, prop)
+            self.assertEqual(list(expected.index), list(actual.index))
+            np.testing.assert_allclose(expected.values, actual.values, atol=0.006)
+
+    def test_simulation_error(self):
+        add_junction(self.model.network, Junction(id='unconnected'))
+        with self.assertRaises(EPANETSimulationError) as e:
+            self.model.network.run(reader=BinaryFileReader)
+        self.assertTrue(e.exception.check_contained_errors(UnconnectedNodeError))
+
+    def test_invalid_file(self):
+        set_dir_testing()
+        with self.assertRaises(BinaryFileFormatError):
+            BinaryFileReader(os.path.join('networks', 'Poulakis_enhanced_PDA.inp'))
+
+
+@unittest.skipUnless(hasattr(os, 'mkfifo'), 'named pipes are not supported')
+class PoulakisEnhancedPDAFifoSimulatorTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.model = PoulakisEnhancedPDAModel()
+        activate_all_report_parameters(self.model.network)
+        self.rpt = self.model.network.run()
+
+    def test_results(self):
+        with tempfile.TemporaryDirectory() as path:
+            rpt = self.model.network.run(fifo=True, path=path)
+            self.assertEqual([], os.listdir(path))
+        np.testing.assert_array_equal(self.rpt.nodes.values, rpt.nodes.values)
+        np.testing.assert_array_equal(self.rpt.links.values, rpt.links.values)
+
+    def test_binary_file(self):
+        rpt = self.model.network.run(fifo=True, reader=BinaryFileReader)
+        np.testing.assert_allclose(self.rpt.pressure.values, rpt.pressure.values, atol=0.006)
+
+    def test_simulation_error(self):
+        add_junction(self.model.network, Junction(id='unconnected'))
+        for reader in [ReportFileReader, BinaryFileReader]:
+            with self.assertRaises(EPANETSimulationError) as e:
+                self.model.network.run(fifo=True, reader=reader)
+            self.assertTrue(e.exception.check_contained_errors(UnconnectedNodeError))
+
+    def test_toolkit(self):
+        with self.assertRaises(ValueError):
+            self.model.network.run(fifo=True, engine='toolkit')
+
+
+class PoulakisEnhancedPDATimingsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.model = PoulakisEnhancedPDAModel()
+
+    def test_cli(self):
+        rpt = self.model.network.run()
+        self.assertEqual(['setup', 'write', 'execute', 'parse', 'build arrays', 'cleanup'], list(rpt.timings))
+        for timing in rpt.timings.values():
+            self.assertGreaterEqual(timing.wall, 0.0)
+            self.assertGreaterEqual(timing.cpu, 0.0)
+        self.assertGreater(rpt.timings['execute'].wall, 0.0)
+
+    def test_binary_file(self):
+        rpt = self.model.network.run(reader=BinaryFileReader)
+        self.assertEqual(['setup', 'write', 'execute', 'parse', 'cleanup'], list(rpt.timings))
+
+    def test_log_record(self):
+        with self.assertLogs('oopnet.simulator.epanet2.timings', level='DEBUG') as logs:
+            rpt = self.model.network.run()
+        record = logs.records[0]
+        self.assertEqual('cli', record.engine)
+        self.assertEqual(rpt.timings['execute'].wall, record.timings['execute']['wall'])
+
+
+class PoulakisEnhancedPDALazyReportTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.model = PoulakisEnhancedPDAModel()
+        activate_all_report_parameters(self.model.network)
+        self.rpt = self.model.network.run()
+        self.lazy_rpt = self.model.network.run(lazy=True)
+
+    def test_type(self):
+        self.assertIsInstance(self.lazy_rpt, LazySimulationReport)
+
+    def test_properties(self):
+        for prop in ['elevation', 'demand', 'head', 'pressure', 'length', 'diameter', 'flow', 'velocity',
+                     'headlossper1000m', 'headloss', 'ffactor']:
+            pd.testing.assert_series_equal(getattr(self.rpt, prop), getattr(self.lazy_rpt, prop))
+        self.assertNotIn(('Node',), self.lazy_rpt._arrays)
+
+    def test_element_info(self):
+        pd.testing.assert_series_equal(self.rpt.get_node_info('J-02'), self.lazy_rpt.get_node_info('J-02'))
+        pd.testing.assert_series_equal(self.rpt.get_link_info('P-01'), self.lazy_rpt.get_link_info('P-01'))
+
+    def test_arrays(self):
+        xr.testing.assert_equal(self.rpt.nodes.sortby('id'), self.lazy_rpt.nodes.sortby('id'))
+        xr.testing.assert_equal(self.rpt.links.sortby('id'), self.lazy_rpt.links.sortby('id'))
+
+    def test_set_arrays(self):
+        self.lazy_rpt.pressure
+        self.lazy_rpt.nodes = self.rpt.nodes * 2
+        pd.testing.assert_series_equal(self.rpt.pressure * 2, self.lazy_rpt.pressure)
+        self.lazy_rpt.links = None
+        self.assertIsNone(self.lazy_rpt.links)
+        pd.testing.assert_series_equal(self.rpt.pressure * 2, self.lazy_rpt.pressure)
+
+    def test_make_measurement(self):
+        sensors = {'Flow': ['P-01', 'P-10'], 'Pressure': ['J-02', 'J-31']}
+        np.testing.assert_array_equal(make_measurement(self.rpt, sensors), make_measurement(self.lazy_rpt, sensors))
+        self.assertEqual([('Link', 'Flow', ('P-01', 'P-10')), ('Node', 'Pressure', ('J-02', 'J-31'))],
+                         list(self.lazy_rpt._arrays))
+
+    def test_report_file_removed(self):
+        with tempfile.TemporaryDirectory() as path:
+            rpt = self.model.network.run(lazy=True, path=path)
+            self.assertEqual(1, len(os.listdir(path)))
+            del rpt
+            self.assertEqual([], os.listdir(path))
+
+    def test_pickle(self):
+        rpt = pickle.loads(pickle.dumps(self.lazy_rpt))
+        self.assertNotIsInstance(rpt, LazySimulationReport)
+        pd.testing.assert_series_equal(self.rpt.pressure, rpt.pressure)
+
+    def test_simulation_error(self):
+        add_junction(self.model.network, Junction(id='unconnected'))
+        with self.assertRaises(EPANETSimulationError) as e:
+            self.model.network.run(lazy=True)
+        self.assertTrue(e.exception.check_contained_errors(UnconnectedNodeError))
+
+    def test_invalid_options(self):
+        for kwargs in [{'engine': 'toolkit'}, {'fifo': True}, {'reader': BinaryFileReader}]:
+            with self.assertRaises(ValueError):
+                self.model.network.run(lazy=True, **kwargs)
+
+
+class MicropolisLazyReportTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.model = MicropolisModel()
+        self.model.network.times.duration = datetime.timedelta(hours=6)
+        self.rpt = self.model.network.run()
+        self.lazy_rpt = self.model.network.run(lazy=True)
+
+    def test_properties(self):
+        for prop in ['pressure', 'flow']:
+            pd.testing.assert_frame_equal(getattr(self.rpt, prop), getattr(self.lazy_rpt, prop))
+
+    def test_element_info(self):
+        id = self.rpt.pressure.columns[0]
+        pd.testing.assert_frame_equal(self.rpt.get_node_info(id).sort_index(), self.lazy_rpt.get_node_info(id))
+
+    def test_get(self):
+        ids = list(self.rpt.pressure.columns[[3, 0]])
+        times = list(self.rpt.pressure.index[[2, 1]])
+        expected = self.rpt.get(['Pressure', 'Head'], ids=ids, times=times)
+        self.assertEqual((2, 2, 2), expected.shape)
+        np.testing.assert_array_equal(self.rpt.pressure.loc[times, ids].values, expected[..., 0])
+        np.testing.assert_array_equal(expected, self.lazy_rpt.get(['Pressure', 'Head'], ids=ids, times=times))
+        self.assertNotIn(('Node',), self.lazy_rpt._arrays)
+
+
+class PoulakisEnhancedPDAReportAccessTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.model = PoulakisEnhancedPDAModel()
+        self.rpt = self.model.network.run()
+
+    def test_cached_properties(self):
+        pressure = self.rpt.pressure
+        pressure[:] = 0.0
+        pressure.name = 'modified'
+        self.assertEqual('Pressure (m)', self.rpt.pressure.name)
+        self.assertGreater(self.rpt.pressure.max(), 0.0)
+        self.assertIsNot(self.rpt.headloss, self.rpt.headloss)
+
+    def test_assign_results(self):
+        pressure = self.rpt.pressure
+        self.rpt.nodes = self.rpt.nodes * 2
+        pd.testing.assert_series_equal(pressure * 2, self.rpt.pressure)
+
+    def test_get(self):
+        values = self.rpt.get(['Pressure', 'Demand'], ids=['J-31', 'J-02'])
+        self.assertEqual((2, 2), values.shape)
+        np.testing.assert_array_equal(self.rpt.pressure[['J-31', 'J-02']].values, values[:, 0])
+        np.testing.assert_array_equal(self.rpt.flow.reindex(self.rpt.links.id.values).values, self.rpt.get('Flow'))
+
+    def test_get_invalid(self):
+        with self.assertRaises(KeyError):
+            self.rpt.get('Pressure', ids=['P-01'])
+        with self.assertRaises(ValueError):
+            self.rpt.get(['Pressure', 'Flow'])
+        with self.assertRaises(KeyError):
+            self.rpt.get('Flow', kind='Node')
+
+    def test_pickle(self):
+        self.rpt.pressure
+        rpt = pickle.loads(pickle.dumps(self.rpt))
+        self.assertEqual({}, rpt._views)
+        pd.testing.assert_series_equal(self.rpt.pressure, rpt.pressure)
+
+
+class ScratchDirectoryTest(unittest.TestCase):
+    def test_environment_variable(self):
+        with tempfile.TemporaryDirectory() as path:
+            scratch = os.path.join(path, 'scratch')
+            with mock.patch.dict(os.environ, {'OOPNET_SCRATCH': scratch}):
+                self.assertEqual(scratch, scratch_directory())
+            self.assertTrue(os.path.isdir(scratch))
+
+    @unittest.skipUnless(os.access('/dev/shm', os.W_OK), 'no tmpfs available')
+    def test_tmpfs(self):
+        with mock.patch.dict(os.environ, {'OOPNET_SCRATCH': ''}):
+            self.assertTrue(scratch_directory().startswith('/dev/shm'))
+
+
+class MicropolisBinaryFileTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.model = MicropolisModel()
+        self.model.network.times.duration = datetime.timedelta(hours=6)
+
+    def test_times(self):
+        start = datetime.datetime(2022, 3, 1)
+        rpt = self.model.network.run(reader=BinaryFileReader, startdatetime=start)
+        self.assertEqual(7, len(rpt.pressure.index))
+        self.assertEqual(start, rpt.pressure.index[0])
+        self.assertEqual(datetime.datetime(2022, 3, 1, 6), rpt.pressure.index[-1])
+        cli_rpt = self.model.network.run(startdatetime=start)
+        np.testing.assert_allclose(cli_rpt.pressure.values, rpt.pressure.values, atol=0.006)
+
+
+class PoulakisEnhancedPDAAsyncSimulatorTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.model = PoulakisEnhancedPDAModel()
+        self.rpt = self.model.network.run()
+
+    async def test_arun(self):
+        rpt = await self.model.network.arun()
+        np.testing.assert_array_equal(self.rpt.pressure.values, rpt.pressure.values)
+
+    async def test_semaphore(self):
+        semaphore = asyncio.Semaphore(2)
+        reports = await asyncio.gather(*[self.model.network.arun(semaphore=semaphore) for _ in range(5)])
+        for rpt in reports:
+            np.testing.assert_array_equal(self.rpt.pressure.values, rpt.pressure.values)
+
+    async def test_binary_reader(self):
+        rpt = await self.model.network.arun(reader=BinaryFileReader)
+        np.testing.assert_allclose(self.rpt.pressure.values, rpt.pressure.values, atol=0.006)
+
+    async def test_simulation_error(self):
+        add_junction(self.model.network, Junction(id='unconnected'))
+        with self.assertRaises(EPANETSimulationError):
+            await self.model.network.arun()
+
+    async def test_cancelled_write(self):
+        from oopnet.simulator.epanet2 import ModelSimulator
+        simulator_class = ModelSimulator.__wrapped__  # the class wrapped by the logging decorator
+        write = simulator_class._write
+
+        def slow_write(simulator):
+            time.sleep(0.2)
+            write(simulator)
+
+        with tempfile.TemporaryDirectory() as path, mock.patch.object(simulator_class, '_write', slow_write):
+            task = asyncio.create_task(self.model.network.arun(path=path))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            await asyncio.sleep(0.5)
+            self.assertEqual([], os.listdir(path))
+
+    async def test_timings(self):
+        rpt = await self.model.network.arun()
+        self.assertIn('execute', rpt.timings)
+        for timing in rpt.timings.values():
+            self.assertGreaterEqual(timing.wall, 0.0)
+            self.assertIsNone(timing.cpu)
+
+
+def toolkit_available() -> bool:
+    try:
+        load_library()
+    except FileNotFoundError:
+        return False
+    return True
+
+
+@unittest.skipUnless(toolkit_available(), 'EPANET toolkit shared library not available')
+class PoulakisEnhancedPDAToolkitSimulatorTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.model = PoulakisEnhancedPDAModel()
+        activate_all_report_parameters(self.model.network)
+        self.rpt = self.model.network.run()
+        self.toolkit_rpt = self.model.network.run(engine='toolkit')
+
+    def test_node_results(self):
+        for prop in ['elevation', 'demand', 'head', 'pressure']:
+            expected = getattr(self.rpt, prop)
+            actual = getattr(self.toolkit_rpt, prop)
+            self.assertEqual(list(expected.index), list(actual.index))
+            np.testing.assert_allclose(expected.values, actual.values, atol=0.006)
+
+    def test_link_results(self):
+        for prop in ['length', 'diameter', 'flow', 'velocity', 'headlossper1000m', 'headloss']:
+            expected = getattr(self.rpt, prop)
+            actual = getattr(self.toolkit_rpt, prop)
+            self.assertEqual(list(expected.index), list(actual.index))
+            np.testing.assert_allclose(expected.values, actual.values, atol=0.011)
+
+    def test_invalid_engine(self):
+        with self.assertRaises(ValueError):
+            self.model.network.run(engine='invalid')
+
+    def test_simulation_error(self):
+        add_junction(self.model.network, Junction(id='unconnected'))
+        with self.assertRaises(EPANETSimulationError) as e:
+            self.model.network.run(engine='toolkit')
+        self.assertTrue(e.exception.check_contained_errors(UnconnectedNodeError))
+
+
+@unittest.skipUnless(toolkit_available(), 'EPANET toolkit shared library not available')
+class MicropolisToolkitSimulatorTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.model = MicropolisModel()
+        self.model.network.times.duration = datetime.timedelta(hours=6)
+
+    def test_times(self):
+        rpt = self.model.network.run(engine='toolkit')
+        self.assertEqual(7, len(rpt.pressure.index))
+        self.assertEqual(datetime.datetime(2016, 1, 1, 6), rpt.pressure.index[-1])
+        cli_rpt = self.model.network.run()
+        np.testing.assert_allclose(cli_rpt.pressure.values, rpt.pressure.values, atol=0.01)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,145 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from oopnet.elements.network import Network
+from oopnet.utils.getters import get_junctions, get_pipes, get_junction_ids, get_pipe_ids
+
+from testing.base import PoulakisEnhancedPDAModel, CTownModel, MicropolisModel, RulesModel, PatternCurveModel
+
+
+class SnapshotTest:
+    """Mixin checking that snapshots restore networks exactly."""
+    model_class = None
+
+    def setUp(self) -> None:
+        self.model = self.model_class()
+        self.network = self.model.network
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        filename = os.path.join(self.directory, 'network.snapshot')
+        self.network.save_snapshot(filename)
+        loaded = Network.load_snapshot(filename)
+        self.assertEqual(self.network, loaded)
+        self.assertEqual(get_junction_ids(self.network), get_junction_ids(loaded))
+        self.assertEqual(get_pipe_ids(self.network), get_pipe_ids(loaded))
+
+        original_inp = os.path.join(self.directory, 'original.inp')
+        loaded_inp = os.path.join(self.directory, 'loaded.inp')
+        self.network.write(original_inp)
+        loaded.write(loaded_inp)
+        with open(original_inp) as original, open(loaded_inp) as restored:
+            self.assertEqual(original.read(), restored.read())
+
+    def test_references(self):
+        filename = os.path.join(self.directory, 'network.snapshot')
+        self.network.save_snapshot(filename)
+        loaded = Network.load_snapshot(filename)
+        for pipe in get_pipes(loaded):
+            self.assertIs(pipe.startnode, loaded._nodes.get_by_id(pipe.startnode.id))
+            self.assertIs(pipe.endnode, loaded._nodes.get_by_id(pipe.endnode.id))
+
+    def test_missing_attribute(self):
+        pipe = get_pipes(self.network)[0]
+        del pipe.tag
+        filename = os.path.join(self.directory, 'network.snapshot')
+        self.network.save_snapshot(filename)
+        loaded = Network.load_snapshot(filename)
+        loaded_pipe = loaded._links.get_by_id(pipe.id)
+        self.assertFalse(hasattr(loaded_pipe, 'tag'))
+        self.assertEqual(pipe.length, loaded_pipe.length)
+
+
+class PoulakisEnhancedPDASnapshotTest(SnapshotTest, unittest.TestCase):
+    model_class = PoulakisEnhancedPDAModel
+
+
+class CTownSnapshotTest(SnapshotTest, unittest.TestCase):
+    model_class = CTownModel
+
+
+class MicropolisSnapshotTest(SnapshotTest, unittest.TestCase):
+    model_class = MicropolisModel
+
+
+class RulesSnapshotTest(SnapshotTest, unittest.TestCase):
+    model_class = RulesModel
+
+
+class PatternCurveSnapshotTest(SnapshotTest, unittest.TestCase):
+    model_class = PatternCurveModel
+
+
+class SnapshotCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        PoulakisEnhancedPDAModel()
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'network.inp')
+        shutil.copyfile(os.path.join('networks', 'Poulakis_enhanced_PDA.inp'), self.filename)
+        self.snapshot = self.filename + '.snapshot'
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_created(self):
+        network = Network.read(self.filename, cache=True)
+        self.assertTrue(os.path.exists(self.snapshot))
+        self.assertEqual(Network.read(self.filename), network)
+
+    def test_hit(self):
+        network = Network.read(self.filename, cache=True)
+        with mock.patch('oopnet.reader.snapshot.read') as read:
+            cached = Network.read(self.filename, cache=True)
+        read.assert_not_called()
+        self.assertEqual(network, cached)
+
+    def test_saved_snapshot_not_used_as_cache(self):
+        network = Network.read(self.filename)
+        network.save_snapshot(self.snapshot)
+        with mock.patch('oopnet.reader.snapshot.read', wraps=lambda network, filename: network) as read:
+            Network.read(self.filename, cache=True)
+        read.assert_called_once()
+
+    def test_miss_after_modification(self):
+        Network.read(self.filename, cache=True)
+        with open(self.filename) as f:
+            content = f.read()
+        with open(self.filename, 'w') as f:
+            f.write(content.replace('J-02', 'J-XX'))
+        network = Network.read(self.filename, cache=True)
+        self.assertIn('J-XX', [j.id for j in get_junctions(network)])
+        self.assertEqual(network, Network.load_snapshot(self.snapshot))
+
+    def test_miss_after_update(self):
+        Network.read(self.filename, cache=True)
+        with mock.patch('oopnet.reader.snapshot.__version__', '0.0.0'), \
+                mock.patch('oopnet.reader.snapshot.read', wraps=lambda network, filename: network) as read:
+            Network.read(self.filename, cache=True)
+        read.assert_called_once()
+
+    def test_miss_after_format_change(self):
+        with mock.patch('oopnet.reader.snapshot.SNAPSHOT_VERSION', 0):
+            Network.read(self.filename, cache=True)
+        with self.assertRaises(ValueError):
+            Network.load_snapshot(self.snapshot)
+        network = Network.read(self.filename, cache=True)
+        self.assertEqual(Network.read(self.filename), network)
+        self.assertEqual(network, Network.load_snapshot(self.snapshot))
+
+    def test_invalid_snapshot(self):
+        with open(self.snapshot, 'wb') as f:
+            f.write(b'nonsense')
+        with self.assertRaises(ValueError):
+            Network.load_snapshot(self.snapshot)
+        network = Network.read(self.filename, cache=True)
+        self.assertEqual(Network.read(self.filename), network)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import copy
+import os
+import unittest
+
+import pandas as pd
+
+from oopnet.elements.network import Network
+from oopnet.reader.unit_converter.convert import convert, converted, unit_factors
+from oopnet.utils.getters import get_curve, get_junction, get_pipe, get_rules, get_tank, get_valve
+
+from testing.base import RulesModel
+
+
+class UnitFactorTest(unittest.TestCase):
+    def test_si_units(self):
+        factors = unit_factors('LPS')
+        self.assertTrue(all(factor == 1.0 for factor in factors.values()))
+        self.assertAlmostEqual(1 / 3.6, unit_factors('CMH')['flow'], places=4)
+        self.assertEqual(1.0, unit_factors('CMH')['length'])
+
+    def test_us_units(self):
+        self.assertAlmostEqual(0.3048, unit_factors('gpm')['length'])
+        self.assertEqual(1.0, unit_factors('GPM', headloss='H-W')['roughness'])
+        self.assertAlmostEqual(0.3048, unit_factors('GPM', headloss='D-W')['roughness'])
+        self.assertNotEqual(unit_factors('GPM', emitterexponent=0.5)['emitter'],
+                            unit_factors('GPM', emitterexponent=1.0)['emitter'])
+
+    def test_illegal_unit(self):
+        with self.assertRaises(ValueError):
+            unit_factors('NONSENSE')
+
+
+class RulesModelUnitConverterTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.model = RulesModel()
+        self.network = self.model.network
+
+    def test_read(self):
+        self.assertEqual('LPS', self.network.options.units)
+        self.assertAlmostEqual(6.3092, get_junction(self.network, 'J-1').demand)
+        tank = get_tank(self.network, 'T-1')
+        self.assertAlmostEqual(3.048, tank.initlevel)
+        self.assertAlmostEqual(15.24, tank.diameter)
+        pipe = get_pipe(self.network, '2')
+        self.assertAlmostEqual(304.8, pipe.length)
+        self.assertAlmostEqual(7620.0, pipe.diameter)
+        self.assertEqual(100.0, pipe.roughness)
+        self.assertAlmostEqual(0.31546, get_valve(self.network, 'V-1').maximum_flow)
+        curve = get_curve(self.network, '1')
+        self.assertAlmostEqual(6.3092, curve.xvalues[0])
+        self.assertAlmostEqual(30.48, curve.yvalues[0])
+        self.assertAlmostEqual(3.048, get_rules(self.network)[0].condition[2].value)
+
+    def test_convert(self):
+        original = copy.deepcopy(self.network)
+        convert(self.network, 'GPM')
+        self.assertEqual('GPM', self.network.options.units)
+        self.assertAlmostEqual(100.0, get_junction(self.network, 'J-1').demand)
+        self.assertAlmostEqual(1000.0, get_pipe(self.network, '2').length)
+        self.assertAlmostEqual(100.0, get_curve(self.network, '1').yvalues[0])
+        convert(self.network)
+        self.assertAlmostEqual(get_tank(original, 'T-1').maxlevel, get_tank(self.network, 'T-1').maxlevel)
+
+    def test_converted(self):
+        original = copy.deepcopy(self.network)
+        with converted(self.network, 'GPM'):
+            self.assertAlmostEqual(5.0, get_valve(self.network, 'V-1').maximum_flow)
+        self.assertEqual(original, self.network)
+
+    def test_write_units(self):
+        original = copy.deepcopy(self.network)
+        filename = os.path.join('tmp', 'units.inp')
+        os.makedirs('tmp', exist_ok=True)
+        self.network.write(filename, units='GPM')
+        self.assertEqual(original, self.network)
+        with open(filename) as f:
+            self.assertIn('UNITS GPM', f.read())
+        new_network = Network.read(filename)
+        os.remove(filename)
+        self.assertEqual('LPS', new_network.options.units)
+        for getter, id, attributes in ((get_junction, 'J-1', ('elevation', 'demand')),
+                                       (get_tank, 'T-1', ('initlevel', 'maxlevel', 'diameter')),
+                                       (get_pipe, '2', ('length', 'diameter', 'roughness')),
+                                       (get_valve, 'V-1', ('diameter', 'maximum_flow'))):
+            for attribute in attributes:
+                self.assertAlmostEqual(getattr(getter(self.network, id), attribute),
+                                       getattr(getter(new_network, id), attribute))
+        self.assertAlmostEqual(get_rules(self.network)[1].condition[2].value,
+                               get_rules(new_network)[1].condition[2].value)
+
+    def test_write_units_simulation(self):
+        filename = os.path.join('tmp', 'units_simulation.inp')
+        os.makedirs('tmp', exist_ok=True)
+        self.network.write(filename, units='GPM')
+        with open(filename) as f:
+            self.assertNotIn('99999', f.read())
+        new_network = Network.read(filename)
+        os.remove(filename)
+        rpt = self.network.run()
+        new_rpt = new_network.run()
+        pd.testing.assert_frame_equal(rpt.pressure, new_rpt.pressure)
+        pd.testing.assert_frame_equal(rpt.flow, new_rpt.flow)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import oopnet as on
+from oopnet.simulator.worker_pool import apply_deltas, revert_deltas
+from oopnet.utils.getters.element_lists import get_pipes, get_reservoirs
+
+from testing.base import PoulakisEnhancedPDAModel
+
+
+class PoulakisEnhancedPDADeltasTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.model = PoulakisEnhancedPDAModel()
+        self.network = self.model.network
+
+    def test_apply_and_revert(self):
+        pipes = get_pipes(self.network)
+        roughness = [p.roughness for p in pipes]
+        changes = apply_deltas(self.network, {
+            'pipes.roughness': np.full(len(pipes), 0.5),
+            'pipes.diameter': {pipes[0].id: 100.0},
+        })
+        self.assertEqual([0.5] * len(pipes), [p.roughness for p in pipes])
+        self.assertIs(float, type(pipes[0].roughness))
+        self.assertEqual(100.0, pipes[0].diameter)
+        revert_deltas(changes)
+        self.assertEqual(roughness, [p.roughness for p in pipes])
+
+    def test_scalar(self):
+        apply_deltas(self.network, {'reservoirs.head': 42.0})
+        self.assertEqual([42.0], [r.head for r in get_reservoirs(self.network)])
+
+    def test_invalid_key(self):
+        with self.assertRaises(ValueError):
+            apply_deltas(self.network, {'roughness': 0.5})
+        with self.assertRaises(ValueError):
+            apply_deltas(self.network, {'nodes.elevation': 0.5})
+        with self.assertRaises(AttributeError):
+            apply_deltas(self.network, {'pipes.head': 0.5})
+
+    def test_invalid_length(self):
+        roughness = [p.roughness for p in get_pipes(self.network)]
+        with self.assertRaises(ValueError):
+            apply_deltas(self.network, {'pipes.diameter': 100.0, 'pipes.roughness': [0.5]})
+        self.assertEqual(roughness, [p.roughness for p in get_pipes(self.network)])
+
+
+class PoulakisEnhancedPDAWorkerPoolTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.model = PoulakisEnhancedPDAModel()
+        self.network = self.model.network
+
+    def test_map(self):
+        head = get_reservoirs(self.network)[0].head
+        deltas = [{'reservoirs.head': head + 10.0}, None, {'reservoirs.head': head - 10.0}]
+        with on.SimulationWorkerPool(self.network, max_workers=2) as pool:
+            reports = list(pool.map(deltas))
+        expected = self.network.run()
+        np.testing.assert_array_equal(expected.pressure.values, reports[1].pressure.values)
+        self.assertGreater(reports[0].pressure.sum(), reports[1].pressure.sum())
+        self.assertGreater(reports[1].pressure.sum(), reports[2].pressure.sum())
+
+    def test_reverted(self):
+        with on.SimulationWorkerPool(self.network, max_workers=1) as pool:
+            first = pool.submit({'pipes.roughness': 5.0}).result()
+            second = pool.submit().result()
+        np.testing.assert_array_equal(self.network.run().flow.values, second.flow.values)
+        self.assertFalse(np.array_equal(first.flow.values, second.flow.values))
+
+    def test_filename_and_stack(self):
+        with tempfile.TemporaryDirectory() as path:
+            with on.SimulationWorkerPool(os.path.abspath(os.path.join('networks', 'Poulakis_enhanced_PDA.inp')), max_workers=2, path=path) as pool:
+                rpt = pool.map([{'pipes.roughness': 0.1}, {'pipes.roughness': 0.2}], stack=True)
+            self.assertEqual([0, 1], list(rpt.nodes.scenario.values))
+            self.assertEqual([], os.listdir(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
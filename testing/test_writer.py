@@ -1,6 +1,9 @@
+import io
 import os
 import unittest
+from unittest import mock
 
+import numpy as np
 from oopnet.elements.network import Network
 
 from testing.base import CTownModel, MicropolisModel, PoulakisEnhancedPDAModel, RulesModel, SimpleModel
@@ -60,5 +63,183 @@ class SimpleModelWriterTest(unittest.TestCase):
         self.assertEqual(self.model.network, new_network)
 
 
+class SectionWriterTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.model = CTownModel()
+
+    def test_section_writers(self):
+        from oopnet.reader.read import SECTION_READERS
+        from oopnet.writer.write import SECTION_WRITERS
+        self.assertEqual({f.sectionname for f in SECTION_READERS}, {f.sectionname for f in SECTION_WRITERS})
+        priorities = [f.priority for f in SECTION_WRITERS]
+        self.assertEqual(sorted(priorities), priorities)
+
+    def test_single_write(self):
+        from oopnet.writer.write import SECTION_WRITERS
+        sections = ['JUNCTIONS', 'RESERVOIRS', 'TANKS', 'PIPES', 'PUMPS', 'VALVES', 'EMITTERS', 'CURVES', 'PATTERNS',
+                    'ENERGY', 'STATUS', 'CONTROLS', 'RULES', 'DEMANDS', 'COORDINATES', 'VERTICES', 'QUALITY',
+                    'SOURCES', 'MIXING']
+        for f in SECTION_WRITERS:
+            if f.sectionname in sections:
+                with self.subTest(section=f.sectionname):
+                    fid = mock.Mock()
+                    f.writerfunction(self.model.network, fid)
+                    fid.write.assert_called_once()
+                    self.assertTrue(fid.write.call_args.args[0].startswith(f'[{f.sectionname}]\n'))
+
+
+class StringWriterTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.model = RulesModel()
+
+    def test_stream(self):
+        filename = os.path.join('tmp', 'stream.inp')
+        os.makedirs('tmp', exist_ok=True)
+        self.model.network.write(filename)
+        with open(filename) as f:
+            content = f.read()
+        os.remove(filename)
+        fid = io.StringIO()
+        self.model.network.write(fid)
+        self.assertEqual(content, fid.getvalue())
+
+    def test_to_string(self):
+        content = self.model.network.to_string()
+        self.assertEqual(self.model.network, Network.read(content=content))
+        self.assertIn('UNITS GPM', self.model.network.to_string(units='GPM'))
+
+    def test_to_bytes(self):
+        self.assertEqual(self.model.network.to_string().encode(), self.model.network.to_bytes())
+
+
+class SectionCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.model = RulesModel()
+        self.network = self.model.network
+        self.network.cache_sections()
+        self.network.to_string()
+
+    def tearDown(self) -> None:
+        self.network.cache_sections(False)
+
+    def assertUncachedEqual(self):
+        content = self.network.to_string()
+        cache, self.network._section_cache = self.network._section_cache, None
+        self.assertEqual(self.network.to_string(), content)
+        self.network._section_cache = cache
+
+    def test_reuse(self):
+        from oopnet.utils.getters import get_junction
+        sections = dict(self.network._section_cache.sections)
+        get_junction(self.network, 'J-1').demand = 10.0
+        self.assertUncachedEqual()
+        changed = {name for name, section in self.network._section_cache.sections.items()
+                   if section is not sections[name]}
+        self.assertEqual({'JUNCTIONS'}, changed)
+
+    def test_assignments(self):
+        from oopnet.utils.getters import get_pipe, get_tank, get_valve
+        get_pipe(self.network, '2').roughness = 120.0
+        get_tank(self.network, 'T-1').xcoordinate = 1.0
+        get_valve(self.network, 'V-1').setting = 3.0
+        self.assertUncachedEqual()
+
+    def test_in_place_changes(self):
+        from oopnet.elements.network_map_tags import Vertex
+        from oopnet.utils.getters import get_curve, get_pipe, get_rules
+        get_curve(self.network, '1').yvalues[0] = 50.0
+        get_pipe(self.network, '2').vertices.append(Vertex(1.0, 2.0))
+        get_rules(self.network)[0].condition[2].value = 5.0
+        self.assertUncachedEqual()
+        get_pipe(self.network, '2').vertices[0].xcoordinate = 3.0
+        get_curve(self.network, '1').yvalues.extend([60.0])
+        get_curve(self.network, '1').xvalues += [2000.0]
+        self.assertUncachedEqual()
+
+    def test_added_components(self):
+        from oopnet.elements.system_operation import Pattern
+        from oopnet.utils.adders import add_pattern
+        from oopnet.utils.getters import get_pattern
+        multipliers = [1.0, 2.0]
+        add_pattern(self.network, Pattern(id='new', multipliers=multipliers))
+        self.network.to_string()
+        get_pattern(self.network, 'new').multipliers.append(3.0)
+        self.assertUncachedEqual()
+        self.assertEqual([1.0, 2.0], multipliers)
+
+    def test_hooks(self):
+        import copy
+        import gc
+        from oopnet.elements.base import NetworkComponent
+        from oopnet.elements.network_map_tags import Vertex
+        network = copy.deepcopy(self.network)
+        self.network.cache_sections(False)
+        self.assertIn('__setattr__', vars(NetworkComponent))
+        del network
+        gc.collect()
+        self.assertNotIn('__setattr__', vars(NetworkComponent))
+        self.assertNotIn('__setattr__', vars(Vertex))
+
+    def test_registries(self):
+        from oopnet.elements.network_components import Junction
+        from oopnet.utils.adders import add_junction
+        from oopnet.utils.getters import get_junction
+        from oopnet.utils.removers import remove_pipe
+        add_junction(self.network, Junction(id='new'))
+        remove_pipe(self.network, '2')
+        get_junction(self.network, 'J-1').id = 'renamed'
+        self.assertUncachedEqual()
+
+    def test_copies(self):
+        import copy
+        import pickle
+        from oopnet.utils.getters import get_junction
+        for network in (copy.deepcopy(self.network), pickle.loads(pickle.dumps(self.network))):
+            self.assertIsNotNone(network._section_cache)
+            get_junction(network, 'J-1').elevation = 1.0
+            self.assertIn('J-1 1.0', network.to_string())
+            self.assertNotIn('J-1 1.0', self.network.to_string())
+
+
+class InputTemplateTest(unittest.TestCase):
+    def setUp(self) -> None:
+        from oopnet.utils.getters import get_junctions, get_pipes
+        self.model = CTownModel()
+        self.network = self.model.network
+        self.parameters = [(j, 'demand') for j in get_junctions(self.network)[:10]]
+        self.parameters += [(p, 'roughness') for p in get_pipes(self.network)[:10]]
+        self.parameters.append((self.network.options, 'demandmultiplier'))
+
+    def test_current_values(self):
+        content = self.network.to_string()
+        template = self.network.compile_template(self.parameters)
+        self.assertEqual(len(self.parameters), len(template))
+        self.assertEqual(content, self.network.to_string())
+        self.assertEqual(content, template([getattr(obj, attribute) for obj, attribute in self.parameters]))
+
+    def test_render(self):
+        template = self.network.compile_template(self.parameters)
+        values = np.linspace(1.0, 2.0, len(self.parameters))
+        content = template.render(values)
+        for (obj, attribute), value in zip(self.parameters, values.tolist()):
+            setattr(obj, attribute, value)
+        self.assertEqual(self.network.to_string(), content)
+
+    def test_wrong_length(self):
+        template = self.network.compile_template(self.parameters)
+        with self.assertRaises(ValueError):
+            template(np.ones(len(self.parameters) + 1))
+
+    def test_illegal_parameters(self):
+        from oopnet.utils.getters import get_junctions, get_pipes
+        with self.assertRaises(TypeError):
+            self.network.compile_template([(get_pipes(self.network)[0], 'status')])
+        # emitters with a coefficient of zero aren't written
+        junction = get_junctions(self.network)[0]
+        with self.assertRaises(ValueError):
+            self.network.compile_template([(junction, 'emittercoefficient')])
+        self.assertEqual(0.0, junction.emittercoefficient)
+
+
 if __name__ == '__main__':
     unittest.main()